@@ -0,0 +1,133 @@
+##
+# File:    MultiProcDiagnostics.py
+# Author:  jdw
+# Date:    19-Oct-2026
+# Version: 0.001
+#
+# Updates:
+#
+##
+"""
+Compact aggregation of worker diagnostics as occurrence counts with a bounded number of samples.
+
+Workers fold the diagnostic list of each chunk into a summary before it is returned so that
+repeated diagnostics (e.g. 'missing chem comp') cross the process boundary once per chunk
+with a count rather than once per occurrence.  Summaries are exchanged in the plain form -
+
+    {"diagCounts": [[key, count, [sample, ...]], ...], "overflow": count}
+
+so that any task/result serializer (e.g. JSON codecs) can carry them.  The parent merges the summaries.
+
+"""
+
+__docformat__ = "restructuredtext en"
+__author__ = "John Westbrook"
+__email__ = "john.westbrook@rcsb.org"
+__license__ = "Apache 2.0"
+
+# pylint: skip-file
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class MultiProcDiagSummary(object):
+    """Occurrence counts of diagnostics keyed by keyFn(diagnostic) (default the diagnostic itself).
+
+    Args:
+        keyFn (callable): optional function mapping a diagnostic to its aggregation key (e.g. a message template)
+        maxKeys (int): maximum number of distinct keys retained (0 for no limit) -- further keys are only counted
+        maxSamples (int): maximum number of distinct sample diagnostics retained per key when keyFn is set
+    """
+
+    def __init__(self, keyFn=None, maxKeys=0, maxSamples=3):
+        self.__keyFn = keyFn
+        self.__maxKeys = maxKeys
+        self.__maxSamples = maxSamples
+        self.__countD = {}
+        self.__sampleD = {}
+        self.__overflow = 0
+
+    def __getKey(self, diag):
+        return self.__toHashable(self.__keyFn(diag) if self.__keyFn else diag)
+
+    def __toHashable(self, key):
+        try:
+            hash(key)
+        except TypeError:
+            key = repr(key)
+        return key
+
+    def __addCount(self, key, count, sampleList):
+        if key not in self.__countD:
+            if self.__maxKeys and len(self.__countD) >= self.__maxKeys:
+                self.__overflow += count
+                return
+            self.__countD[key] = 0
+            self.__sampleD[key] = []
+        self.__countD[key] += count
+        sL = self.__sampleD[key]
+        for sample in sampleList:
+            if len(sL) >= self.__maxSamples:
+                break
+            if sample not in sL:
+                sL.append(sample)
+
+    def extend(self, diagList):
+        """Count the input diagnostics (blank diagnostics are ignored)."""
+        for diag in diagList or []:
+            if not str(diag).strip():
+                continue
+            key = self.__getKey(diag)
+            self.__addCount(key, 1, [diag] if (self.__keyFn or key is not diag) else [])
+
+    def update(self, other):
+        """Merge another summary, its plain form (getState()) or a plain diagnostic list into this summary."""
+        if isinstance(other, MultiProcDiagSummary):
+            other = other.getState()
+        if isinstance(other, dict) and "diagCounts" in other:
+            for key, count, sampleList in other["diagCounts"]:
+                self.__addCount(self.__toHashable(key), count, sampleList)
+            self.__overflow += other.get("overflow", 0)
+        else:
+            self.extend(other)
+
+    def getState(self):
+        """Return the plain (serializable) form of this summary."""
+        return {"diagCounts": [[key, count, self.__sampleD[key]] for key, count in self.__countD.items()], "overflow": self.__overflow}
+
+    def getCounts(self):
+        """Return the dictionary {key: occurrence count}."""
+        return self.__countD
+
+    def getSamples(self, key):
+        """Return the sample diagnostics retained for the input key."""
+        return self.__sampleD.get(key, [])
+
+    def getOverflow(self):
+        """Return the number of occurrences not retained after 'maxKeys' distinct keys."""
+        return self.__overflow
+
+    def getDiagList(self):
+        """Return the list of distinct diagnostics (one representative per key)."""
+        return [self.__sampleD[key][0] if self.__sampleD[key] else key for key in self.__countD]
+
+    def getSummary(self, maxReport=100):
+        """Return a bounded summary -
+
+        {"total": occurrences, "distinct": distinct keys, "overflow": occurrences beyond maxKeys,
+         "counts": [{"key": key, "count": count, "samples": [...]}, ...]}  (most frequent first, at most maxReport)
+        """
+        keyList = sorted(self.__countD, key=lambda k: self.__countD[k], reverse=True)
+        if maxReport:
+            keyList = keyList[:maxReport]
+        return {
+            "total": sum(self.__countD.values()) + self.__overflow,
+            "distinct": len(self.__countD),
+            "overflow": self.__overflow,
+            "counts": [{"key": key, "count": self.__countD[key], "samples": list(self.__sampleD[key])} for key in keyList],
+        }
+
+    def __len__(self):
+        return len(self.__countD)
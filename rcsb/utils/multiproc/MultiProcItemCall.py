@@ -0,0 +1,82 @@
+##
+# File:    MultiProcItemCall.py
+# Author:  jdw
+# Date:    19-Oct-2026
+# Version: 0.001
+#
+# Updates:
+# 19-Oct-2026 jdw optionally set the current item in the logging context (logItems)
+# 19-Oct-2026 jdw measure each item with the active memory tracker
+##
+"""
+Worker method adapter applying a per-item function to each item of a chunk with per-item exception capture.
+
+"""
+
+__docformat__ = "restructuredtext en"
+__author__ = "John Westbrook"
+__email__ = "john.westbrook@rcsb.org"
+__license__ = "Apache 2.0"
+
+# pylint: skip-file
+
+import logging
+
+from rcsb.utils.multiproc.MultiProcLogging import MultiProcLogContext
+from rcsb.utils.multiproc.MultiProcMemoryProfiler import MultiProcMemoryTracker
+
+logger = logging.getLogger(__name__)
+
+
+class MultiProcItemCall(object):
+    """Callable implementing the worker method prototype -
+
+        successList, resultList_1, ..., resultList_numResults, diagList = call(dataList, procName, optionsD, workingDir)
+
+    by applying itemFn(item) to each item of the chunk.  itemFn returns the single result value
+    (numResults = 1), a tuple of 'numResults' values, or anything (ignored) for numResults = 0.
+    Items for which itemFn raises an exception are omitted from the success list and the exception
+    is reported in the diagnostic list as '<exception type>: <message>'.
+    With 'logItems', the item being processed is set in the logging context (MultiProcLogContext).
+    Items are measured by the active memory tracker of the process (MultiProcMemoryTracker), if any.
+    """
+
+    def __init__(self, itemFn, numResults=1, logItems=False):
+        self.__itemFn = itemFn
+        self.__numResults = numResults
+        self.__logItems = logItems
+
+    def __call__(self, dataList, procName, optionsD, workingDir):
+        _ = optionsD
+        _ = workingDir
+        successList = []
+        retLists = [[] for _ in range(self.__numResults)]
+        diagList = []
+        tracker = MultiProcMemoryTracker.getActive()
+        for item in dataList:
+            if self.__logItems:
+                MultiProcLogContext.set(item=item)
+            if tracker:
+                tracker.itemStart()
+            try:
+                rV = self.__itemFn(item)
+            except Exception as e:
+                logger.debug("%s item %r failing with %s", procName, item, str(e))
+                diagList.append("%s: %s" % (type(e).__name__, str(e)))
+                continue
+            finally:
+                if tracker:
+                    tracker.itemEnd(item)
+                if self.__logItems:
+                    MultiProcLogContext.set(item=None)
+            if self.__numResults == 0:
+                rV = ()
+            elif self.__numResults == 1:
+                rV = (rV,)
+            elif not isinstance(rV, (tuple, list)) or len(rV) != self.__numResults:
+                diagList.append("ValueError: item function returned %r (expected %d values)" % (type(rV).__name__, self.__numResults))
+                continue
+            successList.append(item)
+            for ii, v in enumerate(rV):
+                retLists[ii].append(v)
+        return tuple([successList] + retLists + [diagList])
@@ -0,0 +1,95 @@
+##
+# File:    MultiProcListUtil.py
+# Author:  jdw
+# Date:    19-Oct-2026
+# Version: 0.001
+#
+# Updates:
+#
+##
+"""
+List operations shared by the multiprocessing execution wrappers.
+
+"""
+
+__docformat__ = "restructuredtext en"
+__author__ = "John Westbrook"
+__email__ = "john.westbrook@rcsb.org"
+__license__ = "Apache 2.0"
+
+# pylint: skip-file
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class MultiProcListUtil(object):
+    def isHashable(self, v):
+        """Test if the input value is hashable"""
+        try:
+            hash(v)
+        except TypeError:
+            return False
+        return True
+
+    def diffList(self, l1, l2):
+        """List difference -  elements in l1 not in l2
+
+        Unhashable items returned by worker processes are copies of the input items and are compared
+        by their representations (counting repeated items).
+        """
+        try:
+            return list(set(l1) - set(l2))
+        except TypeError:
+            try:
+                countD = {}
+                for t in l2:
+                    countD[repr(t)] = countD.get(repr(t), 0) + 1
+                difL = []
+                for t in l1:
+                    if countD.get(repr(t), 0) > 0:
+                        countD[repr(t)] -= 1
+                    else:
+                        difL.append(t)
+                return difL
+            except Exception as e:
+                logger.exception("Failing with %s", str(e))
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+
+        return []
+
+    def getSubsequenceIndices(self, l1, l2):
+        """Return the positions in l1 of the items of l2 (an in-order subsequence of l1) or None if l2 is not a subsequence.
+
+        Items returned by worker processes are copies of the input items and are compared by equality
+        (or by their representations where equality is undefined).
+        """
+        if len(l1) == len(l2):
+            return list(range(len(l1)))
+        indexList = []
+        jj = 0
+        for t in l2:
+            while jj < len(l1) and not self.__isSame(l1[jj], t):
+                jj += 1
+            if jj == len(l1):
+                return None
+            indexList.append(jj)
+            jj += 1
+        return indexList
+
+    def __isSame(self, v1, v2):
+        try:
+            return bool(v1 == v2)
+        except Exception:
+            return repr(v1) == repr(v2)
+
+    def treeReduce(self, partialList, combineFn):
+        """Merge the input partial aggregates pairwise (log2 depth) -- returns None for an empty input."""
+        while len(partialList) > 1:
+            nextList = [combineFn(partialList[ii], partialList[ii + 1]) for ii in range(0, len(partialList) - 1, 2)]
+            if len(partialList) % 2:
+                nextList.append(partialList[-1])
+            partialList = nextList
+        return partialList[0] if partialList else None
@@ -5,7 +5,13 @@
 # Version: 0.001
 #
 # Updates:
-#
+# 19-Oct-2026 jdw ship log records from the queue handler in batches (flushed on size, elapsed time,
+#                 severity and process exit)
+# 19-Oct-2026 jdw filter records below the lowest level of the wrapped handlers in the queue handler
+# 19-Oct-2026 jdw add a bounded logging queue with overflow policies, drop/delay counters and backlog (getStats())
+# 19-Oct-2026 jdw add MultiProcLoggingService (shared queue/listener) and a flush barrier replacing the fixed exit delay
+# 19-Oct-2026 jdw add a per-process log file mode (no IPC) merged into the wrapped handlers in timestamp order
+# 19-Oct-2026 jdw attach the run/chunk/item context to records (MultiProcLogContext) and add a JSON lines formatter
 ##
 """
 Multiprocessing logging queue handler and listener.
@@ -19,11 +25,18 @@ __license__ = "Apache 2.0"
 
 # pylint: skip-file
 
+import glob
+import heapq
+import json
 import logging
+import os
+import shutil
+import tempfile
 import threading
 import time
 
 import multiprocess as multiprocessing
+import multiprocess.util
 
 
 try:
@@ -32,23 +45,249 @@ except ImportError:
     import Queue as queue
 
 
+class MultiProcLogContext(object):
+    """Execution context of the current process attached to log records by MultiProcLogContextFilter.
+
+    The execution wrappers set the run identifier (runId) and the chunk index (chunkId) in each worker
+    process and, optionally, the item being processed (item).  Worker methods may set further keys.
+    """
+
+    fields = ("runId", "chunkId", "item")
+    __contextD = {}
+
+    @classmethod
+    def set(cls, **kwargs):
+        """Set context values (None clears a value)."""
+        for ky, val in kwargs.items():
+            if val is None:
+                cls.__contextD.pop(ky, None)
+            else:
+                cls.__contextD[ky] = val
+
+    @classmethod
+    def clear(cls):
+        cls.__contextD.clear()
+
+    @classmethod
+    def get(cls):
+        return dict(cls.__contextD)
+
+
+class MultiProcLogContextFilter(logging.Filter):
+    """Filter setting the MultiProcLogContext values (None if unset) as record attributes -- attributes
+    already present on a record (e.g. set through 'extra') are kept.  The record process name is set
+    to the name of the current (multiprocess) process.
+    """
+
+    def filter(self, record):
+        # logging takes the process name from the standard library multiprocessing module
+        record.processName = multiprocessing.current_process().name
+        contextD = MultiProcLogContext.get()
+        for ky in MultiProcLogContext.fields:
+            contextD.setdefault(ky, None)
+        for ky, val in contextD.items():
+            if not hasattr(record, ky):
+                setattr(record, ky, val)
+        return True
+
+
+class MultiProcJsonFormatter(logging.Formatter):
+    """Format records as single line JSON objects with the record attributes in 'fields' -
+
+    the default fields are time, levelname, name, process, processName, runId, chunkId, item and message
+    (exc_text is added for records with exception information).
+    """
+
+    defaultFields = ("time", "levelname", "name", "process", "processName", "runId", "chunkId", "item", "message")
+
+    def __init__(self, fields=None, datefmt=None):
+        logging.Formatter.__init__(self, datefmt=datefmt)
+        self.fields = tuple(fields) if fields else self.defaultFields
+
+    def format(self, record):
+        record.message = record.getMessage()
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        recordD = {}
+        for field in self.fields:
+            recordD[field] = self.formatTime(record, self.datefmt) if field == "time" else getattr(record, field, None)
+        if record.exc_text:
+            recordD["exc_text"] = record.exc_text
+        return json.dumps(recordD, default=str)
+
+
+class MultiProcLoggingService(object):
+    """Logging queue and listener shared by the MultiProcLogging contexts attached to it.
+
+    A service outlives individual runs - each attached context registers the handlers of its
+    logger and receives a queue handler tagging records with its attachment key, so a single
+    listener thread serves consecutive (or concurrent) runs.  flush() is a barrier returning as
+    soon as every record enqueued so far (by any process) has been handled.
+
+    Example -
+
+        svc = MultiProcLoggingService.getDefault()
+        for ...:
+            with MultiProcLogging(logger=logger, service=svc):
+                mpu.runMulti(...)
+        svc.shutdown()
+    """
+
+    __defaultService = None
+    __defaultLock = threading.Lock()
+
+    def __init__(self, maxQueueSize=0):
+        self.__maxQueueSize = maxQueueSize if maxQueueSize > 0 else 0
+        self.__loggingQueue = multiprocessing.Queue(self.__maxQueueSize if self.__maxQueueSize else -1)
+        self.__enqueuedCount = multiprocessing.Value("q", 0)
+        self.__handledCount = multiprocessing.Value("q", 0)
+        self.__targetD = {}
+        self.__targetSeq = 0
+        self.__lock = threading.Lock()
+        self.__pollInterval = 0.002
+        self.__ql = MultiProcLogQueueListener(self.__loggingQueue, [], targetD=self.__targetD, handledCount=self.__handledCount)
+        self.__ql.start()
+        self.__stopped = False
+
+    @classmethod
+    def getDefault(cls):
+        """Return the process-wide service (created on first use or after a shutdown)."""
+        with cls.__defaultLock:
+            if cls.__defaultService is None or cls.__defaultService.isStopped():
+                cls.__defaultService = cls()
+            return cls.__defaultService
+
+    def isStopped(self):
+        return self.__stopped
+
+    def getMaxQueueSize(self):
+        return self.__maxQueueSize
+
+    def attach(self, handlerList):
+        """Register the handlers for a new attachment and return its key."""
+        if self.__stopped:
+            raise ValueError("Logging service is stopped")
+        with self.__lock:
+            self.__targetSeq += 1
+            key = "%d-%d" % (os.getpid(), self.__targetSeq)
+            self.__targetD[key] = list(handlerList)
+        return key
+
+    def detach(self, key):
+        """Remove the handlers of an attachment (flush() first to handle its pending records)."""
+        with self.__lock:
+            self.__targetD.pop(key, None)
+
+    def getHandler(self, key, **kwargs):
+        """Return a queue handler for the attachment 'key' (keyword arguments as for MultiProcLogQueueHandler)."""
+        return MultiProcLogQueueHandler(self.__loggingQueue, enqueuedCount=self.__enqueuedCount, target=key, **kwargs)
+
+    def flush(self, timeout=None):
+        """Wait until all records enqueued so far are handled -- returns False if 'timeout' seconds elapse first.
+
+        Records still buffered by queue handlers are not yet enqueued (see MultiProcLogQueueHandler.flush()).
+        """
+        target = self.__enqueuedCount.value
+        endTime = time.time() + timeout if timeout is not None else None
+        # the enqueued count may decrease when queued records are discarded (drop_oldest)
+        while not self.__stopped and self.__handledCount.value < min(target, self.__enqueuedCount.value):
+            if endTime is not None and time.time() >= endTime:
+                return False
+            time.sleep(self.__pollInterval)
+        return True
+
+    def getBacklog(self):
+        """Return the number of entries (records or batches) waiting in the logging queue (None if unavailable)."""
+        try:
+            return self.__loggingQueue.qsize()
+        except (NotImplementedError, OSError):
+            return None
+
+    def getStats(self):
+        """Return {"enqueued": records, "handled": records, "backlog": queue entries, "attached": attachments}."""
+        return {"enqueued": self.__enqueuedCount.value, "handled": self.__handledCount.value, "backlog": self.getBacklog(), "attached": len(self.__targetD)}
+
+    def shutdown(self):
+        """Handle the remaining records, stop the listener and close the queue."""
+        if self.__stopped:
+            return
+        # the listener drains every record enqueued ahead of its end-of-queue sentinel
+        self.__ql.stop()
+        self.__stopped = True
+        self.__loggingQueue.close()
+        self.__loggingQueue.join_thread()
+
+
 class MultiProcLogging(object):
-    def __init__(self, logger=None, fmt=None, level=None):
+    def __init__(
+        self,
+        logger=None,
+        fmt=None,
+        level=None,
+        batchSize=50,
+        flushInterval=1.0,
+        maxQueueSize=0,
+        overflowPolicy="block",
+        overflowLevel=logging.WARNING,
+        sampleRate=10,
+        service=None,
+        flushTimeout=30.0,
+        mode="queue",
+        logDir=None,
+    ):
         """ Current logging instance or None - alternative format and level to be used within the bounded context.
 
             Redirect log requests to an multi-proc queue and a listener that
             redirects the request to handers bound to the input logger instance.
 
+            Records are shipped in batches of up to 'batchSize' records (see MultiProcLogQueueHandler).
+
+            With 'maxQueueSize' > 0 the logging queue holds at most that many entries (records or batches)
+            and 'overflowPolicy' applies when it is full -
+
+                block:       wait for space (counted as delayed records)
+                drop_oldest: discard the oldest queued entries
+                drop_below:  discard records below 'overflowLevel' and wait for space for the others
+                sample:      keep one record in 'sampleRate' and wait for space for these
+
+            getStats() reports the dropped and delayed record counts (all processes) and the current backlog.
+
+            With a 'service' (MultiProcLoggingService) the context attaches to its queue and listener
+            (the queue size is that of the service) rather than starting its own.  On exit the context
+            waits up to 'flushTimeout' seconds for its records to be handled (see flush()).
+
+            The current MultiProcLogContext of the emitting process (runId, chunkId, item) is attached to
+            each record (see MultiProcJsonFormatter for structured output).
+
+            With mode="file" each process writes its records to a private file in 'logDir' (a temporary
+            directory by default) without any interprocess communication (see MultiProcLogFileHandler).
+            The files are merged into the wrapped handlers in timestamp order on exit or on demand (mergeLogs()).
         """
+        if mode not in ("queue", "file"):
+            raise ValueError("Unsupported logging mode %r" % mode)
         self.__handlerInitialList = []
         self.__handlerWrappedList = []
         #
         self.logger = logger if logger else logging.getLogger()
         #
-        self.__loggingQueue = multiprocessing.Queue(-1)
-        self.__ql = None
+        self.__service = service
+        self.__ownService = service is None
+        self.__maxQueueSize = service.getMaxQueueSize() if service else (maxQueueSize if maxQueueSize > 0 else 0)
+        if self.__maxQueueSize > 0 and overflowPolicy not in MultiProcLogQueueHandler.overflowPolicies:
+            raise ValueError("Unsupported logging queue overflow policy %r" % overflowPolicy)
+        self.__overflowD = {"overflowPolicy": overflowPolicy, "overflowLevel": overflowLevel, "sampleRate": sampleRate} if self.__maxQueueSize else {}
+        self.__targetKey = None
         self.__altFmt = logging.Formatter(fmt) if fmt else None
         self.__altLevel = level if level else None
+        self.__batchSize = batchSize
+        self.__flushInterval = flushInterval
+        self.__flushTimeout = flushTimeout
+        self.__mode = mode
+        self.__logDir = logDir
+        self.__ownLogDir = False
+        self.__fileHandler = None
+        self.__offsetD = {}
+        self.__mergedCount = 0
 
     def __setup(self):
         #
@@ -65,36 +304,129 @@ class MultiProcLogging(object):
                 hi.setLevel(self.__altLevel)
             self.logger.removeHandler(hi)
         #
+        if self.__mode == "file":
+            if not self.__logDir:
+                self.__logDir = tempfile.mkdtemp(prefix="mplog-")
+                self.__ownLogDir = True
+            elif not os.path.isdir(self.__logDir):
+                os.makedirs(self.__logDir)
+            self.__fileHandler = MultiProcLogFileHandler(self.__logDir, batchSize=self.__batchSize)
+            self.__fileHandler.setLevel(self.__getMinLevel([hi for hi, f, l in self.__handlerInitialList]))
+            self.__fileHandler.addFilter(MultiProcLogContextFilter())
+            self.__handlerWrappedList.append(self.__fileHandler)
+            self.logger.addHandler(self.__fileHandler)
+            return
+        if self.__ownService:
+            self.__service = MultiProcLoggingService(maxQueueSize=self.__maxQueueSize)
+        self.__targetKey = self.__service.attach([hi for hi, f, l in self.__handlerInitialList])
+        #
         # One wrapped/queue handler for the input logger (w/ all handlers)
         #
-        hw = MultiProcLogQueueHandler(self.__loggingQueue)
+        hw = self.__service.getHandler(self.__targetKey, batchSize=self.__batchSize, flushInterval=self.__flushInterval, **self.__overflowD)
+        # records below the level of every wrapped handler are neither formatted nor enqueued
+        hw.setLevel(self.__getMinLevel([hi for hi, f, l in self.__handlerInitialList]))
+        hw.addFilter(MultiProcLogContextFilter())
         self.__handlerWrappedList.append(hw)
         self.logger.addHandler(hw)
-        # ------------------------------------------
-        #
-        self.__ql = MultiProcLogQueueListener(self.__loggingQueue, [hi for hi, f, l in self.__handlerInitialList])
-        self.__ql.start()
         #
 
+    def __getMinLevel(self, handlerList):
+        """Return the lowest level (with any level override applied) of the input handlers."""
+        levelList = [hi.level for hi in handlerList]
+        if not levelList:
+            return self.__altLevel if self.__altLevel else logging.NOTSET
+        return min(levelList)
+
+    def flush(self, timeout=None):
+        """Ship the records buffered in this process and wait until all records enqueued so far are handled.
+
+        Returns False if 'timeout' seconds elapse first.
+        """
+        for wh in self.__handlerWrappedList:
+            wh.flush()
+        if self.__fileHandler:
+            self.mergeLogs()
+            return True
+        return self.__service.flush(timeout=timeout) if self.__service else True
+
+    def mergeLogs(self):
+        """Merge the records written to the log files so far into the wrapped handlers in timestamp order
+        (file mode) -- returns the number of records merged.
+
+        Records still buffered by running processes are merged by a later call.
+        """
+        if not self.__fileHandler:
+            return 0
+        self.__fileHandler.flush()
+        pathList = sorted(glob.glob(os.path.join(self.__logDir, "mplog-*.jsonl")))
+        handlerList = [hi for hi, f, l in self.__handlerInitialList]
+        numMerged = 0
+        # streaming k-way merge -- each file is in timestamp order
+        for _, _, _, recordD in heapq.merge(*[self.__readLogFile(path, ii) for ii, path in enumerate(pathList)]):
+            record = logging.makeLogRecord(recordD)
+            for hi in handlerList:
+                hi.handle(record)
+            numMerged += 1
+        self.__mergedCount += numMerged
+        return numMerged
+
+    def __readLogFile(self, logPath, fileIndex):
+        """Yield (created, fileIndex, sequence, record dictionary) for the complete records not yet merged from logPath."""
+        offset = self.__offsetD.get(logPath, 0)
+        with open(logPath, "rb") as ifh:
+            ifh.seek(offset)
+            for seq, line in enumerate(ifh):
+                if not line.endswith(b"\n"):
+                    # partially written record
+                    break
+                offset += len(line)
+                self.__offsetD[logPath] = offset
+                recordD = json.loads(line.decode("utf-8"))
+                yield (recordD.get("created", 0.0), fileIndex, seq, recordD)
+
     def __recover(self):
-        # replace handlers and config
-        time.sleep(0.1)
+        # ship any buffered records and wait for the listener to handle them
+        flushed = self.flush(timeout=self.__flushTimeout)
         #
         for wh in self.__handlerWrappedList:
             self.logger.removeHandler(wh)
+            wh.close()
         for (ih, ff, ll) in self.__handlerInitialList:
             ih.setFormatter(ff)
             ih.setLevel(ll)
             self.logger.addHandler(ih)
-
-        # stop listening
-        self.__ql.stop()
-        # close the quueue
-        self.__loggingQueue.close()
-        self.__loggingQueue.join_thread()
+        #
+        if not flushed:
+            self.logger.warning("Log records still pending after %.1f seconds", self.__flushTimeout)
+        if self.__fileHandler:
+            for logPath in glob.glob(os.path.join(self.__logDir, "mplog-*.jsonl")):
+                os.remove(logPath)
+            if self.__ownLogDir:
+                shutil.rmtree(self.__logDir, ignore_errors=True)
+            return True
+        self.__service.detach(self.__targetKey)
+        if self.__ownService:
+            # stop listening and close the queue
+            self.__service.shutdown()
         #
         return True
 
+    def getBacklog(self):
+        """Return the number of entries (records or batches) waiting in the logging queue (None if unavailable)."""
+        return self.__service.getBacklog() if self.__service else None
+
+    def getStats(self):
+        """Return {"dropped": records, "delayed": records, "backlog": queue entries, "maxQueueSize": entries,
+        "merged": records merged from log files}.
+        """
+        sD = {"dropped": 0, "delayed": 0, "backlog": self.getBacklog(), "maxQueueSize": self.__maxQueueSize, "merged": self.__mergedCount}
+        for wh in self.__handlerWrappedList:
+            if not isinstance(wh, MultiProcLogQueueHandler):
+                continue
+            for ky, count in wh.getOverflowCounts().items():
+                sD[ky] += count
+        return sD
+
     def __enter__(self):
         self.__setup()
         return self.logger
@@ -113,27 +445,200 @@ class MultiProcLogQueueHandler(logging.Handler):
     with a multiprocessing Queue to centralise logging to file in one process
     (in a multi-process application), so as to avoid file write contention
     between processes.
+
+    Prepared records are buffered and enqueued as a list (batch) when 'batchSize' records are
+    buffered, when a record at or above 'flushLevel' is emitted, every 'flushInterval' seconds
+    (by a daemon thread in each process using the handler), on flush()/close() and when the
+    process exits normally.  A batchSize of 1 enqueues each record individually.
+
+    With an 'overflowPolicy' (bounded queues), an entry that does not fit in the queue is handled as -
+
+        block:       wait for space (up to 'blockTimeout' seconds, None to wait indefinitely)
+        drop_oldest: discard queued entries (oldest first) until the entry fits
+        drop_below:  discard its records below 'overflowLevel' and wait for space for the others
+        sample:      keep one record in 'sampleRate' and wait for space for these
+
+    Dropped and delayed (waiting) records are counted in shared counters (getOverflowCounts()).
+
+    An optional shared 'enqueuedCount' counts the records placed in the queue (see MultiProcLoggingService)
+    and an optional 'target' key is attached to each record (mpLogTarget) to select the listener handlers.
     """
 
-    def __init__(self, aQueue):
+    overflowPolicies = ("block", "drop_oldest", "drop_below", "sample")
+
+    def __init__(
+        self,
+        aQueue,
+        batchSize=50,
+        flushInterval=1.0,
+        flushLevel=logging.ERROR,
+        overflowPolicy=None,
+        overflowLevel=logging.WARNING,
+        sampleRate=10,
+        blockTimeout=None,
+        enqueuedCount=None,
+        target=None,
+    ):
         """
         Initialise an instance, using the passed queue.
         """
         logging.Handler.__init__(self)
         self.queue = aQueue
+        self.batchSize = max(1, batchSize)
+        self.flushInterval = flushInterval
+        self.flushLevel = flushLevel
+        self.__buffer = []
+        self.__bufferTime = None
+        self.__pid = None
+        self.__creatorPid = os.getpid()
+        self.__closed = threading.Event()
+        if overflowPolicy is not None and overflowPolicy not in self.overflowPolicies:
+            raise ValueError("Unsupported logging queue overflow policy %r" % overflowPolicy)
+        self.overflowPolicy = overflowPolicy
+        self.overflowLevel = overflowLevel
+        self.sampleRate = max(1, sampleRate)
+        self.blockTimeout = blockTimeout
+        self.__sampleCount = 0
+        self.__droppedCount = multiprocessing.Value("q", 0)
+        self.__delayedCount = multiprocessing.Value("q", 0)
+        self.__enqueuedCount = enqueuedCount
+        self.target = target
         #
         # self.setLevel(level)
         # self.setFormatter(format)
 
+    def __checkProcess(self):
+        # Records buffered before a fork belong to the parent - each child process flushes its own buffer
+        # at exit (the creating process flushes through flush()/close() and logging.shutdown()).
+        pid = os.getpid()
+        if self.__pid != pid:
+            self.__pid = pid
+            self.__buffer = []
+            self.__bufferTime = None
+            if pid != self.__creatorPid:
+                # run ahead of the queue finalizers (exitpriority 10) that close the feeder thread
+                multiprocess.util.Finalize(self, self.flush, exitpriority=20)
+            tT = threading.Thread(target=self.__flushPeriodically, name="MultiProcLogFlush")
+            tT.daemon = True
+            tT.start()
+
+    def __flushPeriodically(self):
+        while not self.__closed.wait(self.flushInterval):
+            try:
+                self.flush()
+            except Exception:
+                break
+
+    def flush(self):
+        """
+        Enqueue the buffered records as a batch.
+        """
+        self.acquire()
+        try:
+            if self.__buffer and self.__pid == os.getpid():
+                batch = self.__buffer
+                self.__buffer = []
+                self.__bufferTime = None
+                self.enqueue(batch)
+        finally:
+            self.release()
+
+    def close(self):
+        try:
+            self.flush()
+        finally:
+            self.__closed.set()
+            logging.Handler.close(self)
+
     def enqueue(self, record):
         """
         Enqueue a record.
 
         The base implementation uses put_nowait. You may want to override
         this method if you want to use blocking, timeouts or custom queue
-        implementations.
+        implementations.  With an overflow policy, a full queue is handled
+        according to the policy.
         """
-        self.queue.put_nowait(record)
+        if self.overflowPolicy is None:
+            self.__put(record)
+            return
+        try:
+            self.__put(record)
+        except queue.Full:
+            self.__overflow(record)
+
+    def getOverflowCounts(self):
+        """
+        Return the numbers of dropped and delayed records (summed over all processes).
+        """
+        return {"dropped": self.__droppedCount.value, "delayed": self.__delayedCount.value}
+
+    def __count(self, counter, num):
+        if num:
+            with counter.get_lock():
+                counter.value += num
+
+    def __countEnqueued(self, entry, sign):
+        if self.__enqueuedCount is not None:
+            self.__count(self.__enqueuedCount, sign * (len(entry) if isinstance(entry, list) else 1))
+
+    def __put(self, entry, block=False, timeout=None):
+        # counted ahead of the put so that the count never trails the records handled by the listener
+        self.__countEnqueued(entry, 1)
+        try:
+            if block:
+                self.queue.put(entry, True, timeout)
+            else:
+                self.queue.put_nowait(entry)
+        except BaseException:
+            self.__countEnqueued(entry, -1)
+            raise
+
+    def __putWait(self, entry):
+        numRecords = len(entry) if isinstance(entry, list) else 1
+        self.__count(self.__delayedCount, numRecords)
+        try:
+            self.__put(entry, True, self.blockTimeout)
+        except queue.Full:
+            self.__count(self.__droppedCount, numRecords)
+
+    def __overflow(self, entry):
+        recordList = entry if isinstance(entry, list) else [entry]
+        if self.overflowPolicy == "block":
+            self.__putWait(entry)
+        elif self.overflowPolicy == "drop_oldest":
+            while True:
+                try:
+                    oldEntry = self.queue.get_nowait()
+                except queue.Empty:
+                    # queue drained by the listener meanwhile
+                    self.__putWait(entry)
+                    break
+                if oldEntry is MultiProcLogQueueListener._sentinel:
+                    # the listener is stopping -- return the end-of-queue sentinel behind this entry
+                    self.__putWait(entry)
+                    self.queue.put(oldEntry)
+                    break
+                self.__count(self.__droppedCount, len(oldEntry) if isinstance(oldEntry, list) else 1)
+                # discarded records will never be handled
+                self.__countEnqueued(oldEntry, -1)
+                try:
+                    self.__put(entry)
+                    break
+                except queue.Full:
+                    continue
+        else:
+            if self.overflowPolicy == "drop_below":
+                keepList = [rec for rec in recordList if rec.levelno >= self.overflowLevel]
+            else:
+                keepList = []
+                for rec in recordList:
+                    if self.__sampleCount % self.sampleRate == 0:
+                        keepList.append(rec)
+                    self.__sampleCount += 1
+            self.__count(self.__droppedCount, len(recordList) - len(keepList))
+            if keepList:
+                self.__putWait(keepList if isinstance(entry, list) else keepList[0])
 
     def prepare(self, record):
         """
@@ -158,6 +663,8 @@ class MultiProcLogQueueHandler(logging.Handler):
         record.msg = record.message
         record.args = None
         record.exc_info = None
+        if self.target is not None:
+            record.mpLogTarget = self.target
         return record
 
     def emit(self, record):
@@ -167,7 +674,94 @@ class MultiProcLogQueueHandler(logging.Handler):
         Writes the LogRecord to the queue, preparing it for pickling first.
         """
         try:
-            self.enqueue(self.prepare(record))
+            if self.batchSize <= 1:
+                self.enqueue(self.prepare(record))
+                return
+            self.__checkProcess()
+            self.__buffer.append(self.prepare(record))
+            if self.__bufferTime is None:
+                self.__bufferTime = time.time()
+            if len(self.__buffer) >= self.batchSize or record.levelno >= self.flushLevel or time.time() - self.__bufferTime >= self.flushInterval:
+                self.flush()
+        except (KeyboardInterrupt, SystemExit):  # pylint: disable=try-except-raise
+            raise
+        except Exception:
+            self.handleError(record)
+
+
+class MultiProcLogFileHandler(logging.Handler):
+    """
+    This logging handler writes records as JSON lines to a log file private to each process
+    (<logDir>/mplog-<pid>.jsonl) without any interprocess communication.
+
+    Prepared records are buffered and appended to the file when 'batchSize' records are buffered,
+    when a record at or above 'flushLevel' is emitted, on flush()/close() and when the process exits
+    normally.  Each file is in timestamp order and MultiProcLogging.mergeLogs() merges the files.
+    """
+
+    def __init__(self, logDir, batchSize=50, flushLevel=logging.ERROR):
+        logging.Handler.__init__(self)
+        self.logDir = logDir
+        self.batchSize = max(1, batchSize)
+        self.flushLevel = flushLevel
+        self.__buffer = []
+        self.__fd = None
+        self.__pid = None
+        self.__creatorPid = os.getpid()
+
+    def __checkProcess(self):
+        # A descriptor and buffer inherited from the parent process are left to the parent
+        pid = os.getpid()
+        if self.__pid != pid:
+            self.__pid = pid
+            self.__buffer = []
+            self.__fd = os.open(os.path.join(self.logDir, "mplog-%d.jsonl" % pid), os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+            if pid != self.__creatorPid:
+                multiprocess.util.Finalize(self, self.flush, exitpriority=20)
+
+    def flush(self):
+        """
+        Append the buffered records to the log file.
+        """
+        self.acquire()
+        try:
+            if self.__buffer and self.__pid == os.getpid():
+                data = "".join(self.__buffer).encode("utf-8")
+                self.__buffer = []
+                while data:
+                    data = data[os.write(self.__fd, data) :]
+        finally:
+            self.release()
+
+    def close(self):
+        try:
+            self.flush()
+            if self.__fd is not None and self.__pid == os.getpid():
+                os.close(self.__fd)
+                self.__fd = None
+        finally:
+            logging.Handler.close(self)
+
+    def prepare(self, record):
+        """
+        Return the JSON line for a record (message merged with its arguments and traceback text in exc_text).
+        """
+        self.format(record)
+        recordD = dict(record.__dict__)
+        recordD["msg"] = record.message
+        recordD["args"] = None
+        recordD["exc_info"] = None
+        return json.dumps(recordD, default=str) + "\n"
+
+    def emit(self, record):
+        """
+        Emit a record.
+        """
+        try:
+            self.__checkProcess()
+            self.__buffer.append(self.prepare(record))
+            if len(self.__buffer) >= self.batchSize or record.levelno >= self.flushLevel:
+                self.flush()
         except (KeyboardInterrupt, SystemExit):  # pylint: disable=try-except-raise
             raise
         except Exception:
@@ -177,18 +771,24 @@ class MultiProcLogQueueHandler(logging.Handler):
 class MultiProcLogQueueListener(object):
     """
     This class implements an internal threaded listener which watches for
-    LogRecords being added to a queue, removes them and passes them to a
-    list of handlers for processing.
+    LogRecords (or lists of LogRecords) being added to a queue, removes them
+    and passes them to a list of handlers for processing.
+
+    With 'targetD' ({target key: handler list}), records carrying a target key (mpLogTarget)
+    are passed to the handlers registered for that key.  An optional shared 'handledCount'
+    counts the handled records.
     """
 
     _sentinel = None
 
-    def __init__(self, aQueue, handlerL):
+    def __init__(self, aQueue, handlerL, targetD=None, handledCount=None):
         """
         Initialise an instance with the specified queue and handlers.
         """
         self.queue = aQueue
         self.handlers = handlerL
+        self.targetD = targetD
+        self.handledCount = handledCount
         self._stop = threading.Event()
         self._thread = None
 
@@ -227,10 +827,17 @@ class MultiProcLogQueueListener(object):
         Handle a record.
 
         This just loops through the handlers offering them the record
-        to handle.
+        (or each record of a batch) to handle.
         """
+        if isinstance(record, list):
+            for rec in record:
+                self.handle(rec)
+            return
         record = self.prepare(record)
-        for handler in self.handlers:
+        handlerL = self.handlers
+        if self.targetD is not None:
+            handlerL = self.targetD.get(getattr(record, "mpLogTarget", None), handlerL)
+        for handler in handlerL:
             handler.handle(record)
 
     def _monitor(self):
@@ -239,35 +846,34 @@ class MultiProcLogQueueListener(object):
         to deal with them.
 
         This method runs on a separate, internal thread.
-        The thread will terminate if it sees a sentinel object in the queue.
+        The thread will terminate when it sees the sentinel object in the queue.
         """
-        while not self._stop.isSet():
+        # Records enqueued before the sentinel are handled even after stop() is requested.
+        while True:
             try:
                 record = self.dequeue(True)
-                if record is self._sentinel:
-                    break
-                self.handle(record)
             except queue.Empty:
-                pass
-        # There might still be records in the queue.
-        while True:
+                continue
+            if record is self._sentinel:
+                break
             try:
-                record = self.dequeue(False)
-                if record is self._sentinel:
-                    break
                 self.handle(record)
-            except queue.Empty:
-                break
+            finally:
+                if self.handledCount is not None:
+                    with self.handledCount.get_lock():
+                        self.handledCount.value += len(record) if isinstance(record, list) else 1
 
     def stop(self):
         """
         Stop the listener.
 
-        This asks the thread to terminate, and then waits for it to do so.
+        This asks the thread to terminate, and then waits for it to handle the
+        records enqueued ahead of the request.
         Note that if you don't call this before your application exits, there
         may be some records still left on the queue, which won't be processed.
         """
         self._stop.set()
-        self.queue.put_nowait(self._sentinel)
-        self._thread.join(5.0)
+        # wait for space in a bounded queue (the thread is still draining it)
+        self.queue.put(self._sentinel)
+        self._thread.join()
         self._thread = None
@@ -0,0 +1,137 @@
+##
+# File:    MultiProcMemoryProfiler.py
+# Author:  jdw
+# Date:    19-Oct-2026
+# Version: 0.001
+#
+# Updates:
+#
+##
+"""
+Per-chunk memory measurement (tracemalloc peak and resident size growth) in worker processes and run summaries.
+
+"""
+
+__docformat__ = "restructuredtext en"
+__author__ = "John Westbrook"
+__email__ = "john.westbrook@rcsb.org"
+__license__ = "Apache 2.0"
+
+# pylint: skip-file
+
+import heapq
+import logging
+import tracemalloc
+
+from rcsb.utils.multiproc.MultiProcResourceUtil import MultiProcResourceUtil
+
+logger = logging.getLogger(__name__)
+
+
+class MultiProcMemoryTracker(object):
+    """Measure the peak traced allocation (tracemalloc) and the resident size growth of a chunk --
+
+    Between start() and stop() the tracker is the active tracker of the process (getActive()) so that
+    item-level adapters (MultiProcItemCall) can bracket each item with itemStart()/itemEnd() to collect
+    the 'topItems' heaviest items (requires tracemalloc.reset_peak(), Python 3.9+).
+    """
+
+    __active = None
+
+    def __init__(self, topItems=10):
+        self.__topItems = topItems
+        self.__itemLevel = hasattr(tracemalloc, "reset_peak")
+        self.__rU = MultiProcResourceUtil()
+        self.__base = 0
+        self.__itemBase = 0
+        self.__peak = 0
+        self.__rss = None
+        self.__itemHeap = []
+        self.__seq = 0
+
+    @classmethod
+    def getActive(cls):
+        """Return the tracker measuring the current chunk in this process (or None)."""
+        return cls.__active
+
+    def __update(self):
+        current, peak = tracemalloc.get_traced_memory()
+        self.__peak = max(self.__peak, peak - self.__base)
+        return current, peak
+
+    def start(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        if self.__itemLevel:
+            tracemalloc.reset_peak()
+        self.__base = tracemalloc.get_traced_memory()[0]
+        self.__peak = 0
+        self.__itemHeap = []
+        self.__rss = self.__rU.getProcessRss()
+        MultiProcMemoryTracker.__active = self
+
+    def itemStart(self):
+        if not self.__itemLevel:
+            return
+        current, _ = self.__update()
+        tracemalloc.reset_peak()
+        self.__itemBase = current
+
+    def itemEnd(self, item):
+        if not self.__itemLevel:
+            return
+        _, peak = self.__update()
+        if self.__topItems > 0:
+            # bounded min-heap of the heaviest items (the sequence number breaks ties)
+            entry = (peak - self.__itemBase, self.__seq, repr(item)[:200])
+            self.__seq += 1
+            if len(self.__itemHeap) < self.__topItems:
+                heapq.heappush(self.__itemHeap, entry)
+            else:
+                heapq.heappushpop(self.__itemHeap, entry)
+
+    def stop(self):
+        """Return {"peakTraced": bytes, "rssDelta": bytes, "rss": bytes, "heaviestItems": [{"item": repr, "peakTraced": bytes}, ...]}."""
+        self.__update()
+        MultiProcMemoryTracker.__active = None
+        rss = self.__rU.getProcessRss()
+        return {
+            "peakTraced": self.__peak,
+            "rssDelta": rss - self.__rss if rss is not None and self.__rss is not None else None,
+            "rss": rss,
+            "heaviestItems": [{"item": itemS, "peakTraced": size} for size, _, itemS in sorted(self.__itemHeap, reverse=True)],
+        }
+
+
+class MultiProcMemorySummary(object):
+    """Accumulate the per-chunk memory measurements of a run."""
+
+    def __init__(self, topItems=10):
+        self.__topItems = topItems
+        self.__chunkList = []
+        self.__itemList = []
+
+    def update(self, memD):
+        """Add the measurement of a chunk -- {"chunkId", "items", "peakTraced", "rssDelta", "rss", "heaviestItems"}."""
+        chunkD = {ky: memD.get(ky) for ky in ["chunkId", "items", "peakTraced", "rssDelta", "rss"]}
+        self.__chunkList.append(chunkD)
+        for itemD in memD.get("heaviestItems", []):
+            self.__itemList.append(dict(itemD, chunkId=memD.get("chunkId")))
+        self.__itemList = heapq.nlargest(self.__topItems, self.__itemList, key=lambda itemD: itemD["peakTraced"])
+
+    def getSummary(self):
+        """Return {"chunks": count, "maxPeakTraced": bytes, "meanPeakTraced": bytes, "maxRssDelta": bytes, "maxRss": bytes,
+        "chunkList": [per-chunk measurements], "heaviestItems": [{"item", "peakTraced", "chunkId"}, ...]}.
+        """
+        peakList = [cD["peakTraced"] for cD in self.__chunkList if cD["peakTraced"] is not None]
+        rssDeltaList = [cD["rssDelta"] for cD in self.__chunkList if cD["rssDelta"] is not None]
+        rssList = [cD["rss"] for cD in self.__chunkList if cD["rss"] is not None]
+        return {
+            "chunks": len(self.__chunkList),
+            "maxPeakTraced": max(peakList) if peakList else None,
+            "meanPeakTraced": sum(peakList) / len(peakList) if peakList else None,
+            "maxRssDelta": max(rssDeltaList) if rssDeltaList else None,
+            "maxRss": max(rssList) if rssList else None,
+            "chunkList": sorted(self.__chunkList, key=lambda cD: (cD["chunkId"] is None, cD["chunkId"])),
+            "heaviestItems": list(self.__itemList),
+        }
@@ -0,0 +1,321 @@
+##
+# File:    MultiProcPipeline.py
+# Author:  jdw
+# Date:    19-Oct-2026
+# Version: 0.001
+#
+# Updates:
+#
+##
+"""
+Multi-stage streaming pipeline of worker methods connected by bounded queues.
+
+Each stage runs its own set of worker processes applying a worker method with the MultiProcUtil
+prototype -
+
+    successList, resultList_1, ..., diagList = workerFunc(dataList, procName, optionsD, workingDir)
+
+and the first result list of each chunk is passed as a chunk to the next stage.  All stages run
+concurrently, and the bounded inter-stage queues hold back upstream stages that run ahead of
+downstream stages.  Per-stage statistics identify the bottleneck stage -
+
+    busyTime / (numProc * wallTime)   the utilization of the stage workers (near 1 for the bottleneck)
+    getWaitTime                       time the stage workers waited for input (starved by upstream stages)
+    putWaitTime                       time the stage workers waited for space downstream (back pressure)
+
+"""
+
+__docformat__ = "restructuredtext en"
+__author__ = "John Westbrook"
+__email__ = "john.westbrook@rcsb.org"
+__license__ = "Apache 2.0"
+
+# pylint: skip-file
+
+import logging
+import queue
+import threading
+import time
+
+import multiprocess as multiprocessing
+
+from rcsb.utils.multiproc.MultiProcDiagnostics import MultiProcDiagSummary
+from rcsb.utils.multiproc.MultiProcListUtil import MultiProcListUtil
+
+logger = logging.getLogger(__name__)
+
+
+class MultiProcPipelineWorker(multiprocessing.Process):
+    """Worker process for a pipeline stage.
+
+    Chunks are read from 'inQueue' and the first result list of each chunk is written (split into
+    chunks of 'chunkSize' items if set) to 'outQueue'.  The last worker of the stage to receive an
+    end-of-queue sentinel writes 'numNext' sentinels to 'outQueue'.  On exit, the worker reports
+    (stageIndex, processName, failList, diagnostic summary, statistics) on 'reportQueue'.  For the last
+    stage, all result lists of each chunk are written to 'outQueue'.
+    """
+
+    def __init__(self, stageIndex, inQueue, outQueue, reportQueue, activeCount, numNext, workerFunc, optionsD=None, workingDir=".", chunkSize=0, lastStage=False):
+        multiprocessing.Process.__init__(self)
+        self.__stageIndex = stageIndex
+        self.__inQueue = inQueue
+        self.__outQueue = outQueue
+        self.__reportQueue = reportQueue
+        self.__activeCount = activeCount
+        self.__numNext = numNext
+        self.__workerFunc = workerFunc
+        self.__optionsD = optionsD if optionsD is not None else {}
+        self.__workingDir = workingDir
+        self.__chunkSize = chunkSize
+        self.__lastStage = lastStage
+
+    def __put(self, obj, statsD):
+        startTime = time.time()
+        self.__outQueue.put(obj)
+        statsD["putWaitTime"] += time.time() - startTime
+
+    def run(self):
+        processName = self.name
+        statsD = {"chunks": 0, "itemsIn": 0, "itemsOut": 0, "failures": 0, "busyTime": 0.0, "getWaitTime": 0.0, "putWaitTime": 0.0}
+        failList = []
+        dS = MultiProcDiagSummary()
+        while True:
+            startTime = time.time()
+            dataList = self.__inQueue.get()
+            statsD["getWaitTime"] += time.time() - startTime
+            if dataList is None:
+                break
+            #
+            startTime = time.time()
+            try:
+                rTup = self.__workerFunc(dataList=dataList, procName=processName, optionsD=self.__optionsD, workingDir=self.__workingDir)
+            except Exception as e:
+                logger.exception("%s failing with %s", processName, str(e))
+                rTup = ([], [], ["%s: %s" % (type(e).__name__, str(e))])
+            statsD["busyTime"] += time.time() - startTime
+            statsD["chunks"] += 1
+            statsD["itemsIn"] += len(dataList)
+            #
+            successList = rTup[0] or []
+            if len(successList) < len(dataList):
+                difL = MultiProcListUtil().diffList(dataList, successList)
+                failList.extend(difL)
+                statsD["failures"] += len(difL)
+            dS.extend(rTup[-1])
+            #
+            if self.__lastStage:
+                outList = rTup[1:-1]
+                statsD["itemsOut"] += len(outList[0]) if outList else 0
+                self.__put(tuple([rV or [] for rV in outList]), statsD)
+            else:
+                outList = (rTup[1] or []) if len(rTup) > 2 else []
+                statsD["itemsOut"] += len(outList)
+                step = self.__chunkSize if self.__chunkSize > 0 else max(1, len(outList))
+                for ii in range(0, len(outList), step):
+                    self.__put(outList[ii : ii + step], statsD)
+        #
+        with self.__activeCount.get_lock():
+            self.__activeCount.value -= 1
+            isLast = self.__activeCount.value == 0
+        if isLast:
+            for _ in range(self.__numNext):
+                self.__outQueue.put(None)
+        self.__reportQueue.put((self.__stageIndex, processName, failList, dS.getState(), statsD))
+
+
+class MultiProcPipeline(object):
+    """Streaming pipeline of worker method stages connected by bounded queues.
+
+    Example -
+
+        pl = MultiProcPipeline(queueSize=8)
+        pl.addStage(fetchObj, "fetch", numProc=8, chunkSize=10)
+        pl.addStage(parseObj, "parse", numProc=4)
+        pl.addStage(writeObj, "serialize", numProc=2, numResults=2)
+        ok, failLists, resultLists, diagList = pl.run(dataList)
+        stageStatsList = pl.getStageStats()
+    """
+
+    def __init__(self, verbose=True, queueSize=4):
+        self.__verbose = verbose
+        self.__queueSize = queueSize
+        self.__stageList = []
+        self.__workingDir = "."
+        self.__pollInterval = 0.5
+        self.__exitTimeout = 10.0
+        self.__stageStatsList = []
+
+    def setWorkingDir(self, workingDir):
+        """A working directory option that is passed as an argument to the worker functions."""
+        self.__workingDir = workingDir
+
+    def addStage(self, workerObj=None, workerMethod=None, numProc=1, chunkSize=0, optionsD=None, numResults=1, name=None):
+        """Append a stage applying workerObj.workerMethod() with 'numProc' worker processes.
+
+        chunkSize:   number of items per chunk delivered to the stage (0 to pass on the chunks of the
+                     previous stage unchanged, for the first stage one chunk per worker)
+        numResults:  number of result lists returned by the worker method (all are returned from the
+                     last stage, the first is passed to the next stage otherwise)
+
+        Returns True for success or False if the worker method is not found.
+        """
+        try:
+            workerFunc = getattr(workerObj, workerMethod)
+        except AttributeError:
+            logger.error("Object/attribute error")
+            return False
+        self.__stageList.append(
+            {
+                "name": name if name else "%s-%d" % (workerMethod, len(self.__stageList)),
+                "workerFunc": workerFunc,
+                "numProc": max(1, numProc),
+                "chunkSize": chunkSize,
+                "optionsD": optionsD,
+                "numResults": numResults,
+            }
+        )
+        return True
+
+    def getStageStats(self):
+        """Return a list of per-stage statistics for the last run -
+
+        name, numProc, chunks, itemsIn, itemsOut, failures, busyTime, getWaitTime, putWaitTime (seconds summed over
+        the stage workers), wallTime, throughput (items in per second of wall time), utilization (busyTime / (numProc * wallTime))
+        and bottleneck (True for the stage with the highest utilization).
+        """
+        return self.__stageStatsList
+
+    def run(self, dataList):
+        """Stream the input dataList through the pipeline stages.
+
+        Returns,   successFlag true|false
+                   failLists[numStages] -- items failing in each stage (as input to that stage)
+                   resultLists[numResults] -- result lists of the last stage
+                   diagList --  unique list of diagnostics from all stages
+        """
+        numStages = len(self.__stageList)
+        if not numStages:
+            logger.error("No pipeline stages defined")
+            return False, [], [], []
+        lastD = self.__stageList[-1]
+        queueList = [multiprocessing.Queue(self.__queueSize) for _ in range(numStages + 1)]
+        reportQueue = multiprocessing.Queue()
+        workerList = []
+        for ii, sD in enumerate(self.__stageList):
+            isLast = ii == numStages - 1
+            activeCount = multiprocessing.Value("i", sD["numProc"])
+            numNext = 1 if isLast else self.__stageList[ii + 1]["numProc"]
+            nextChunkSize = 0 if isLast else self.__stageList[ii + 1]["chunkSize"]
+            for jj in range(sD["numProc"]):
+                wT = MultiProcPipelineWorker(
+                    ii,
+                    queueList[ii],
+                    queueList[ii + 1],
+                    reportQueue,
+                    activeCount,
+                    numNext,
+                    sD["workerFunc"],
+                    optionsD=sD["optionsD"],
+                    workingDir=self.__workingDir,
+                    chunkSize=nextChunkSize,
+                    lastStage=isLast,
+                )
+                wT.name = "%s-%d" % (sD["name"], jj + 1)
+                wT.start()
+                workerList.append(wT)
+        #
+        abortEvent = threading.Event()
+        feeder = threading.Thread(target=self.__feed, args=(dataList, queueList[0], abortEvent), daemon=True)
+        startTime = time.time()
+        feeder.start()
+        #
+        resultLists = [[] for _ in range(lastD["numResults"])]
+        failLists = [[] for _ in range(numStages)]
+        dS = MultiProcDiagSummary()
+        statsList = [[] for _ in range(numStages)]
+        endTimeList = [None] * numStages
+        ok = True
+        completed = False
+        numReports = 0
+        outDone = False
+        try:
+            while numReports < len(workerList) or not outDone:
+                if not outDone:
+                    try:
+                        outTup = queueList[-1].get(timeout=self.__pollInterval)
+                        if outTup is None:
+                            outDone = True
+                        else:
+                            for kk, rV in enumerate(outTup[: len(resultLists)]):
+                                resultLists[kk].extend(rV)
+                        continue
+                    except queue.Empty:
+                        pass
+                try:
+                    stageIndex, processName, failList, diagState, wStatsD = reportQueue.get(timeout=0.0 if not outDone else self.__pollInterval)
+                    numReports += 1
+                    failLists[stageIndex].extend(failList)
+                    dS.update(diagState)
+                    statsList[stageIndex].append(wStatsD)
+                    endTimeList[stageIndex] = time.time()
+                    logger.debug("%s completed", processName)
+                    continue
+                except queue.Empty:
+                    pass
+                if any([wT.exitcode not in [None, 0] for wT in workerList]):
+                    logger.error("Pipeline worker exited unexpectedly -- stopping the pipeline")
+                    ok = False
+                    break
+            completed = ok
+        finally:
+            abortEvent.set()
+            self.__stopWorkers(workerList, queueList + [reportQueue], timeout=self.__exitTimeout if completed else 0.0)
+        #
+        wallTime = time.time() - startTime
+        self.__stageStatsList = self.__getStageStats(statsList, endTimeList, startTime, wallTime)
+        for sD in self.__stageStatsList:
+            logger.debug("Stage %s %r", sD["name"], sD)
+        ok = ok and not any(failLists)
+        return ok, failLists, resultLists, dS.getDiagList()
+
+    def __feed(self, dataList, inQueue, abortEvent):
+        """Feed the input items in chunks to the first stage (blocking while the queue is full)."""
+        sD = self.__stageList[0]
+        chunkSize = sD["chunkSize"] if sD["chunkSize"] > 0 else max(1, -(-len(dataList) // sD["numProc"]))
+        taskList = [dataList[ii : ii + chunkSize] for ii in range(0, len(dataList), chunkSize)] + [None] * sD["numProc"]
+        for task in taskList:
+            while not abortEvent.is_set():
+                try:
+                    inQueue.put(task, timeout=self.__pollInterval)
+                    break
+                except queue.Full:
+                    continue
+
+    def __getStageStats(self, statsList, endTimeList, startTime, wallTime):
+        stageStatsList = []
+        for ii, sD in enumerate(self.__stageList):
+            tD = {"name": sD["name"], "numProc": sD["numProc"]}
+            for ky in ["chunks", "itemsIn", "itemsOut", "failures", "busyTime", "getWaitTime", "putWaitTime"]:
+                tD[ky] = sum([wD[ky] for wD in statsList[ii]])
+            tD["wallTime"] = (endTimeList[ii] - startTime) if endTimeList[ii] else wallTime
+            tD["throughput"] = tD["itemsIn"] / tD["wallTime"] if tD["wallTime"] > 0 else 0.0
+            tD["utilization"] = tD["busyTime"] / (sD["numProc"] * wallTime) if wallTime > 0 else 0.0
+            tD["bottleneck"] = False
+            stageStatsList.append(tD)
+        if stageStatsList:
+            max(stageStatsList, key=lambda tD: tD["utilization"])["bottleneck"] = True
+        return stageStatsList
+
+    def __stopWorkers(self, workerList, queueList, timeout):
+        """Reap the input workers -- workers that fail to exit within 'timeout' seconds are terminated."""
+        endTime = time.time() + timeout
+        for wT in workerList:
+            wT.join(max(0.0, endTime - time.time()))
+        for wT in workerList:
+            if wT.is_alive():
+                logger.debug("%s terminating", wT.name)
+                wT.terminate()
+                wT.join(1)
+        for qu in queueList:
+            qu.close()
+            qu.cancel_join_thread()
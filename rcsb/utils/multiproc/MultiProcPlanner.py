@@ -0,0 +1,151 @@
+##
+# File:    MultiProcPlanner.py
+# Author:  jdw
+# Date:    19-Oct-2026
+# Version: 0.001
+#
+# Updates:
+#
+##
+"""
+Run planning from sample measurements -- fitted per-item cost and per-chunk overhead, recommended
+worker count, chunk size and backend, and estimated wall time and peak memory.
+
+"""
+
+__docformat__ = "restructuredtext en"
+__author__ = "John Westbrook"
+__email__ = "john.westbrook@rcsb.org"
+__license__ = "Apache 2.0"
+
+# pylint: skip-file
+
+import logging
+import math
+
+logger = logging.getLogger(__name__)
+
+
+class MultiProcPlanner(object):
+    """Fit the timing and memory measurements of sample chunks and recommend run parameters.
+
+    The sample is run as chunks of increasing size so that the chunk time t(n) = overhead + n * perItem
+    and the chunk peak traced allocation m(n) = n * perItemMemory can be fitted.  For a run of N items on
+    p workers with chunks of c items the wall time is estimated as
+
+        p * startupTime + ceil(ceil(N / c) / p) * (overhead + c * perItem)
+
+    where the chunk size is the smallest keeping the per-chunk overhead below 'overheadFraction' of the
+    chunk time, bounded to provide at least 'chunksPerProc' chunks per worker for load balancing.
+    """
+
+    def __init__(self, overheadFraction=0.05, chunksPerProc=4, memoryFraction=0.9, minSpeedup=1.1, maxCv=0.5):
+        self.__overheadFraction = overheadFraction
+        self.__chunksPerProc = chunksPerProc
+        self.__memoryFraction = memoryFraction
+        self.__minSpeedup = minSpeedup
+        self.__maxCv = maxCv
+
+    def getSampleChunks(self, sampleList):
+        """Divide the sample into single item chunks (a quarter of the sample) followed by chunks of 2, 4, 8, ... items."""
+        numSingle = max(1, len(sampleList) // 4)
+        chunkList = [[item] for item in sampleList[:numSingle]]
+        ii = numSingle
+        size = 2
+        while ii < len(sampleList):
+            chunkList.append(sampleList[ii : ii + size])
+            ii += size
+            size *= 2
+        return chunkList
+
+    def fitLine(self, obsList):
+        """Least squares fit of y = a + b * n for the input observations [(n, y), ...] -- returns (a, b) with a, b >= 0."""
+        if not obsList:
+            return 0.0, 0.0
+        nList = [float(n) for n, _ in obsList]
+        yList = [float(y) for _, y in obsList]
+        nMean = sum(nList) / len(nList)
+        yMean = sum(yList) / len(yList)
+        sNN = sum([(n - nMean) ** 2 for n in nList])
+        if sNN <= 0.0:
+            return 0.0, max(0.0, yMean / nMean) if nMean else 0.0
+        b = sum([(n - nMean) * (y - yMean) for n, y in zip(nList, yList)]) / sNN
+        a = yMean - b * nMean
+        if b < 0.0:
+            return max(0.0, yMean), 0.0
+        if a < 0.0:
+            # no measurable overhead -- refit through the origin
+            return 0.0, sum([n * y for n, y in zip(nList, yList)]) / sum([n * n for n in nList])
+        return a, b
+
+    def fitSample(self, timeObsList, memoryObsList=None, startupTime=0.0, baseRss=None):
+        """Fit the sample measurements -- timeObsList [(chunk items, seconds), ...] and memoryObsList [(chunk items, peak traced bytes), ...].
+
+        Returns,  {"chunkOverhead", "perItemTime", "itemTimeCv", "perItemMemory", "startupTime", "baseRss"}
+        """
+        chunkOverhead, perItemTime = self.fitLine(timeObsList)
+        singleList = [max(0.0, t - chunkOverhead) for n, t in timeObsList if n == 1]
+        itemTimeCv = 0.0
+        if len(singleList) > 1 and sum(singleList) > 0.0:
+            mean = sum(singleList) / len(singleList)
+            itemTimeCv = math.sqrt(sum([(t - mean) ** 2 for t in singleList]) / (len(singleList) - 1)) / mean
+        perItemMemory = self.fitLine(memoryObsList)[1] if memoryObsList else 0.0
+        return {
+            "chunkOverhead": chunkOverhead,
+            "perItemTime": perItemTime,
+            "itemTimeCv": itemTimeCv,
+            "perItemMemory": perItemMemory,
+            "startupTime": max(0.0, startupTime),
+            "baseRss": baseRss,
+        }
+
+    def __getChunkSize(self, numItems, numProc, fitD):
+        chunkSize = numItems
+        if fitD["perItemTime"] > 0.0:
+            chunkSize = int(math.ceil(fitD["chunkOverhead"] / (self.__overheadFraction * fitD["perItemTime"])))
+        return max(1, min(chunkSize, numItems // (self.__chunksPerProc * numProc)))
+
+    def estimate(self, numItems, numProc, chunkSize, fitD):
+        """Return (wall time seconds, memory bytes per worker) for a run of 'numItems' on 'numProc' workers in chunks of 'chunkSize'."""
+        numChunks = int(math.ceil(float(numItems) / chunkSize))
+        wallTime = numProc * fitD["startupTime"] + math.ceil(float(numChunks) / numProc) * (fitD["chunkOverhead"] + chunkSize * fitD["perItemTime"])
+        memoryPerProc = (fitD["baseRss"] or 0) + chunkSize * fitD["perItemMemory"]
+        return wallTime, memoryPerProc
+
+    def recommend(self, numItems, fitD, maxProc, availMemory=None):
+        """Return the recommended run parameters for 'numItems' items on at most 'maxProc' workers -
+
+        {"numProc", "chunkSize", "backend" ('serial', 'process' (MultiProcUtil) or 'pool' (MultiProcPoolUtil)),
+         "estimatedWallTime", "estimatedSerialTime", "memoryPerProc", "peakMemory", "reason"}
+        """
+        serialTime = numItems * fitD["perItemTime"]
+        best = None
+        for numProc in range(1, max(1, min(maxProc, numItems)) + 1):
+            chunkSize = self.__getChunkSize(numItems, numProc, fitD)
+            wallTime, memoryPerProc = self.estimate(numItems, numProc, chunkSize, fitD)
+            if availMemory and numProc > 1 and numProc * memoryPerProc > self.__memoryFraction * availMemory:
+                break
+            if best is None or wallTime < best[0]:
+                best = (wallTime, numProc, chunkSize, memoryPerProc)
+        wallTime, numProc, chunkSize, memoryPerProc = best
+        if serialTime <= self.__minSpeedup * wallTime:
+            backend = "serial"
+            reason = "estimated parallel speedup below %.2f" % self.__minSpeedup
+            numProc, chunkSize, wallTime = 1, numItems, serialTime
+            memoryPerProc = (fitD["baseRss"] or 0) + numItems * fitD["perItemMemory"]
+        elif fitD["itemTimeCv"] > self.__maxCv:
+            backend = "process"
+            reason = "variable item cost (cv %.2f) -- paced chunk dispatch" % fitD["itemTimeCv"]
+        else:
+            backend = "pool"
+            reason = "uniform item cost (cv %.2f)" % fitD["itemTimeCv"]
+        return {
+            "numProc": numProc,
+            "chunkSize": chunkSize,
+            "backend": backend,
+            "estimatedWallTime": wallTime,
+            "estimatedSerialTime": serialTime,
+            "memoryPerProc": memoryPerProc,
+            "peakMemory": numProc * memoryPerProc,
+            "reason": reason,
+        }
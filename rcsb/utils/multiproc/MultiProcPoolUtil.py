@@ -6,6 +6,19 @@
 #
 # Updates:
 #  23-Mar-2019 jdw handle nonhashable data lists
+#  19-Oct-2026 jdw add container-aware worker count policy (affinity/cgroup quotas)
+#  19-Oct-2026 jdw add worker recycling after a fixed number of tasks
+#  19-Oct-2026 jdw add pluggable serializer for task and result payloads
+#  19-Oct-2026 jdw add optional compression of large result payloads and getRunStats()
+#  19-Oct-2026 jdw add spill-to-disk result accumulation (MultiProcResultStore)
+#  19-Oct-2026 jdw add worker-side reduction of chunk results (setReducer()) with a parent tree reduction
+#  19-Oct-2026 jdw count and deduplicate diagnostics in the workers (setDiagnostics())
+#  19-Oct-2026 jdw add runMap() applying a per-item function with per-item exception capture
+#  19-Oct-2026 jdw pass the pool process name to the worker method and set the run identifier, chunk index
+#                  and optionally the current item in the worker logging context
+#  19-Oct-2026 jdw add per-worker cProfile capture with a merged pstats report (setProfiling())
+#  19-Oct-2026 jdw add per-chunk memory profiling (tracemalloc peak, resident size growth, heaviest items) (setMemoryProfiling())
+#  19-Oct-2026 jdw limit native library threads in the pool processes to a per-worker thread budget by default (setThreadLimits())
 ##
 """
 Multiprocessing execution wrapper using process pools supporting tasks with list of inputs and a variable
@@ -22,13 +35,82 @@ __license__ = "Apache 2.0"
 
 import contextlib
 import logging
-from functools import partial
+import uuid
 
 import multiprocess as multiprocessing
 
+from rcsb.utils.multiproc.MultiProcDiagnostics import MultiProcDiagSummary
+from rcsb.utils.multiproc.MultiProcItemCall import MultiProcItemCall
+from rcsb.utils.multiproc.MultiProcListUtil import MultiProcListUtil
+from rcsb.utils.multiproc.MultiProcLogging import MultiProcLogContext
+from rcsb.utils.multiproc.MultiProcMemoryProfiler import MultiProcMemorySummary
+from rcsb.utils.multiproc.MultiProcMemoryProfiler import MultiProcMemoryTracker
+from rcsb.utils.multiproc.MultiProcProfiler import MultiProcProfileCall
+from rcsb.utils.multiproc.MultiProcProfiler import MultiProcProfiler
+from rcsb.utils.multiproc.MultiProcResourceUtil import MultiProcResourceUtil
+from rcsb.utils.multiproc.MultiProcResultStore import MultiProcResultStore
+from rcsb.utils.multiproc.MultiProcSerializer import MultiProcCompressingSerializer
+from rcsb.utils.multiproc.MultiProcSerializer import MultiProcSerializer
+
 logger = logging.getLogger(__name__)
 
 
+class MultiProcPoolCall(object):
+    """Callable wrapper applying the worker method to a chunk within a pool process.
+
+    With a serializer (resultSerializer), chunks arrive (results are returned) as serialized (data, bufferList) tuples.
+    With a reducer, the result lists of the chunk are returned as the single partial aggregate reduceFn(resultLists).
+    Diagnostics are returned as the plain form of a MultiProcDiagSummary built with the options in 'diagD'.
+
+    Tasks are (chunkId, dataList) tuples.  The worker method receives the name of the pool process (unless
+    'procName' is given) and the run identifier and chunk index are set in the logging context (MultiProcLogContext).
+    With 'memoryD' ({"topItems": n}), the memory measurement of the chunk (MultiProcMemoryTracker) is appended to the result tuple.
+    """
+
+    def __init__(
+        self, workerFunc, procName=None, optionsD=None, workingDir=".", serializer=None, resultSerializer=None, reduceFn=None, diagD=None, runId=None, memoryD=None
+    ):
+        self.__workerFunc = workerFunc
+        self.__procName = procName
+        self.__runId = runId
+        self.__memoryD = memoryD
+        self.__optionsD = optionsD if optionsD is not None else {}
+        self.__workingDir = workingDir
+        self.__serializer = serializer
+        self.__resultSerializer = resultSerializer
+        self.__reduceFn = reduceFn
+        self.__diagD = diagD if diagD is not None else {}
+
+    def __call__(self, task):
+        chunkId, dataList = task
+        MultiProcLogContext.set(runId=self.__runId, chunkId=chunkId)
+        try:
+            if self.__serializer is not None:
+                dataList = self.__serializer.loads(*dataList)
+            procName = self.__procName if self.__procName else multiprocessing.current_process().name
+            tracker = MultiProcMemoryTracker(topItems=self.__memoryD["topItems"]) if self.__memoryD else None
+            if tracker:
+                tracker.start()
+            rTup = self.__workerFunc(dataList=dataList, procName=procName, optionsD=self.__optionsD, workingDir=self.__workingDir)
+            if tracker:
+                memD = tracker.stop()
+                memD.update({"chunkId": chunkId, "items": len(dataList)})
+        finally:
+            MultiProcLogContext.set(chunkId=None)
+        dS = MultiProcDiagSummary(**self.__diagD)
+        dS.extend(rTup[-1])
+        if self.__reduceFn is not None:
+            rTup = (rTup[0], self.__reduceFn(list(rTup[1:-1])), dS.getState())
+        else:
+            rTup = tuple(rTup[:-1]) + (dS.getState(),)
+        if tracker:
+            rTup = tuple(rTup) + (memD,)
+        if self.__resultSerializer is not None:
+            data, bufferList = self.__resultSerializer.dumps(rTup)
+            return data, [bytes(buf) for buf in bufferList]
+        return rTup
+
+
 class MultiProcPoolUtil(object):
     def __init__(self, verbose=True):
         self.__verbose = verbose
@@ -37,6 +119,20 @@ class MultiProcPoolUtil(object):
         self.__workingDir = "."
         self.__loggingMP = True
         self.__sentinel = None
+        self.__numProcPolicyD = {"workload": "io", "memoryPerProc": 0}
+        self.__maxTasksPerWorker = None
+        self.__serializer = None
+        self.__compressionD = None
+        self.__resultSerializer = None
+        self.__runStatsD = {}
+        self.__spillDirPath = None
+        self.__reduceD = None
+        self.__diagD = {"keyFn": None, "maxKeys": 0, "maxSamples": 3}
+        self.__diagSummary = None
+        self.__logContextD = {"runId": None, "logItems": False}
+        self.__profileD = None
+        self.__memoryD = None
+        self.__threadLimitD = {"threadsPerProc": 0}
 
     def setOptions(self, optionsD):
         """A dictionary of options that is passed as an argument to the worker function"""
@@ -46,6 +142,130 @@ class MultiProcPoolUtil(object):
         """A working directory option that is passed as an argument to the worker function."""
         self.__workingDir = workingDir
 
+    def setNumProcPolicy(self, workload="io", memoryPerProc=0):
+        """Policy used to select the number of pool processes when numProc < 1.
+
+        workload:       'cpu' (one worker per available CPU) or 'io' (two workers per available CPU)
+        memoryPerProc:  expected peak memory per worker (bytes) used to cap the worker count (0 to ignore)
+
+        Available CPUs reflect the process affinity mask and any cgroup (v1/v2) CPU quota.
+        """
+        self.__numProcPolicyD = {"workload": workload, "memoryPerProc": memoryPerProc}
+
+    def setWorkerLimits(self, maxChunksPerWorker=0):
+        """Replace each pool process after it has completed 'maxChunksPerWorker' pool tasks (0 to disable).
+
+        Pool tasks are batches of 'poolChunkSize' chunks.  Resident size limits and memory budgets are
+        supported by MultiProcUtil() which controls dispatch directly.
+        """
+        self.__maxTasksPerWorker = maxChunksPerWorker if maxChunksPerWorker and maxChunksPerWorker > 0 else None
+
+    def setSerializer(self, serializer=None):
+        """Serializer for task and result payloads -
+
+        None or 'dill':  pickling provided by the multiprocess package (default)
+        'pickle':        stdlib pickle protocol 5 with out-of-band buffers
+        'auto':          stdlib pickle with a dill fallback (e.g. for closures)
+        codec object:    any object providing dumps(obj) and loads(data)
+        """
+        self.__serializer = MultiProcSerializer.create(serializer)
+
+    def setCompression(self, codec="zlib", threshold=65536, level=None):
+        """Compress serialized chunk results larger than 'threshold' bytes before they are returned
+        to the parent process ('zlib', 'lzma', 'bz2', an object providing compress()/decompress(),
+        or None to disable).  Compression statistics for the last run are reported by getRunStats().
+        """
+        self.__compressionD = {"codec": codec, "threshold": threshold, "level": level} if codec else None
+
+    def setResultSpill(self, dirPath=None):
+        """Accumulate result lists in on-disk segment files in 'dirPath' (None to disable).
+
+        The returned result lists are then MultiProcResultStore objects supporting len(), iteration
+        and indexing through memory-mapped reads.  Call remove() on each to delete the backing files.
+        """
+        self.__spillDirPath = dirPath
+
+    def setReducer(self, reduceFn=None, combineFn=None):
+        """Reduce chunk results within the pool processes (None to disable) -
+
+        reduceFn(resultLists) -> partial:          fold the 'numResults' result lists of a chunk into a partial aggregate
+        combineFn(partialA, partialB) -> partial:  merge two partial aggregates
+
+        Pool processes return one partial per chunk which are merged by pairwise (tree) reduction in the
+        parent.  The final aggregate is returned in place of the result lists.  MultiProcUtil() further
+        combines the partials within each worker process.
+        """
+        self.__reduceD = {"reduceFn": reduceFn, "combineFn": combineFn} if reduceFn else None
+
+    def setDiagnostics(self, keyFn=None, maxKeys=0, maxSamples=3):
+        """Diagnostics are counted within the pool processes and the counts merged in the parent -
+
+        keyFn:       optional function mapping a diagnostic to its aggregation key (e.g. a message template)
+        maxKeys:     maximum number of distinct keys retained for each chunk and in the parent (0 for no limit)
+        maxSamples:  maximum number of sample diagnostics retained per key (with keyFn)
+
+        runMulti() and runMultiAsync() return one diagnostic per key and getDiagnosticSummary() the occurrence counts.
+        """
+        self.__diagD = {"keyFn": keyFn, "maxKeys": maxKeys, "maxSamples": maxSamples}
+
+    def getDiagnosticSummary(self, maxReport=100):
+        """Return the diagnostic occurrence counts of the last run (at most 'maxReport' most frequent keys) -
+
+        {"total": occurrences, "distinct": keys, "overflow": occurrences beyond maxKeys,
+         "counts": [{"key": key, "count": count, "samples": [diagnostic, ...]}, ...]}
+        """
+        return self.__diagSummary.getSummary(maxReport=maxReport) if self.__diagSummary else None
+
+    def setLogContext(self, runId=None, logItems=False):
+        """Logging context set in the pool processes (see MultiProcLogContext) -
+
+        runId:     run identifier attached to worker log records (default a new identifier for each run)
+        logItems:  also attach the item being processed (runMap())
+        """
+        self.__logContextD = {"runId": runId, "logItems": logItems}
+
+    def setProfiling(self, profile=True, dirPath=None, topN=20, sortKey="cumulative"):
+        """Run the worker method under cProfile in each pool process (profile=False to disable) -
+
+        dirPath:  directory for the per-worker profiles mp-profile-<runId>-<pid>-*.prof (default the working directory)
+        topN:     number of functions (ordered by the pstats 'sortKey') reported
+
+        The worker profiles are merged after the run into mp-profile-<runId>.prof with the report of
+        the top functions in mp-profile-<runId>-report.txt (see getRunStats()).
+        """
+        self.__profileD = {"dirPath": dirPath, "topN": topN, "sortKey": sortKey} if profile else None
+
+    def setMemoryProfiling(self, profile=True, topItems=10):
+        """Measure the memory use of each chunk in the pool processes (profile=False to disable) -
+
+        the peak traced allocation (tracemalloc) and the resident size growth of each chunk and,
+        for runMap(), the 'topItems' items with the largest peak traced allocation (see getRunStats()).
+        """
+        self.__memoryD = {"topItems": topItems} if profile else None
+
+    def setThreadLimits(self, limit=True, threadsPerProc=0):
+        """Limit the threads of native libraries (OpenMP, MKL, OpenBLAS, numexpr) in each pool process
+        to avoid oversubscribing the CPUs with nested threading (enabled by default, limit=False to disable) -
+
+        threadsPerProc:  threads per pool process (0 for the available CPUs divided by the number of
+                         pool processes, at least 1)
+
+        The limits are applied by the pool process initializer (see MultiProcUtil.setThreadLimits()).
+        """
+        self.__threadLimitD = {"threadsPerProc": threadsPerProc} if limit else None
+
+    def getRunStats(self):
+        """Return a dictionary of statistics collected during the last run -
+
+        compression:  frames, compressedFrames, rawBytes, compressedBytes, ratio, compressTime, decompressTime
+        reduce:       partials (the number of partial aggregates merged in the parent)
+        runId:        the run identifier attached to worker log records
+        profile:      workers, statsPath, reportPath, top ([{function, ncalls, tottime, cumtime}, ...]) (setProfiling())
+        memory:       chunks, maxPeakTraced, meanPeakTraced, maxRssDelta, maxRss, chunkList, heaviestItems (setMemoryProfiling())
+        threadLimit:  threadsPerProc (setThreadLimits())
+        """
+        return self.__runStatsD
+
     def set(self, workerObj=None, workerMethod=None):
         """WorkerObject is the instance of object with method named workerMethod()
 
@@ -71,10 +291,28 @@ class MultiProcPoolUtil(object):
 
         Returns,   successFlag true|false
                    failList (data from the inut list that was not successfully processed)
-                   resultLists[numResults] --  numResults result lists
+                   resultLists[numResults] --  numResults result lists (or the reduced aggregate, see setReducer())
                    diagList --  unique list of diagnostics --
 
         """
+        return self.__runImap(self.__workerFunc, dataList, numProc=numProc, numResults=numResults, chunkSize=chunkSize)
+
+    def runMap(self, itemFn, dataList=None, numProc=0, numResults=1, chunkSize=10):
+        """Start  a pool of 'numProc' workers applying itemFn(item) to each item of the input dataList -
+
+        itemFn returns the single result value (numResults = 1) or a tuple of 'numResults' values.
+        Exceptions are captured per item: failing items are returned in the failList and the
+        exceptions are reported as '<exception type>: <message>' diagnostics.
+
+        Returns,   successFlag true|false
+                   failList (data from the input list that was not successfully processed)
+                   resultLists[numResults] --  numResults result lists (or the reduced aggregate, see setReducer())
+                   diagList --  unique list of diagnostics --
+        """
+        workerFunc = MultiProcItemCall(itemFn, numResults=numResults, logItems=self.__logContextD["logItems"])
+        return self.__runImap(workerFunc, dataList, numProc=numProc, numResults=numResults, chunkSize=chunkSize)
+
+    def __runImap(self, workerFunc, dataList, numProc=0, numResults=1, chunkSize=10):
         # ad hoc assignment base on limited timing tests
         poolChunkSize = 5
         failList = []
@@ -82,9 +320,8 @@ class MultiProcPoolUtil(object):
         successList = []
         diagList = []
         try:
-            procName = "worker"
             if numProc < 1:
-                numProc = multiprocessing.cpu_count() * 2
+                numProc = MultiProcResourceUtil().getNumProc(workload=self.__numProcPolicyD["workload"], memoryPerProc=self.__numProcPolicyD["memoryPerProc"])
 
             lenData = len(dataList)
             numProc = min(numProc, lenData)
@@ -101,26 +338,41 @@ class MultiProcPoolUtil(object):
                 logger.info("Running with numProc %d subtask count %d subtask length ~ %d", numProc, len(subLists), len(subLists[0]))
             #
             #
-            pFunc = partial(self.__workerFunc, procName=procName, optionsD=self.__optionsD, workingDir=self.__workingDir)
+            self.__runStatsD = {"runId": self.__logContextD["runId"] or uuid.uuid4().hex[:12]}
+            self.__resultSerializer = self.__serializer
+            if self.__compressionD:
+                self.__resultSerializer = MultiProcCompressingSerializer(serializer=self.__serializer, **self.__compressionD)
+            pFunc = MultiProcPoolCall(
+                self.__getProfileCall(workerFunc),
+                optionsD=self.__optionsD,
+                workingDir=self.__workingDir,
+                serializer=self.__serializer,
+                resultSerializer=self.__resultSerializer,
+                reduceFn=self.__reduceD["reduceFn"] if self.__reduceD else None,
+                diagD=self.__diagD,
+                runId=self.__runStatsD["runId"],
+                memoryD=self.__memoryD,
+            )
+            taskList = self.__dumpTasks(subLists)
             #
             # start pool of numProc worker processes
-            with contextlib.closing(multiprocessing.Pool(processes=numProc)) as pool:
+            with contextlib.closing(multiprocessing.Pool(processes=numProc, maxtasksperchild=self.__maxTasksPerWorker, **self.__getThreadInit(numProc))) as pool:
                 # retTupList = pool.map(pFunc, subLists)  # pylint: disable=no-member
-                retTupList = pool.imap_unordered(pFunc, subLists, chunksize=poolChunkSize)  # pylint: disable=no-member
+                retTupList = pool.imap_unordered(pFunc, taskList, chunksize=poolChunkSize)  # pylint: disable=no-member
                 # logger.info("Map completed result length %d %r", len(retTupList), type(retTupList))
 
             #
             logger.debug("rTup is %r", retTupList)
             #
-            retLists = [[] for ii in range(numResults)]
-            for retTup in retTupList:
-                successList.extend(retTup[0])
-                for ii in range(numResults):
-                    retLists[ii].extend(retTup[ii + 1])
-                diagList.extend(retTup[-1])
+            retLists, successList, diagList = self.__collectResults(retTupList, numResults)
+            # wait for the pool processes to exit normally (flushing their buffered log records)
+            pool.join()
+            self.__mergeProfiles()
+            if self.__compressionD:
+                self.__runStatsD["compression"] = self.__resultSerializer.getStats()
             #
 
-            logger.info("Input task length %d success length %d retLists len %d diagList len %d ", len(dataList), len(successList), len(retLists), len(diagList))
+            logger.info("Input task length %d success length %d numResults %d diagList len %d ", len(dataList), len(successList), numResults, len(diagList))
             #
 
             if len(dataList) == len(successList):
@@ -129,7 +381,7 @@ class MultiProcPoolUtil(object):
             else:
                 # logger.debug("data list %r", dataList[:4])
                 # logger.debug("successlist %r", successList[:4])
-                failList = list(set(dataList) - set(successList))
+                failList = MultiProcListUtil().diffList(dataList, successList)
                 logger.info("Incomplete run  - input task length %d success length %d fail list %d", len(dataList), len(successList), len(failList))
         except Exception as e:
             logger.exception("Failing with %s", str(e))
@@ -145,7 +397,7 @@ class MultiProcPoolUtil(object):
 
         Returns,   successFlag true|false
                    failList (data from the inut list that was not successfully processed)
-                   resultLists[numResults] --  numResults result lists
+                   resultLists[numResults] --  numResults result lists (or the reduced aggregate, see setReducer())
                    diagList --  unique list of diagnostics --
 
         """
@@ -156,9 +408,8 @@ class MultiProcPoolUtil(object):
         diagList = []
         failList = []
         try:
-            procName = "worker"
             if numProc < 1:
-                numProc = multiprocessing.cpu_count() * 2
+                numProc = MultiProcResourceUtil().getNumProc(workload=self.__numProcPolicyD["workload"], memoryPerProc=self.__numProcPolicyD["memoryPerProc"])
 
             lenData = len(dataList)
             #
@@ -176,25 +427,40 @@ class MultiProcPoolUtil(object):
                 logger.info("Running with numProc %d subtask count %d subtask length ~ %d", numProc, len(subLists), len(subLists[0]))
 
             #
-            pFunc = partial(self.__workerFunc, procName=procName, optionsD=self.__optionsD, workingDir=self.__workingDir)
+            self.__runStatsD = {"runId": self.__logContextD["runId"] or uuid.uuid4().hex[:12]}
+            self.__resultSerializer = self.__serializer
+            if self.__compressionD:
+                self.__resultSerializer = MultiProcCompressingSerializer(serializer=self.__serializer, **self.__compressionD)
+            pFunc = MultiProcPoolCall(
+                self.__getProfileCall(self.__workerFunc),
+                optionsD=self.__optionsD,
+                workingDir=self.__workingDir,
+                serializer=self.__serializer,
+                resultSerializer=self.__resultSerializer,
+                reduceFn=self.__reduceD["reduceFn"] if self.__reduceD else None,
+                diagD=self.__diagD,
+                runId=self.__runStatsD["runId"],
+                memoryD=self.__memoryD,
+            )
+            taskList = self.__dumpTasks(subLists)
             #
             # start pool of numProc worker processes
-            with contextlib.closing(multiprocessing.Pool(processes=numProc)) as pool:
-                aSyncMapResult = pool.map_async(pFunc, subLists, chunksize=poolChunkSize)  # pylint: disable=no-member
+            with contextlib.closing(multiprocessing.Pool(processes=numProc, maxtasksperchild=self.__maxTasksPerWorker, **self.__getThreadInit(numProc))) as pool:
+                aSyncMapResult = pool.map_async(pFunc, taskList, chunksize=poolChunkSize)  # pylint: disable=no-member
                 retTupList = aSyncMapResult.get()
 
             #
             logger.debug("rTup is %r", retTupList)
             #
-            retLists = [[] for ii in range(numResults)]
-            for retTup in retTupList:
-                successList.extend(retTup[0])
-                for ii in range(numResults):
-                    retLists[ii].extend(retTup[ii + 1])
-                diagList.extend(retTup[-1])
+            retLists, successList, diagList = self.__collectResults(retTupList, numResults)
+            # wait for the pool processes to exit normally (flushing their buffered log records)
+            pool.join()
+            self.__mergeProfiles()
+            if self.__compressionD:
+                self.__runStatsD["compression"] = self.__resultSerializer.getStats()
             #
 
-            logger.info("Input task length %d success length %d retLists len %d diagList len %d ", len(dataList), len(successList), len(retLists), len(diagList))
+            logger.info("Input task length %d success length %d numResults %d diagList len %d ", len(dataList), len(successList), numResults, len(diagList))
 
             #
             if len(dataList) == len(successList):
@@ -204,25 +470,80 @@ class MultiProcPoolUtil(object):
                 # logger.debug("data list %r " % dataList[:4])
                 # logger.debug("successlist %r " % successList[:4])
                 # failList = list(set(dataList) - set(successList))
-                failList = self.__diffList(dataList, successList)
+                failList = MultiProcListUtil().diffList(dataList, successList)
                 logger.info("Incomplete run  - input task length %d success length %d fail list %d", len(dataList), len(successList), len(failList))
         except Exception as e:
             logger.exception("Failing with %s", str(e))
         return False, failList, retLists, diagList
 
-    def __diffList(self, l1, l2):
-        """List difference -  elements in l1 not in l2"""
+    def __getThreadInit(self, numProc):
+        """Return the pool initializer arguments applying the thread limits to each pool process."""
+        if self.__threadLimitD is None:
+            return {}
+        rU = MultiProcResourceUtil()
+        threadsPerProc = self.__threadLimitD["threadsPerProc"]
+        numThreads = threadsPerProc or rU.getThreadBudget(numProc)
+        self.__runStatsD["threadLimit"] = {"threadsPerProc": numThreads}
+        return {"initializer": rU.limitThreads, "initargs": (numThreads, bool(threadsPerProc))}
+
+    def __getProfileCall(self, workerFunc):
+        if not self.__profileD:
+            return workerFunc
+        return MultiProcProfileCall(workerFunc, self.__profileD["dirPath"] or self.__workingDir, "mp-profile-%s" % self.__runStatsD["runId"])
+
+    def __mergeProfiles(self):
+        if not self.__profileD:
+            return
         try:
-            return list(set(l1) - set(l2))
-        except TypeError:
-            try:
-                idD1 = {id(t): ii for ii, t in enumerate(l1)}
-                idD2 = {id(t): ii for ii, t in enumerate(l2)}
-                idDifL = list(set(idD1.keys()) - set(idD2.keys()))
-                return [l1[idD1[ind]] for ind in idDifL]
-            except Exception as e:
-                logger.exception("Failing with %s", str(e))
+            pD = self.__profileD
+            dirPath = pD["dirPath"] or self.__workingDir
+            self.__runStatsD["profile"] = MultiProcProfiler().merge(dirPath, "mp-profile-%s" % self.__runStatsD["runId"], topN=pD["topN"], sortKey=pD["sortKey"])
         except Exception as e:
-            logger.exception("Failing with %s", str(e))
+            logger.exception("Profile merge failing with %s", str(e))
 
-        return []
+    def __collectResults(self, retTupList, numResults):
+        """Accumulate the input chunk results -- returns resultLists (or the reduced aggregate), successList, diagList"""
+        successList = []
+        partialList = []
+        dS = MultiProcDiagSummary(**self.__diagD)
+        retLists = self.__getResultLists(numResults)
+        memorySummary = MultiProcMemorySummary(topItems=self.__memoryD["topItems"]) if self.__memoryD else None
+        for retTup in retTupList:
+            retTup = self.__loadResult(retTup)
+            if memorySummary:
+                memorySummary.update(retTup[-1])
+                retTup = retTup[:-1]
+            successList.extend(retTup[0])
+            if self.__reduceD:
+                partialList.append(retTup[1])
+            else:
+                for ii in range(numResults):
+                    retLists[ii].extend(retTup[ii + 1])
+            dS.update(retTup[-1])
+        for retList in retLists:
+            if isinstance(retList, MultiProcResultStore):
+                retList.flush()
+        if self.__reduceD:
+            self.__runStatsD["reduce"] = {"partials": len(partialList)}
+            retLists = MultiProcListUtil().treeReduce(partialList, self.__reduceD["combineFn"])
+        if memorySummary:
+            self.__runStatsD["memory"] = memorySummary.getSummary()
+        self.__diagSummary = dS
+        return retLists, successList, dS.getDiagList()
+
+    def __getResultLists(self, numResults):
+        if self.__spillDirPath and not self.__reduceD:
+            return [MultiProcResultStore(self.__spillDirPath, name="result-%d" % ii) for ii in range(numResults)]
+        return [[] for ii in range(numResults)]
+
+    def __dumpTasks(self, subLists):
+        if self.__serializer is None:
+            return list(enumerate(subLists))
+        taskList = []
+        for chunkId, subList in enumerate(subLists):
+            data, bufferList = self.__serializer.dumps(subList)
+            taskList.append((chunkId, (data, [bytes(buf) for buf in bufferList])))
+        return taskList
+
+    def __loadResult(self, retTup):
+        return retTup if self.__resultSerializer is None else self.__resultSerializer.loads(*retTup)
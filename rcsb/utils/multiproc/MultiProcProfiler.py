@@ -0,0 +1,95 @@
+##
+# File:    MultiProcProfiler.py
+# Author:  jdw
+# Date:    19-Oct-2026
+# Version: 0.001
+#
+# Updates:
+#
+##
+"""
+Profiling of worker methods with cProfile in the worker processes and merged pstats reports.
+
+"""
+
+__docformat__ = "restructuredtext en"
+__author__ = "John Westbrook"
+__email__ = "john.westbrook@rcsb.org"
+__license__ = "Apache 2.0"
+
+# pylint: skip-file
+
+import cProfile
+import glob
+import io
+import logging
+import os
+import pstats
+import uuid
+
+logger = logging.getLogger(__name__)
+
+
+class MultiProcProfileCall(object):
+    """Worker method adapter running the worker method under cProfile --
+
+    The profile of all chunks processed by a process is accumulated and written after each chunk
+    to <dirPath>/<prefix>-<pid>-<token>.prof (pstats format).
+    """
+
+    __profileD = {}
+
+    def __init__(self, workerFunc, dirPath, prefix):
+        self.__workerFunc = workerFunc
+        self.__dirPath = dirPath
+        self.__prefix = prefix
+
+    def __getProfile(self):
+        # one profile per process (call instances may be copied for each task, e.g. by process pools)
+        pid, profile, filePath = self.__profileD.get(self.__prefix, (None, None, None))
+        if pid != os.getpid():
+            pid = os.getpid()
+            profile = cProfile.Profile()
+            filePath = os.path.join(self.__dirPath, "%s-%d-%s.prof" % (self.__prefix, pid, uuid.uuid4().hex[:8]))
+            self.__profileD[self.__prefix] = (pid, profile, filePath)
+        return profile, filePath
+
+    def __call__(self, dataList, procName, optionsD, workingDir):
+        profile, filePath = self.__getProfile()
+        profile.enable()
+        try:
+            return self.__workerFunc(dataList=dataList, procName=procName, optionsD=optionsD, workingDir=workingDir)
+        finally:
+            profile.disable()
+            profile.dump_stats(filePath)
+
+
+class MultiProcProfiler(object):
+    def merge(self, dirPath, prefix, topN=20, sortKey="cumulative"):
+        """Merge the worker profiles <dirPath>/<prefix>-*.prof into <dirPath>/<prefix>.prof and write the
+        report of the 'topN' functions (ordered by 'sortKey') to <dirPath>/<prefix>-report.txt.
+
+        Returns,  {"workers": profile files, "statsPath": merged profile, "reportPath": report,
+                   "top": [{"function": "file:line(name)", "ncalls": calls, "tottime": seconds, "cumtime": seconds}, ...]}
+                  or {} if there are no worker profiles
+        """
+        pathList = sorted(glob.glob(os.path.join(dirPath, prefix + "-*.prof")))
+        if not pathList:
+            return {}
+        stream = io.StringIO()
+        stats = pstats.Stats(pathList[0], stream=stream)
+        for filePath in pathList[1:]:
+            stats.add(filePath)
+        statsPath = os.path.join(dirPath, prefix + ".prof")
+        stats.dump_stats(statsPath)
+        stats.sort_stats(sortKey)
+        stats.print_stats(topN)
+        reportPath = os.path.join(dirPath, prefix + "-report.txt")
+        with open(reportPath, "w") as ofh:
+            ofh.write(stream.getvalue())
+        topList = []
+        for fcn in stats.fcn_list[:topN]:
+            _, nc, tt, ct, _ = stats.stats[fcn]
+            topList.append({"function": "%s:%d(%s)" % fcn, "ncalls": nc, "tottime": tt, "cumtime": ct})
+        logger.debug("Merged %d worker profiles into %s", len(pathList), statsPath)
+        return {"workers": len(pathList), "statsPath": statsPath, "reportPath": reportPath, "top": topList}
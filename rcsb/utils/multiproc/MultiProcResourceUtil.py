@@ -0,0 +1,279 @@
+##
+# File:    MultiProcResourceUtil.py
+# Author:  jdw
+# Date:    19-Oct-2026
+# Version: 0.001
+#
+# Updates:
+#  19-Oct-2026 jdw add process resident set size lookup
+#  19-Oct-2026 jdw add per-worker thread budgets and native library thread limits
+##
+"""
+Utilities to detect the effective compute and memory budget available to this process
+(affinity mask, cgroup v1/v2 quotas), to select a worker count for multiprocessing runs and to limit
+the threads of native libraries within worker processes.
+
+"""
+
+__docformat__ = "restructuredtext en"
+__author__ = "John Westbrook"
+__email__ = "john.westbrook@rcsb.org"
+__license__ = "Apache 2.0"
+
+# pylint: skip-file
+
+import logging
+import math
+import os
+import sys
+import time
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+try:
+    import threadpoolctl
+except ImportError:
+    threadpoolctl = None
+
+logger = logging.getLogger(__name__)
+
+
+class MultiProcResourceUtil(object):
+    """Detect the CPU and memory budget of the current process and recommend a worker count.
+
+    Workload types -
+
+        cpu:  one worker per available CPU
+        io:   'ioFactor' workers per available CPU (the historical cpu_count() * 2 default)
+    """
+
+    threadLimitVars = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS", "NUMEXPR_NUM_THREADS")
+
+    def __init__(self, cgroupRoot="/sys/fs/cgroup", procRoot="/proc"):
+        self.__cgroupRoot = cgroupRoot
+        self.__procRoot = procRoot
+
+    def getAffinityCpuCount(self):
+        """Return the number of CPUs in the scheduling affinity mask of this process."""
+        try:
+            return len(os.sched_getaffinity(0))
+        except (AttributeError, OSError):
+            return os.cpu_count() or 1
+
+    def getCgroupCpuLimit(self):
+        """Return the cgroup CPU quota as a (possibly fractional) number of CPUs or None if unlimited."""
+        # cgroup v2 -
+        for dirPath in self.__getCgroupDirs(""):
+            tS = self.__readText(os.path.join(dirPath, "cpu.max"))
+            if tS:
+                fL = tS.split()
+                if fL[0] == "max":
+                    return None
+                try:
+                    quota = int(fL[0])
+                    period = int(fL[1]) if len(fL) > 1 else 100000
+                    if quota > 0 and period > 0:
+                        return float(quota) / float(period)
+                except ValueError:
+                    pass
+                return None
+        # cgroup v1 -
+        for dirPath in self.__getCgroupDirs("cpu"):
+            quota = self.__readInt(os.path.join(dirPath, "cpu.cfs_quota_us"))
+            if quota is None:
+                continue
+            period = self.__readInt(os.path.join(dirPath, "cpu.cfs_period_us"))
+            if quota > 0 and period and period > 0:
+                return float(quota) / float(period)
+            return None
+        return None
+
+    def getEffectiveCpuCount(self):
+        """Return the number of CPUs this process may actually use (affinity mask and cgroup quota)."""
+        numCpu = self.getAffinityCpuCount()
+        cpuLimit = self.getCgroupCpuLimit()
+        if cpuLimit is not None:
+            numCpu = min(numCpu, int(math.ceil(cpuLimit)))
+        return max(1, numCpu)
+
+    def getAvailableMemory(self):
+        """Return the memory (bytes) available to this process considering cgroup limits and system memory, or None."""
+        availL = []
+        # cgroup v2 -
+        for dirPath in self.__getCgroupDirs(""):
+            limit = self.__readInt(os.path.join(dirPath, "memory.max"))
+            if limit is not None:
+                usage = self.__readInt(os.path.join(dirPath, "memory.current")) or 0
+                availL.append(max(0, limit - usage))
+                break
+        # cgroup v1 -
+        if not availL:
+            for dirPath in self.__getCgroupDirs("memory"):
+                limit = self.__readInt(os.path.join(dirPath, "memory.limit_in_bytes"))
+                # unlimited v1 cgroups report a page-rounded maximum integer
+                if limit is not None and limit < 2**60:
+                    usage = self.__readInt(os.path.join(dirPath, "memory.usage_in_bytes")) or 0
+                    availL.append(max(0, limit - usage))
+                    break
+        #
+        memAvail = self.__getMemInfoAvailable()
+        if memAvail is not None:
+            availL.append(memAvail)
+        return min(availL) if availL else None
+
+    def getProcessRss(self, pid=None):
+        """Return the resident set size (bytes) of the input process (default current process) or None if not available.
+
+        On platforms without /proc the peak resident size of the current process is returned.
+        """
+        pidS = str(pid) if pid else "self"
+        tS = self.__readText(os.path.join(self.__procRoot, pidS, "statm"))
+        if tS:
+            try:
+                return int(tS.split()[1]) * os.sysconf("SC_PAGE_SIZE")
+            except (IndexError, ValueError, OSError):
+                pass
+        if (pid is None or pid == os.getpid()) and resource is not None:
+            maxRss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            # kilobytes on Linux and bytes on macOS
+            return maxRss if sys.platform == "darwin" else maxRss * 1024
+        return None
+
+    def getNumProc(self, workload="io", memoryPerProc=0, ioFactor=2, maxProc=None):
+        """Return a recommended worker count for the input workload type ('cpu' or 'io').
+
+        Args:
+            workload (str): 'cpu' for compute-bound or 'io' for I/O-bound worker methods
+            memoryPerProc (int): expected peak memory (bytes) per worker used to cap the worker count (0 to ignore)
+            ioFactor (int): workers per CPU for I/O-bound workloads
+            maxProc (int): optional upper bound on the returned worker count
+
+        Returns:
+            int: recommended number of worker processes
+        """
+        numCpu = self.getEffectiveCpuCount()
+        if workload == "cpu":
+            numProc = numCpu
+        elif workload == "io":
+            numProc = numCpu * max(1, int(ioFactor))
+        else:
+            logger.warning("Unknown workload type %r using 'io'", workload)
+            numProc = numCpu * max(1, int(ioFactor))
+        #
+        if memoryPerProc and memoryPerProc > 0:
+            memAvail = self.getAvailableMemory()
+            if memAvail is not None:
+                numProc = min(numProc, int(memAvail / memoryPerProc))
+        if maxProc:
+            numProc = min(numProc, maxProc)
+        numProc = max(1, numProc)
+        logger.debug("Workload %s effective CPUs %d recommended numProc %d", workload, numCpu, numProc)
+        return numProc
+
+    def getThreadBudget(self, numProc):
+        """Return the number of native library threads per worker for 'numProc' workers sharing the available CPUs (at least 1)."""
+        return max(1, self.getEffectiveCpuCount() // max(1, int(numProc)))
+
+    def limitThreads(self, numThreads, override=False):
+        """Limit the thread pools of native libraries (OpenMP, MKL, OpenBLAS, numexpr) in the current process to 'numThreads'.
+
+        The thread count environment variables are set for libraries loaded later (variables already set
+        in the environment are kept unless 'override'), and the thread pools of libraries already loaded
+        are resized when threadpoolctl is available.
+
+        Returns:
+            dict: {variable: value} for the thread count environment variables in effect
+        """
+        for var in self.threadLimitVars:
+            if override or var not in os.environ:
+                os.environ[var] = str(numThreads)
+        if threadpoolctl is not None:
+            try:
+                threadpoolctl.threadpool_limits(limits=numThreads)
+            except Exception as e:
+                logger.debug("Thread pool limits failing with %s", str(e))
+        return {var: os.environ[var] for var in self.threadLimitVars}
+
+    def calibrateNumProc(self, runFunc, candidateList, minGain=0.05):
+        """Select a worker count by briefly measuring throughput at each candidate count.
+
+        Args:
+            runFunc (callable): runFunc(numProc) processes a fixed sample and returns the number of items processed
+            candidateList (list): worker counts to measure (in increasing order)
+            minGain (float): fractional throughput gain required to prefer a larger worker count
+
+        Returns:
+            (int, dict): selected worker count, {numProc: items/second}
+        """
+        rateD = {}
+        bestNumProc = None
+        bestRate = 0.0
+        for numProc in sorted(set([max(1, int(nP)) for nP in candidateList])):
+            try:
+                startTime = time.time()
+                numItems = runFunc(numProc)
+                rate = float(numItems) / max(time.time() - startTime, 1.0e-6)
+            except Exception as e:
+                logger.exception("Calibration with numProc %d failing with %s", numProc, str(e))
+                continue
+            rateD[numProc] = rate
+            logger.debug("Calibration numProc %d rate %.2f items/s", numProc, rate)
+            if bestNumProc is None or rate > bestRate * (1.0 + minGain):
+                bestNumProc = numProc
+                bestRate = rate
+        return (bestNumProc if bestNumProc else 1), rateD
+
+    def __getCgroupDirs(self, controller):
+        """Return candidate cgroup directories for the input controller ('' for the cgroup v2 unified hierarchy)."""
+        dirL = []
+        tS = self.__readText(os.path.join(self.__procRoot, "self", "cgroup"))
+        for line in (tS or "").splitlines():
+            fL = line.split(":", 2)
+            if len(fL) != 3:
+                continue
+            controllerL = fL[1].split(",") if fL[1] else [""]
+            if controller in controllerL:
+                relPath = fL[2].lstrip("/")
+                if controller:
+                    for subDir in [",".join(controllerL), controller]:
+                        dirL.append(os.path.join(self.__cgroupRoot, subDir, relPath))
+                else:
+                    dirL.append(os.path.join(self.__cgroupRoot, relPath))
+        # container namespaces typically expose their own cgroup at the root of the mount
+        if controller:
+            dirL.append(os.path.join(self.__cgroupRoot, controller))
+        else:
+            dirL.append(self.__cgroupRoot)
+        return [dirPath for dirPath in dirL if os.path.isdir(dirPath)]
+
+    def __getMemInfoAvailable(self):
+        tS = self.__readText(os.path.join(self.__procRoot, "meminfo"))
+        for line in (tS or "").splitlines():
+            if line.startswith("MemAvailable:"):
+                try:
+                    return int(line.split()[1]) * 1024
+                except (IndexError, ValueError):
+                    return None
+        try:
+            return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+        except (AttributeError, ValueError, OSError):
+            return None
+
+    def __readText(self, filePath):
+        try:
+            with open(filePath, "r", encoding="utf-8") as ifh:
+                return ifh.read().strip()
+        except (IOError, OSError):
+            return None
+
+    def __readInt(self, filePath):
+        tS = self.__readText(filePath)
+        if tS is None:
+            return None
+        try:
+            return int(tS.split()[0])
+        except (IndexError, ValueError):
+            return None
@@ -0,0 +1,81 @@
+##
+# File:    MultiProcResultColumns.py
+# Author:  jdw
+# Date:    19-Oct-2026
+# Version: 0.001
+#
+# Updates:
+#
+##
+"""
+Typed numeric result columns -- per-item results packed as NumPy arrays in the worker processes and
+written by item index into arrays preallocated in the parent.
+
+"""
+
+__docformat__ = "restructuredtext en"
+__author__ = "John Westbrook"
+__email__ = "john.westbrook@rcsb.org"
+__license__ = "Apache 2.0"
+
+# pylint: skip-file
+
+import logging
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+logger = logging.getLogger(__name__)
+
+
+class MultiProcResultColumns(object):
+    """Result slots declared as typed numeric columns -
+
+    columnD:  {result index: dtype or (dtype, shape)} where shape is the per-item value shape
+              (default () for scalars, e.g. (3,) for fixed-length vectors)
+
+    A column result list holds one value per successful item of a chunk (in success list order).
+    Workers pack the list as an array of shape (items,) + shape with pack(), and the parent writes
+    the packed rows into the preallocated column arrays at the input item indices with store().
+    Rows of items that are not processed successfully keep the fill value (NaN for floating point
+    dtypes and 0 otherwise).
+    """
+
+    def __init__(self, columnD):
+        if np is None:
+            raise ImportError("Typed result columns require numpy")
+        self.__columnD = {}
+        for ii, spec in columnD.items():
+            dtype, shape = spec if isinstance(spec, (tuple, list)) else (spec, ())
+            shape = (shape,) if isinstance(shape, int) else tuple(shape)
+            self.__columnD[int(ii)] = (np.dtype(dtype), shape)
+
+    def getIndices(self):
+        """Return the sorted result indices of the column slots."""
+        return sorted(self.__columnD)
+
+    def pack(self, rTup):
+        """Return the input worker result tuple with the column result lists packed as arrays (worker side)."""
+        rL = list(rTup)
+        for ii, (dtype, shape) in self.__columnD.items():
+            rL[ii + 1] = np.asarray(rL[ii + 1] if rL[ii + 1] is not None else [], dtype=dtype).reshape((-1,) + shape)
+        return tuple(rL)
+
+    def allocate(self, numItems):
+        """Return {result index: array of shape (numItems,) + shape} initialized to the fill values."""
+        arrayD = {}
+        for ii, (dtype, shape) in self.__columnD.items():
+            fill = np.nan if np.issubdtype(dtype, np.inexact) else 0
+            arrayD[ii] = np.full((numItems,) + shape, fill, dtype=dtype)
+        return arrayD
+
+    def store(self, arrayD, indexList, rTup):
+        """Write the packed column rows of the input chunk result tuple at the item indices 'indexList'."""
+        indexArr = np.asarray(indexList, dtype=np.intp)
+        for ii in self.__columnD:
+            values = rTup[ii + 1]
+            if len(values) != len(indexArr):
+                raise ValueError("Result column %d returned %d values for %d successful items" % (ii, len(values), len(indexArr)))
+            arrayD[ii][indexArr] = values
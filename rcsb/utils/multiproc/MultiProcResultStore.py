@@ -0,0 +1,157 @@
+##
+# File:    MultiProcResultStore.py
+# Author:  jdw
+# Date:    19-Oct-2026
+# Version: 0.001
+#
+# Updates:
+#
+##
+"""
+Append-only on-disk result list with lazy, memory-mapped read access.
+
+Items are pickled and appended to a data segment file, and the end offset of each item is
+appended to an index file (little-endian int64).  Reads memory-map both files so that the
+resident size of the owning process does not grow with the number of stored items.
+
+"""
+
+__docformat__ = "restructuredtext en"
+__author__ = "John Westbrook"
+__email__ = "john.westbrook@rcsb.org"
+__license__ = "Apache 2.0"
+
+# pylint: skip-file
+
+import logging
+import mmap
+import os
+import pickle
+import struct
+import uuid
+
+try:
+    from collections.abc import Sequence
+except ImportError:
+    from collections import Sequence
+
+logger = logging.getLogger(__name__)
+
+
+class MultiProcResultStore(Sequence):
+    """Lazy sequence backed by an append-only data segment and offset index stored in 'dirPath'.
+
+    Supports extend()/append() while writing and len(), iteration and indexing (including slices)
+    while reading.  Call remove() to delete the backing files when the results are no longer needed.
+    """
+
+    __offset = struct.Struct("<q")
+
+    def __init__(self, dirPath, name=None):
+        if not os.path.isdir(dirPath):
+            os.makedirs(dirPath)
+        name = name if name else "results"
+        baseName = "%s-%s" % (name, uuid.uuid4().hex[:12])
+        self.__dataPath = os.path.join(dirPath, baseName + ".dat")
+        self.__indexPath = os.path.join(dirPath, baseName + ".idx")
+        self.__dataFh = open(self.__dataPath, "wb")
+        self.__indexFh = open(self.__indexPath, "wb")
+        self.__count = 0
+        self.__size = 0
+        self.__dataMap = None
+        self.__indexMap = None
+
+    def getFilePaths(self):
+        """Return the paths of the data segment and index files."""
+        return self.__dataPath, self.__indexPath
+
+    def append(self, item):
+        self.extend([item])
+
+    def extend(self, itemList):
+        """Append the input items to the data segment."""
+        self.__closeMaps()
+        if self.__dataFh is None:
+            self.__dataFh = open(self.__dataPath, "ab")
+            self.__indexFh = open(self.__indexPath, "ab")
+        bufL = []
+        offL = []
+        for item in itemList:
+            buf = pickle.dumps(item, protocol=pickle.HIGHEST_PROTOCOL)
+            self.__size += len(buf)
+            bufL.append(buf)
+            offL.append(self.__offset.pack(self.__size))
+        self.__dataFh.write(b"".join(bufL))
+        self.__indexFh.write(b"".join(offL))
+        self.__count += len(bufL)
+
+    def flush(self):
+        """Complete pending writes -- the store is subsequently read through memory maps."""
+        if self.__dataFh is not None:
+            self.__dataFh.close()
+            self.__indexFh.close()
+            self.__dataFh = None
+            self.__indexFh = None
+
+    def close(self):
+        self.flush()
+        self.__closeMaps()
+
+    def remove(self):
+        """Close and delete the backing files."""
+        self.close()
+        for filePath in [self.__dataPath, self.__indexPath]:
+            try:
+                os.remove(filePath)
+            except OSError:
+                pass
+        self.__count = 0
+        self.__size = 0
+
+    def __closeMaps(self):
+        if self.__dataMap is not None:
+            for mObj in [self.__dataMap, self.__indexMap]:
+                if isinstance(mObj, mmap.mmap):
+                    mObj.close()
+            self.__dataMap = None
+            self.__indexMap = None
+
+    def __openMaps(self):
+        if self.__dataMap is None:
+            self.flush()
+            with open(self.__dataPath, "rb") as ifh:
+                self.__dataMap = mmap.mmap(ifh.fileno(), 0, access=mmap.ACCESS_READ) if self.__size else b""
+            with open(self.__indexPath, "rb") as ifh:
+                self.__indexMap = mmap.mmap(ifh.fileno(), 0, access=mmap.ACCESS_READ) if self.__count else b""
+
+    def __len__(self):
+        return self.__count
+
+    def __getItem(self, ii):
+        start = self.__offset.unpack_from(self.__indexMap, (ii - 1) * self.__offset.size)[0] if ii > 0 else 0
+        end = self.__offset.unpack_from(self.__indexMap, ii * self.__offset.size)[0]
+        return pickle.loads(self.__dataMap[start:end])
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[ii] for ii in range(*index.indices(self.__count))]
+        if index < 0:
+            index += self.__count
+        if index < 0 or index >= self.__count:
+            raise IndexError("result index out of range")
+        self.__openMaps()
+        return self.__getItem(index)
+
+    def __iter__(self):
+        self.__openMaps()
+        for ii in range(self.__count):
+            yield self.__getItem(ii)
+
+    def __repr__(self):
+        return "MultiProcResultStore(%r, length=%d)" % (self.__dataPath, self.__count)
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
@@ -0,0 +1,309 @@
+##
+# File:    MultiProcTaskGraph.py
+# Author:  jdw
+# Date:    19-Oct-2026
+# Version: 0.001
+#
+# Updates:
+#
+##
+"""
+Dependency-aware scheduling of a graph of tasks on a set of worker processes.
+
+Tasks declare the tasks they depend on and are dispatched as soon as all of their dependencies
+have completed, so independent branches of the graph proceed without the phase barriers of a
+sequence of runMulti() calls.  Among runnable tasks, those with higher user priority and then
+those with more (transitive) dependent tasks are dispatched first to shorten the critical path.
+
+"""
+
+__docformat__ = "restructuredtext en"
+__author__ = "John Westbrook"
+__email__ = "john.westbrook@rcsb.org"
+__license__ = "Apache 2.0"
+
+# pylint: skip-file
+
+import heapq
+import logging
+import time
+
+import multiprocess as multiprocessing
+import multiprocess.connection
+
+from rcsb.utils.multiproc.MultiProcDiagnostics import MultiProcDiagSummary
+from rcsb.utils.multiproc.MultiProcUtil import MultiProcWorker
+
+logger = logging.getLogger(__name__)
+
+
+class MultiProcTaskCall(object):
+    """Worker method adapter executing task specifications (taskId, func, args, kwargs) --
+
+    Returns the completed task identifiers, the task return values and '<exception type>: <message>'
+    diagnostics for tasks raising exceptions.
+    """
+
+    def __call__(self, dataList, procName, optionsD, workingDir):
+        _ = optionsD
+        _ = workingDir
+        successList = []
+        retList = []
+        diagList = []
+        for taskId, func, args, kwargs in dataList:
+            try:
+                rV = func(*args, **kwargs)
+            except Exception as e:
+                logger.debug("%s task %r failing with %s", procName, taskId, str(e))
+                diagList.append("%s: %s" % (type(e).__name__, str(e)))
+                continue
+            successList.append(taskId)
+            retList.append(rV)
+        return successList, retList, diagList
+
+
+class MultiProcTaskGraph(object):
+    """Run a graph of dependent tasks on 'numProc' worker processes.
+
+    Example -
+
+        tg = MultiProcTaskGraph(numProc=8)
+        tg.addTask("ccd", buildChemCompIndex)
+        for entryId in entryIdList:
+            tg.addTask(entryId, processEntry, args=(entryId,), dependsOn=["ccd"], passInputs=True)
+        ok, resultD, failD = tg.run()
+    """
+
+    def __init__(self, numProc=4, verbose=True):
+        self.__numProc = max(1, numProc)
+        self.__verbose = verbose
+        self.__taskD = {}
+        self.__pollInterval = 0.5
+        self.__exitTimeout = 10.0
+        self.__unstartedTimeout = 5.0
+        self.__statsD = {}
+
+    def addTask(self, taskId, func, args=(), kwargs=None, dependsOn=None, priority=0, passInputs=False):
+        """Add a task calling func(*args, **kwargs) once all tasks in 'dependsOn' have completed.
+
+        priority:    tasks with larger values are dispatched first among runnable tasks
+        passInputs:  pass the return values of the dependencies as the keyword argument
+                     inputD={dependencyTaskId: returnValue, ...}
+        """
+        if taskId in self.__taskD:
+            raise ValueError("Duplicate task %r" % (taskId,))
+        self.__taskD[taskId] = {
+            "func": func,
+            "args": tuple(args),
+            "kwargs": dict(kwargs) if kwargs else {},
+            "dependsOn": list(dependsOn) if dependsOn else [],
+            "priority": priority,
+            "passInputs": passInputs,
+        }
+
+    def getStats(self):
+        """Return statistics for the last run -
+
+        tasks, completed, failed, skipped, wallTime, busyTime (summed task execution time) and
+        utilization (busyTime / (numProc * wallTime)).
+        """
+        return self.__statsD
+
+    def __getOrder(self):
+        """Check the graph and return {taskId: number of transitive dependents} -- raises ValueError
+        for unknown dependencies and cycles.
+        """
+        childD = {taskId: [] for taskId in self.__taskD}
+        numDepD = {}
+        for taskId, tD in self.__taskD.items():
+            for depId in tD["dependsOn"]:
+                if depId not in self.__taskD:
+                    raise ValueError("Task %r depends on unknown task %r" % (taskId, depId))
+                childD[depId].append(taskId)
+            numDepD[taskId] = len(set(tD["dependsOn"]))
+        # topological order (Kahn)
+        orderList = [taskId for taskId, numDep in numDepD.items() if numDep == 0]
+        for taskId in orderList:
+            for childId in set(childD[taskId]):
+                numDepD[childId] -= 1
+                if numDepD[childId] == 0:
+                    orderList.append(childId)
+        if len(orderList) < len(self.__taskD):
+            raise ValueError("Task graph contains a cycle among %r" % sorted([taskId for taskId, numDep in numDepD.items() if numDep > 0], key=str))
+        descendantD = {}
+        for taskId in reversed(orderList):
+            dS = set()
+            for childId in childD[taskId]:
+                dS.add(childId)
+                dS |= descendantD[childId]
+            descendantD[taskId] = dS
+        return childD, {taskId: len(dS) for taskId, dS in descendantD.items()}
+
+    def run(self):
+        """Run all tasks.
+
+        Returns,   successFlag true|false
+                   resultD  {taskId: return value} for completed tasks
+                   failD    {taskId: reason} for failed tasks and tasks skipped after a failed dependency
+        """
+        childD, weightD = self.__getOrder()
+        waitD = {taskId: set(tD["dependsOn"]) for taskId, tD in self.__taskD.items()}
+        readyL = []
+        seq = 0
+        for taskId, depS in waitD.items():
+            if not depS:
+                heapq.heappush(readyL, (-self.__taskD[taskId]["priority"], -weightD[taskId], seq, taskId))
+                seq += 1
+        #
+        resultD = {}
+        failD = {}
+        numTasks = len(self.__taskD)
+        numProc = min(self.__numProc, numTasks)
+        taskQueue = multiprocessing.Queue()
+        connD = {}
+        activeD = {}
+        startD = {}
+        taskIdList = list(self.__taskD)
+        indexD = {taskId: ii for ii, taskId in enumerate(taskIdList)}
+        busyTime = 0.0
+        numOutstanding = 0
+        unstartedD = {}
+        lostS = set()
+        numSilentExits = 0
+        startTime = time.time()
+        lastEventTime = startTime
+
+        def startWorker():
+            reader, writer = multiprocessing.Pipe(duplex=False)
+            wT = MultiProcWorker(taskQueue, writer, MultiProcTaskCall(), verbose=self.__verbose)
+            wT.start()
+            writer.close()
+            connD[reader] = wT
+
+        def finish(taskId, ok, value):
+            waitD.pop(taskId, None)
+            if ok:
+                resultD[taskId] = value
+                for childId in childD[taskId]:
+                    depS = waitD.get(childId)
+                    if depS is not None and taskId in depS:
+                        depS.discard(taskId)
+                        if not depS:
+                            heapq.heappush(readyL, (-self.__taskD[childId]["priority"], -weightD[childId], indexD[childId], childId))
+                return
+            failD[taskId] = value
+            # skip all tasks depending on the failed task
+            skipL = list(childD[taskId])
+            while skipL:
+                childId = skipL.pop()
+                if childId in waitD and childId not in failD:
+                    waitD.pop(childId)
+                    failD[childId] = "skipped: dependency %r failed" % (taskId,)
+                    skipL.extend(childD[childId])
+
+        try:
+            for _ in range(numProc):
+                startWorker()
+            while len(resultD) + len(failD) < numTasks:
+                while readyL and numOutstanding < 2 * numProc:
+                    taskId = heapq.heappop(readyL)[-1]
+                    tD = self.__taskD[taskId]
+                    kwargs = dict(tD["kwargs"])
+                    if tD["passInputs"]:
+                        kwargs["inputD"] = {depId: resultD[depId] for depId in tD["dependsOn"]}
+                    taskQueue.put((indexD[taskId], [(taskId, tD["func"], tD["args"], kwargs)]))
+                    unstartedD[indexD[taskId]] = True
+                    numOutstanding += 1
+                    lastEventTime = time.time()
+                #
+                if numSilentExits and unstartedD and not activeD and time.time() - lastEventTime > self.__unstartedTimeout:
+                    # the outstanding tasks were taken by workers that died before reporting them
+                    for chunkId in sorted(unstartedD):
+                        lostS.add(chunkId)
+                        numOutstanding -= 1
+                        finish(taskIdList[chunkId], False, "WorkerExit: worker process exited")
+                    unstartedD = {}
+                    numSilentExits = 0
+                #
+                for reader in multiprocessing.connection.wait(list(connD.keys()), timeout=self.__pollInterval):
+                    lastEventTime = time.time()
+                    wT = connD[reader]
+                    try:
+                        msgType, chunkId, processName, payload = reader.recv()
+                    except EOFError:
+                        wT.join(1)
+                        logger.error("%s exited unexpectedly with code %r", wT.name, wT.exitcode)
+                        reader.close()
+                        del connD[reader]
+                        if wT.name in activeD:
+                            taskId = taskIdList[activeD.pop(wT.name)]
+                            numOutstanding -= 1
+                            finish(taskId, False, "WorkerExit: worker process exited")
+                        else:
+                            numSilentExits += 1
+                        if len(resultD) + len(failD) < numTasks:
+                            startWorker()
+                        continue
+                    if chunkId in lostS:
+                        # a task already reported as lost was taken after all -- its result is ignored
+                        if msgType == "result":
+                            activeD.pop(processName, None)
+                        continue
+                    if msgType == "start":
+                        unstartedD.pop(chunkId, None)
+                        activeD[processName] = chunkId
+                        startD[chunkId] = payload
+                    elif msgType == "result":
+                        activeD.pop(processName, None)
+                        numOutstanding -= 1
+                        busyTime += time.time() - startD.pop(chunkId, time.time())
+                        taskId = taskIdList[chunkId]
+                        if payload[0]:
+                            finish(taskId, True, payload[1][0])
+                        else:
+                            dS = MultiProcDiagSummary()
+                            dS.update(payload[-1])
+                            finish(taskId, False, "; ".join([str(diag) for diag in dS.getDiagList()]))
+                    elif msgType == "exit":
+                        reader.close()
+                        del connD[reader]
+                        wT.join(1)
+        finally:
+            self.__stopWorkers(taskQueue, connD)
+        #
+        wallTime = time.time() - startTime
+        numSkipped = len([reason for reason in failD.values() if str(reason).startswith("skipped:")])
+        self.__statsD = {
+            "tasks": numTasks,
+            "completed": len(resultD),
+            "failed": len(failD) - numSkipped,
+            "skipped": numSkipped,
+            "wallTime": wallTime,
+            "busyTime": busyTime,
+            "utilization": busyTime / (numProc * wallTime) if numProc and wallTime > 0 else 0.0,
+        }
+        logger.debug("Task graph statistics %r", self.__statsD)
+        return not failD, resultD, failD
+
+    def __stopWorkers(self, taskQueue, connD):
+        """Send end-of-queue sentinels and reap the workers -- workers failing to exit promptly are terminated."""
+        for _ in range(len(connD)):
+            taskQueue.put(None)
+        endTime = time.time() + self.__exitTimeout
+        while connD and time.time() < endTime:
+            for reader in multiprocessing.connection.wait(list(connD.keys()), timeout=self.__pollInterval):
+                try:
+                    msgType = reader.recv()[0]
+                except EOFError:
+                    msgType = "exit"
+                if msgType == "exit":
+                    reader.close()
+                    connD.pop(reader).join(1)
+        for reader, wT in connD.items():
+            logger.debug("%s terminating", wT.name)
+            wT.terminate()
+            wT.join(1)
+            reader.close()
+        connD.clear()
+        taskQueue.close()
+        taskQueue.cancel_join_thread()
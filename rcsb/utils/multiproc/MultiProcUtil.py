@@ -11,6 +11,27 @@
 #  9-Oct-2017 jdw add chunkSize option such that the input dataList to provide more granular distribution
 #                 data among the works.  Defaults to numProc if unspecified.
 # 27-Mar-2018 jdw add check for empty input
+# 19-Oct-2026 jdw add container-aware worker count policy (affinity/cgroup quotas) with optional calibration
+# 19-Oct-2026 jdw return chunk results on per-worker pipes, pace dispatch, add worker recycling (chunk count
+#                 and resident size limits), a worker memory budget and graceful worker shutdown.
+# 19-Oct-2026 jdw add pluggable serializer for task and result payloads
+# 19-Oct-2026 jdw add optional compression of large result payloads and getRunStats()
+# 19-Oct-2026 jdw add spill-to-disk result accumulation (MultiProcResultStore)
+# 19-Oct-2026 jdw add worker-side reduction of chunk results (setReducer()) with a parent tree reduction
+# 19-Oct-2026 jdw count diagnostics in the workers and merge the counts in the parent (setDiagnostics())
+# 19-Oct-2026 jdw add runMap() applying a per-item function with per-item exception capture and bisection
+#                 retries of chunks lost to worker process exits
+# 19-Oct-2026 jdw add early termination (failure threshold, stop predicate, cancel token) and signal-safe
+#                 shutdown (setEarlyStop()), workers exit when the parent process exits
+# 19-Oct-2026 jdw add priority ordered chunk formation and dispatch (setPriority()) and streaming results (runMultiIter())
+# 19-Oct-2026 jdw add input deduplication with fan-out of successes and per-item results (setDedup())
+# 19-Oct-2026 jdw set the run identifier, chunk index and optionally the current item in the worker logging context
+# 19-Oct-2026 jdw add per-worker cProfile capture with a merged pstats report (setProfiling())
+# 19-Oct-2026 jdw add per-chunk memory profiling (tracemalloc peak, resident size growth, heaviest items) (setMemoryProfiling())
+# 19-Oct-2026 jdw add a dry-run planner recommending numProc, chunkSize and backend from sample measurements (planRun())
+# 19-Oct-2026 jdw add typed numeric result columns returned as preallocated NumPy arrays (setResultColumns())
+# 19-Oct-2026 jdw limit native library threads in the workers to a per-worker thread budget by default (setThreadLimits())
+# 19-Oct-2026 jdw add speculative re-execution of straggler chunks on idle workers near the end of a run (setSpeculation())
 ##
 """
 Multiprocessing execution wrapper supporting tasks with list of inputs and a variable number of output lists.
@@ -25,7 +46,31 @@ __license__ = "Apache 2.0"
 # pylint: skip-file
 
 import logging
+import os
+import queue
+import random
+import signal
+import threading
+import time
+import uuid
+
 import multiprocess as multiprocessing
+import multiprocess.connection
+
+from rcsb.utils.multiproc.MultiProcDiagnostics import MultiProcDiagSummary
+from rcsb.utils.multiproc.MultiProcItemCall import MultiProcItemCall
+from rcsb.utils.multiproc.MultiProcListUtil import MultiProcListUtil
+from rcsb.utils.multiproc.MultiProcLogging import MultiProcLogContext
+from rcsb.utils.multiproc.MultiProcMemoryProfiler import MultiProcMemorySummary
+from rcsb.utils.multiproc.MultiProcMemoryProfiler import MultiProcMemoryTracker
+from rcsb.utils.multiproc.MultiProcPlanner import MultiProcPlanner
+from rcsb.utils.multiproc.MultiProcProfiler import MultiProcProfileCall
+from rcsb.utils.multiproc.MultiProcProfiler import MultiProcProfiler
+from rcsb.utils.multiproc.MultiProcResultColumns import MultiProcResultColumns
+from rcsb.utils.multiproc.MultiProcResourceUtil import MultiProcResourceUtil
+from rcsb.utils.multiproc.MultiProcResultStore import MultiProcResultStore
+from rcsb.utils.multiproc.MultiProcSerializer import MultiProcCompressingSerializer
+from rcsb.utils.multiproc.MultiProcSerializer import MultiProcSerializer
 
 logger = logging.getLogger(__name__)
 
@@ -37,14 +82,70 @@ class MultiProcWorker(multiprocessing.Process):
          Worker method must support the following prototype -
 
          sucessList,resultList,diagList=workerFunc(runList=nextList,procName, optionsD, workingDir)
+
+         Each task is a tuple (chunkId, nextList).  Messages are returned on the worker's result
+         connection as tuples (messageType, chunkId, processName, payload) for message types -
+
+            start:   the worker has taken the chunk (payload is the start time)
+            result:  the worker method return tuple for the chunk
+            partial: the reduction of the results of all chunks completed by the worker (sent before exit)
+            exit:    the worker is leaving the task loop (payload is the reason 'completed' or 'recycled')
+
+         The worker leaves the task loop after 'maxChunks' chunks or once its resident set size
+         exceeds 'maxRss' bytes so that the parent can replace it with a fresh process.
+
+         With a serializer, task data lists arrive as serialized (data, bufferList) tuples.  With a
+         result serializer, the payload of a result message is the number of out-of-band buffers that
+         follow the serialized result tuple as raw byte messages on the connection.
+
+         With a reducer, the result lists of each chunk are folded into a worker-held partial aggregate
+         (reduceFn(resultLists) for the chunk merged by combineFn(partial, partial)) and result messages
+         carry only the success and diagnostic lists.
+
+         The diagnostic list of each chunk is returned as the plain form of a MultiProcDiagSummary
+         (occurrence counts) built with the options in 'diagD'.
+
+         Workers leave the task loop if the parent process exits and optionally ignore SIGINT
+         ('ignoreSigInt') so that keyboard interrupts are handled by the parent (SIGTERM then takes
+         its default action).
+
+         The run identifier ('runId') and the index of the current chunk are set in the logging
+         context (MultiProcLogContext) of the worker process.
+
+         With 'memoryD' ({"topItems": n}), the memory use of each chunk is measured (MultiProcMemoryTracker)
+         and sent ahead of its result as a 'memory' message.
+
+         With result columns ('columns', MultiProcResultColumns), the column result lists of each chunk
+         are packed as typed arrays.
+
+         With 'threadD' ({"numThreads": n, "override": bool}), the thread pools of native libraries are
+         limited at worker start (MultiProcResourceUtil.limitThreads()).
     """
 
-    def __init__(self, taskQueue, successQueue, resultQueueList, diagQueue, workerFunc, verbose=False, optionsD=None, workingDir="."):
+    def __init__(
+        self,
+        taskQueue,
+        resultConn,
+        workerFunc,
+        verbose=False,
+        optionsD=None,
+        workingDir=".",
+        maxChunks=0,
+        maxRss=0,
+        serializer=None,
+        resultSerializer=None,
+        reduceFn=None,
+        combineFn=None,
+        diagD=None,
+        ignoreSigInt=False,
+        runId=None,
+        memoryD=None,
+        columns=None,
+        threadD=None,
+    ):
         multiprocessing.Process.__init__(self)
         self.__taskQueue = taskQueue
-        self.__successQueue = successQueue
-        self.__resultQueueList = resultQueueList
-        self.__diagQueue = diagQueue
+        self.__resultConn = resultConn
         #
         self.__verbose = verbose
         self.__debug = True
@@ -52,23 +153,99 @@ class MultiProcWorker(multiprocessing.Process):
         #
         self.__optionsD = optionsD if optionsD is not None else {}
         self.__workingDir = workingDir
+        self.__maxChunks = maxChunks
+        self.__maxRss = maxRss
+        self.__serializer = serializer
+        self.__resultSerializer = resultSerializer
+        self.__reduceFn = reduceFn
+        self.__combineFn = combineFn
+        self.__diagD = diagD if diagD is not None else {}
+        self.__ignoreSigInt = ignoreSigInt
+        self.__runId = runId
+        self.__memoryD = memoryD
+        self.__columns = columns
+        self.__threadD = threadD
+        self.__parentPid = os.getpid()
         #
 
+    def __sendResult(self, msgType, chunkId, processName, rTup):
+        if self.__resultSerializer is None:
+            self.__resultConn.send((msgType, chunkId, processName, rTup))
+            return
+        data, bufferList = self.__resultSerializer.dumps(rTup)
+        self.__resultConn.send((msgType, chunkId, processName, len(bufferList)))
+        self.__resultConn.send_bytes(data)
+        for buf in bufferList:
+            self.__resultConn.send_bytes(buf)
+
     def run(self):
         processName = self.name
+        rU = MultiProcResourceUtil()
+        numChunks = 0
+        reason = "completed"
+        partial = None
+        if self.__ignoreSigInt:
+            signal.signal(signal.SIGINT, signal.SIG_IGN)
+            # restore the default action of the SIGTERM handler inherited from the parent so that terminate() stops the worker
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        if self.__threadD:
+            rU.limitThreads(self.__threadD["numThreads"], override=self.__threadD["override"])
+        MultiProcLogContext.set(runId=self.__runId)
+        tracker = MultiProcMemoryTracker(topItems=self.__memoryD["topItems"]) if self.__memoryD else None
         while True:
-            nextList = self.__taskQueue.get()
-            if nextList is None:
+            try:
+                task = self.__taskQueue.get(timeout=1.0)
+            except queue.Empty:
+                if os.getppid() != self.__parentPid:
+                    logger.debug("%s leaving task loop after parent process exit", processName)
+                    return
+                continue
+            if task is None:
                 # end of queue condition
                 logger.debug("%s completed task list", processName)
                 break
             #
+            chunkId, nextList = task
+            MultiProcLogContext.set(chunkId=chunkId)
+            # report the chunk before decoding so that a failure in decoding is seen as a lost chunk
+            self.__resultConn.send(("start", chunkId, processName, time.time()))
+            if self.__serializer is not None:
+                nextList = self.__serializer.loads(*nextList)
+            if tracker:
+                tracker.start()
             rTup = self.__workerFunc(dataList=nextList, procName=processName, optionsD=self.__optionsD, workingDir=self.__workingDir)
+            if tracker:
+                memD = tracker.stop()
+                memD.update({"chunkId": chunkId, "items": len(nextList)})
+                self.__resultConn.send(("memory", chunkId, processName, memD))
             logger.debug("%s task list length %d rTup length %d", processName, len(nextList), len(rTup))
-            self.__successQueue.put(rTup[0])
-            for ii, rq in enumerate(self.__resultQueueList):
-                rq.put(rTup[ii + 1])
-            self.__diagQueue.put(rTup[-1])
+            dS = MultiProcDiagSummary(**self.__diagD)
+            dS.extend(rTup[-1])
+            rTup = tuple(rTup[:-1]) + (dS.getState(),)
+            if self.__columns is not None:
+                rTup = self.__columns.pack(rTup)
+            if self.__reduceFn is not None:
+                chunkPartial = self.__reduceFn(list(rTup[1:-1]))
+                partial = chunkPartial if numChunks == 0 else self.__combineFn(partial, chunkPartial)
+                rTup = tuple([rTup[0]] + [[] for _ in rTup[1:-1]] + [rTup[-1]])
+            self.__sendResult("result", chunkId, processName, rTup)
+            MultiProcLogContext.set(chunkId=None)
+            #
+            numChunks += 1
+            if self.__maxChunks and numChunks >= self.__maxChunks:
+                logger.debug("%s recycling after %d chunks", processName, numChunks)
+                reason = "recycled"
+                break
+            if self.__maxRss:
+                rss = rU.getProcessRss()
+                if rss and rss > self.__maxRss:
+                    logger.debug("%s recycling with resident size %d bytes after %d chunks", processName, rss, numChunks)
+                    reason = "recycled"
+                    break
+        if self.__reduceFn is not None and numChunks:
+            self.__sendResult("partial", None, processName, partial)
+        self.__resultConn.send(("exit", None, processName, reason))
+        self.__resultConn.close()
         return
 
 
@@ -80,6 +257,31 @@ class MultiProcUtil(object):
         self.__workingDir = "."
         self.__loggingMP = True
         self.__sentinel = None
+        self.__numProcPolicyD = {"workload": "io", "memoryPerProc": 0, "calibrate": False, "sampleSize": 100}
+        self.__workerLimitD = {"maxChunksPerWorker": 0, "maxRssPerWorker": 0, "memoryBudget": 0}
+        self.__memoryThrottleFraction = 0.9
+        self.__pollInterval = 0.5
+        self.__exitTimeout = 10.0
+        self.__unstartedTimeout = 5.0
+        self.__serializer = None
+        self.__compressionD = None
+        self.__runStatsD = {}
+        self.__spillDirPath = None
+        self.__reduceD = None
+        self.__diagD = {"keyFn": None, "maxKeys": 0, "maxSamples": 3}
+        self.__diagSummary = None
+        self.__earlyStopD = {"maxFailures": 0, "stopFn": None, "cancelToken": None, "drain": False, "handleSignals": True}
+        self.__stopReason = None
+        self.__priorityD = None
+        self.__dedupD = None
+        self.__logContextD = {"runId": None, "logItems": False}
+        self.__runId = None
+        self.__profileD = None
+        self.__memoryD = None
+        self.__memorySummary = None
+        self.__columns = None
+        self.__threadLimitD = {"threadsPerProc": 0}
+        self.__speculationD = None
 
     def setOptions(self, optionsD):
         """ A dictionary of options that is passed as an argument to the worker function
@@ -91,6 +293,218 @@ class MultiProcUtil(object):
         """
         self.__workingDir = workingDir
 
+    def setNumProcPolicy(self, workload="io", memoryPerProc=0, calibrate=False, sampleSize=100):
+        """ Policy used to select the number of worker processes when runMulti() is called with numProc < 1.
+
+            workload:       'cpu' (one worker per available CPU) or 'io' (two workers per available CPU)
+            memoryPerProc:  expected peak memory per worker (bytes) used to cap the worker count (0 to ignore)
+            calibrate:      measure throughput on a random sample of the input at several worker counts
+                            (the sample items are processed once per candidate count)
+            sampleSize:     number of input items used for calibration
+
+            Available CPUs reflect the process affinity mask and any cgroup (v1/v2) CPU quota.
+        """
+        self.__numProcPolicyD = {"workload": workload, "memoryPerProc": memoryPerProc, "calibrate": calibrate, "sampleSize": sampleSize}
+
+    def setWorkerLimits(self, maxChunksPerWorker=0, maxRssPerWorker=0, memoryBudget=0):
+        """ Worker recycling and memory budget options (0 to disable each) -
+
+            maxChunksPerWorker:  replace a worker process after it has completed this number of chunks
+            maxRssPerWorker:     replace a worker process once its resident set size exceeds this limit (bytes)
+            memoryBudget:        hold back dispatch of new chunks while the total resident size of
+                                 the worker processes is near this limit (bytes)
+        """
+        self.__workerLimitD = {"maxChunksPerWorker": maxChunksPerWorker, "maxRssPerWorker": maxRssPerWorker, "memoryBudget": memoryBudget}
+
+    def setSerializer(self, serializer=None):
+        """ Serializer for task and result payloads -
+
+            None or 'dill':  pickling provided by the multiprocess package (default)
+            'pickle':        stdlib pickle protocol 5 with out-of-band buffers
+            'auto':          stdlib pickle with a dill fallback (e.g. for closures)
+            codec object:    any object providing dumps(obj) and loads(data)
+
+            See MultiProcSerializer for typical timings.
+        """
+        self.__serializer = MultiProcSerializer.create(serializer)
+
+    def setCompression(self, codec="zlib", threshold=65536, level=None):
+        """ Compress serialized chunk results larger than 'threshold' bytes before they are returned
+            to the parent process ('zlib', 'lzma', 'bz2', an object providing compress()/decompress(),
+            or None to disable).  Compression statistics for the last run are reported by getRunStats().
+        """
+        self.__compressionD = {"codec": codec, "threshold": threshold, "level": level} if codec else None
+
+    def setResultSpill(self, dirPath=None):
+        """ Accumulate the result lists of runMulti() in on-disk segment files in 'dirPath' (None to disable).
+
+            The returned result lists are then MultiProcResultStore objects supporting len(), iteration
+            and indexing through memory-mapped reads.  Call remove() on each to delete the backing files.
+        """
+        self.__spillDirPath = dirPath
+
+    def setReducer(self, reduceFn=None, combineFn=None):
+        """ Reduce chunk results within the worker processes (None to disable) -
+
+            reduceFn(resultLists) -> partial:          fold the 'numResults' result lists of a chunk into a partial aggregate
+            combineFn(partialA, partialB) -> partial:  merge two partial aggregates
+
+            Each worker combines the partials of the chunks it completes and returns a single partial before
+            it exits.  runMulti() then merges the worker partials by pairwise (tree) reduction and returns
+            the final aggregate in place of the result lists.  Chunks completed by a worker that dies before
+            returning its partial are reported as failures.
+        """
+        self.__reduceD = {"reduceFn": reduceFn, "combineFn": combineFn} if reduceFn else None
+
+    def setDiagnostics(self, keyFn=None, maxKeys=0, maxSamples=3):
+        """ Diagnostics are counted within the workers and the counts merged in the parent -
+
+            keyFn:       optional function mapping a diagnostic to its aggregation key (e.g. a message template)
+            maxKeys:     maximum number of distinct keys retained in each worker and in the parent (0 for no limit)
+            maxSamples:  maximum number of sample diagnostics retained per key (with keyFn)
+
+            runMulti() returns one diagnostic per key and getDiagnosticSummary() the occurrence counts.
+        """
+        self.__diagD = {"keyFn": keyFn, "maxKeys": maxKeys, "maxSamples": maxSamples}
+
+    def setEarlyStop(self, maxFailures=0, stopFn=None, cancelToken=None, drain=False, handleSignals=True):
+        """ Conditions for stopping a run before all chunks are processed -
+
+            maxFailures:    stop once this number of input items has failed (0 to disable)
+            stopFn:         stopFn(rTup) called in the parent with each chunk result tuple -- stop when True
+            cancelToken:    any object providing is_set() (e.g. threading.Event) -- stop once set
+            drain:          complete chunks already queued to the workers (default discard them)
+            handleSignals:  on SIGINT/SIGTERM (main thread only) stop dispatch, reap the workers and then
+                            deliver the signal to the previous handler (e.g. raise KeyboardInterrupt)
+
+            On stop, no further chunks are dispatched and chunks in progress are completed (within the
+            worker exit timeout).  Unprocessed items are returned in the failList and the reason is
+            reported by getRunStats().  With a reducer, chunk results reach the parent with the worker
+            partial aggregates once all chunks are complete, so only the cancel token and signals stop dispatch.
+        """
+        self.__earlyStopD = {"maxFailures": maxFailures, "stopFn": stopFn, "cancelToken": cancelToken, "drain": drain, "handleSignals": handleSignals}
+
+    def setPriority(self, priorityFn=None, priorityField=None):
+        """ Form and dispatch chunks in priority order (None to disable) -
+
+            priorityFn:     priorityFn(item) returns the priority of an input item
+            priorityField:  key (dictionary items) or attribute name holding the priority of an input item
+
+            Items with larger priority values are processed first -- chunks are contiguous runs of the
+            input items sorted by decreasing priority (ties keep their input order) and are dispatched in
+            that order, so the results streamed by runMultiIter() arrive approximately in priority order.
+            Items with a missing or None priority (or for which priorityFn raises) are processed last.
+        """
+        self.__priorityD = {"priorityFn": priorityFn, "priorityField": priorityField} if (priorityFn or priorityField) else None
+
+    def setDedup(self, dedup=True, keyFn=None):
+        """ Process each distinct input item once (dedup=False to disable) -
+
+            keyFn:  optional function mapping an input item to its identity key (default the item itself,
+                    or its representation for unhashable items)
+
+            Success is fanned back out to every copy of an item so that the success and failure lists
+            refer to the complete input dataList.  For runMap() the per-item results are also repeated
+            for each copy.  Worker methods used with runMulti() may return any number of results per
+            item, so their result lists (and reduced aggregates) contain the results of the distinct items only.
+        """
+        self.__dedupD = {"keyFn": keyFn} if dedup else None
+
+    def setLogContext(self, runId=None, logItems=False):
+        """ Logging context set in the worker processes (see MultiProcLogContext) -
+
+            runId:     run identifier attached to worker log records (default a new identifier for each run)
+            logItems:  also attach the item being processed (runMap())
+        """
+        self.__logContextD = {"runId": runId, "logItems": logItems}
+
+    def setProfiling(self, profile=True, dirPath=None, topN=20, sortKey="cumulative"):
+        """ Run the worker method under cProfile in each worker process (profile=False to disable) -
+
+            dirPath:  directory for the per-worker profiles mp-profile-<runId>-<pid>-*.prof (default the working directory)
+            topN:     number of functions (ordered by the pstats 'sortKey') reported
+
+            The worker profiles are merged after the run into mp-profile-<runId>.prof with the report of
+            the top functions in mp-profile-<runId>-report.txt (see getRunStats()).
+        """
+        self.__profileD = {"dirPath": dirPath, "topN": topN, "sortKey": sortKey} if profile else None
+
+    def setMemoryProfiling(self, profile=True, topItems=10):
+        """ Measure the memory use of each chunk in the worker processes (profile=False to disable) -
+
+            the peak traced allocation (tracemalloc) and the resident size growth of each chunk and,
+            for runMap(), the 'topItems' items with the largest peak traced allocation (see getRunStats()).
+        """
+        self.__memoryD = {"topItems": topItems} if profile else None
+
+    def setResultColumns(self, columnD=None):
+        """ Declare result slots as typed numeric columns (None to disable, requires numpy) -
+
+            columnD:  {result index: dtype or (dtype, shape)}, e.g. {0: "float64", 1: ("float32", (3,))}
+                      for a scalar and a fixed-length vector result per item
+
+            The worker method returns one value per successful item (in success list order) in each column
+            result list (always the case for runMap()).  Workers return the values as packed arrays and the
+            result list of each column is returned by runMulti()/runMap() as an array with one row per input
+            item (in dataList order), preallocated in the parent.  Rows of failing items hold NaN (floating
+            point dtypes) or 0.  Result columns are not supported with deduplication or reducers and do not
+            apply to the results streamed by runMultiIter().
+        """
+        self.__columns = MultiProcResultColumns(columnD) if columnD else None
+
+    def setThreadLimits(self, limit=True, threadsPerProc=0):
+        """ Limit the threads of native libraries (OpenMP, MKL, OpenBLAS, numexpr) in each worker process
+            to avoid oversubscribing the CPUs with nested threading (enabled by default, limit=False to disable) -
+
+            threadsPerProc:  threads per worker (0 for the available CPUs divided by the number of workers,
+                             at least 1)
+
+            The thread count environment variables are set at worker start (with the default budget,
+            variables already set in the parent environment are kept) and the thread pools of libraries
+            already loaded are resized when threadpoolctl is available.  The budget of the last run is
+            reported by getRunStats().
+        """
+        self.__threadLimitD = {"threadsPerProc": threadsPerProc} if limit else None
+
+    def setSpeculation(self, speculate=True, maxCopies=1, minElapsed=0.0):
+        """ Speculative re-execution of straggler chunks near the end of a run (speculate=False to disable) -
+
+            maxCopies:   maximum number of additional copies of each chunk
+            minElapsed:  minimum running time (seconds) of a chunk before it is copied
+
+            Once every chunk has been taken by a worker, idle workers run copies of the longest-running
+            chunks still in progress.  The first result of a chunk is returned and the workers still
+            running other copies are terminated (and replaced while work remains).  Worker methods must
+            tolerate running a chunk more than once (side effects may be repeated).  Speculation is not
+            applied with a reducer.  Copy counts are reported by getRunStats().
+        """
+        self.__speculationD = {"maxCopies": maxCopies, "minElapsed": minElapsed} if speculate else None
+
+    def getDiagnosticSummary(self, maxReport=100):
+        """ Return the diagnostic occurrence counts of the last run (at most 'maxReport' most frequent keys) -
+
+            {"total": occurrences, "distinct": keys, "overflow": occurrences beyond maxKeys,
+             "counts": [{"key": key, "count": count, "samples": [diagnostic, ...]}, ...]}
+        """
+        return self.__diagSummary.getSummary(maxReport=maxReport) if self.__diagSummary else None
+
+    def getRunStats(self):
+        """ Return a dictionary of statistics collected during the last run -
+
+            compression:  frames, compressedFrames, rawBytes, compressedBytes, ratio, compressTime, decompressTime
+            reduce:       partials (the number of worker partial aggregates merged in the parent)
+            retriedChunks: number of chunks split from chunks lost to worker process exits and retried (runMap())
+            earlyStop:    reason ('maxFailures', 'predicate', 'cancelled' or 'signal'), skippedChunks
+            dedup:        inputItems, distinctItems
+            runId:        the run identifier attached to worker log records
+            profile:      workers, statsPath, reportPath, top ([{function, ncalls, tottime, cumtime}, ...]) (setProfiling())
+            memory:       chunks, maxPeakTraced, meanPeakTraced, maxRssDelta, maxRss, chunkList, heaviestItems (setMemoryProfiling())
+            threadLimit:  threadsPerProc (setThreadLimits())
+            speculation:  copies (speculative chunk copies dispatched), won (copies completing first), discarded
+                          (late results of completed chunks), terminated (workers stopped running obsolete copies) (setSpeculation())
+        """
+        return self.__runStatsD
+
     def set(self, workerObj=None, workerMethod=None):
         """  WorkerObject is the instance of object with method named workerMethod()
 
@@ -114,14 +528,139 @@ class MultiProcUtil(object):
 
             Returns,   successFlag true|false
                        failList (data from the inut list that was not successfully processed)
-                       resultLists[numResults] --  numResults result lists
+                       resultLists[numResults] --  numResults result lists (or the reduced aggregate, see setReducer())
                        diagList --  unique list of diagnostics --
 
         """
-        #
+        return self.__run(self.__workerFunc, dataList, numProc=numProc, numResults=numResults, chunkSize=chunkSize)
+
+    def runMap(self, itemFn, dataList=None, numProc=0, numResults=1, chunkSize=0, retryLost=True):
+        """ Start 'numProc' workers applying itemFn(item) to each item of the input dataList -
+
+            itemFn returns the single result value (numResults = 1) or a tuple of 'numResults' values.
+            Exceptions are captured per item: failing items are returned in the failList and the
+            exceptions are reported as '<exception type>: <message>' diagnostics.  With 'retryLost',
+            chunks lost to a worker process exit are split in halves and retried until the items
+            causing the exits are isolated.
+
+            Returns,   successFlag true|false
+                       failList (data from the input list that was not successfully processed)
+                       resultLists[numResults] --  numResults result lists (or the reduced aggregate, see setReducer())
+                       diagList --  unique list of diagnostics --
+        """
+        workerFunc = MultiProcItemCall(itemFn, numResults=numResults, logItems=self.__logContextD["logItems"])
+        return self.__run(workerFunc, dataList, numProc=numProc, numResults=numResults, chunkSize=chunkSize, retryLost=retryLost)
+
+    def runMultiIter(self, dataList=None, numProc=0, numResults=1, chunkSize=0):
+        """ Start 'numProc' worker methods consuming the input dataList and yield the results of each
+            chunk as it is completed -
+
+            Yields,    (chunkList, successList, resultLists[numResults], diagList) for each chunk, where
+                       chunkList holds the input items of the chunk and diagList the distinct chunk diagnostics
+
+            Chunks lost to a worker process exit are yielded with empty success and result lists.  Closing
+            the generator (e.g. leaving the consuming loop) stops the workers.  Reducers and result spill
+            (setReducer(), setResultSpill()) do not apply to streamed results.
+        """
         if numProc < 1:
-            numProc = multiprocessing.cpu_count() * 2
+            numProc = self.__getNumProc(dataList, self.__workerFunc, numResults=numResults, chunkSize=chunkSize)
+        self.__runStatsD = {}
+        self.__stopReason = None
+        self.__runId = self.__logContextD["runId"] or uuid.uuid4().hex[:12]
+        self.__runStatsD["runId"] = self.__runId
+        self.__memorySummary = MultiProcMemorySummary(topItems=self.__memoryD["topItems"]) if self.__memoryD else None
+        numProc, subLists, _ = self.__makeChunks(dataList, numProc, chunkSize)
+        try:
+            for chunkId, rTup in self.__runChunks(subLists, numProc, numResults, self.__getProfileCall(self.__workerFunc), reduceD=None):
+                if rTup is None:
+                    yield subLists[chunkId], [], [[] for _ in range(numResults)], []
+                    continue
+                dS = MultiProcDiagSummary(**self.__diagD)
+                dS.update(rTup[-1])
+                yield subLists[chunkId], rTup[0] or [], [rV or [] for rV in rTup[1:-1]], dS.getDiagList()
+        finally:
+            self.__mergeProfiles()
+            if self.__memorySummary:
+                self.__runStatsD["memory"] = self.__memorySummary.getSummary()
+
+    def planRun(self, dataList, numResults=1, sampleSize=100, itemFn=None, measureMemory=True):
+        """ Dry run -- time a random sample of the input dataList with the configured worker method (or
+            itemFn as in runMap()) and recommend the parameters for the full run.
+
+            The sample is run on a single worker process in chunks of increasing size to fit the per-item
+            cost and the per-chunk overhead (MultiProcPlanner).  With 'measureMemory' the sample is run a
+            second time with memory measurement (tracemalloc slows the worker method) to fit the peak
+            allocation per item.  Side effects of the worker method apply to the sample items.
+
+            Returns,   {"numProc", "chunkSize", "backend" ('serial', 'process' (MultiProcUtil) or 'pool' (MultiProcPoolUtil)),
+                        "estimatedWallTime", "estimatedSerialTime", "memoryPerProc", "peakMemory", "reason",
+                        "sample": {"items", "chunks", "chunkOverhead", "perItemTime", "itemTimeCv", "perItemMemory", "startupTime", "baseRss"}}
+        """
+        workerFunc = MultiProcItemCall(itemFn, numResults=numResults) if itemFn else self.__workerFunc
+        sampleList = random.sample(dataList, min(len(dataList), sampleSize))
+        planner = MultiProcPlanner()
+        subLists = planner.getSampleChunks(sampleList)
+        # time the plain execution of the sample -- without result spill, deduplication, early stop or profiling
+        savedL = [self.__spillDirPath, self.__dedupD, self.__earlyStopD, self.__profileD, self.__memoryD]
+        self.__spillDirPath = None
+        self.__dedupD = None
+        self.__profileD = None
+        self.__memoryD = None
+        self.__earlyStopD = {"maxFailures": 0, "stopFn": None, "cancelToken": None, "drain": False, "handleSignals": savedL[2]["handleSignals"]}
+        self.__runStatsD = {}
+        self.__runId = self.__logContextD["runId"] or uuid.uuid4().hex[:12]
+        timingD = {}
+        memoryList = []
+        try:
+            startTime = time.time()
+            for _ in self.__runChunks(subLists, 1, numResults, workerFunc, timingD=timingD):
+                pass
+            wallTime = time.time() - startTime
+            if measureMemory:
+                self.__memoryD = {"topItems": 0}
+                self.__memorySummary = MultiProcMemorySummary(topItems=0)
+                for _ in self.__runChunks(subLists, 1, numResults, workerFunc):
+                    pass
+                memoryList = self.__memorySummary.getSummary()["chunkList"]
+        finally:
+            self.__spillDirPath, self.__dedupD, self.__earlyStopD, self.__profileD, self.__memoryD = savedL
+            self.__memorySummary = None
+        #
+        rssList = [cD["rss"] for cD in memoryList if cD["rss"]]
+        fitD = planner.fitSample(
+            [(len(subLists[chunkId]), elapsed) for chunkId, elapsed in timingD.items()],
+            memoryObsList=[(cD["items"], cD["peakTraced"]) for cD in memoryList],
+            startupTime=wallTime - sum(timingD.values()),
+            baseRss=min(rssList) if rssList else None,
+        )
+        rU = MultiProcResourceUtil()
+        maxProc = rU.getNumProc(workload=self.__numProcPolicyD["workload"], memoryPerProc=self.__numProcPolicyD["memoryPerProc"])
+        planD = planner.recommend(len(dataList), fitD, maxProc, availMemory=rU.getAvailableMemory())
+        planD["sample"] = dict(fitD, items=len(sampleList), chunks=len(subLists))
+        logger.info("Run plan %r", planD)
+        return planD
 
+    def __getProfileCall(self, workerFunc):
+        if not self.__profileD:
+            return workerFunc
+        return MultiProcProfileCall(workerFunc, self.__profileD["dirPath"] or self.__workingDir, "mp-profile-%s" % self.__runId)
+
+    def __mergeProfiles(self):
+        if not self.__profileD:
+            return
+        try:
+            pD = self.__profileD
+            self.__runStatsD["profile"] = MultiProcProfiler().merge(pD["dirPath"] or self.__workingDir, "mp-profile-%s" % self.__runId, topN=pD["topN"], sortKey=pD["sortKey"])
+        except Exception as e:
+            logger.exception("Profile merge failing with %s", str(e))
+
+    def __makeChunks(self, dataList, numProc, chunkSize, withIndex=False):
+        """ Divide the input dataList into chunks -- strided sublists or, with a priority policy,
+            contiguous runs of the items sorted by decreasing priority.
+
+            Returns,  numProc (bounded by the input length), subLists, indexLists (the input positions
+                      of the items of each chunk with 'withIndex', otherwise None)
+        """
         lenData = len(dataList)
         numProc = min(numProc, lenData)
         chunkSize = min(lenData, chunkSize)
@@ -131,75 +670,140 @@ class MultiProcUtil(object):
         else:
             numLists = int(lenData / int(chunkSize))
         #
-        subLists = [dataList[i::numLists] for i in range(numLists)]
+        if self.__priorityD and numLists:
+            priorityFn = self.__priorityD["priorityFn"] or self.__getFieldFn(self.__priorityD["priorityField"])
+            priorityList = [self.__getPriority(priorityFn, item) for item in dataList]
+            # the sort is stable (also when reversed) so equal priorities keep their input order
+            indexList = sorted(range(lenData), key=lambda ii: (priorityList[ii] is not None, priorityList[ii]), reverse=True)
+            sortedList = [dataList[ii] for ii in indexList]
+            subLists = [sortedList[(ii * lenData) // numLists : ((ii + 1) * lenData) // numLists] for ii in range(numLists)]
+            indexLists = [indexList[(ii * lenData) // numLists : ((ii + 1) * lenData) // numLists] for ii in range(numLists)] if withIndex else None
+        else:
+            subLists = [dataList[i::numLists] for i in range(numLists)]
+            indexLists = [list(range(lenData))[i::numLists] for i in range(numLists)] if withIndex else None
         #
         if subLists is not None and subLists:
             logger.debug("Running with numProc %d subtask count %d subtask length ~ %d", numProc, len(subLists), len(subLists[0]))
-        #
-        taskQueue = multiprocessing.Queue()
-        successQueue = multiprocessing.Queue()
-        diagQueue = multiprocessing.Queue()
+        return numProc, subLists, indexLists
 
-        rqList = []
-        retLists = []
-        for ii in range(numResults):
-            rqList.append(multiprocessing.Queue())
-            retLists.append([])
+    def __getFieldFn(self, field):
+        def getField(item):
+            return item.get(field) if isinstance(item, dict) else getattr(item, field, None)
 
-        #
-        #  Create list of worker processes
-        #
-        workers = [
-            MultiProcWorker(taskQueue, successQueue, rqList, diagQueue, self.__workerFunc, verbose=self.__verbose, optionsD=self.__optionsD, workingDir=self.__workingDir)
-            for i in range(numProc)
-        ]
-        for wT in workers:
-            wT.start()
+        return getField
 
-        for subList in subLists:
-            if subList:
-                taskQueue.put(subList)
+    def __getPriority(self, priorityFn, item):
+        """ Return the priority of the input item or None if it is undefined.
+        """
+        try:
+            return priorityFn(item)
+        except Exception as e:
+            logger.debug("Priority undefined for %r with %s", item, str(e))
+        return None
 
-        for _ in range(numProc):
-            taskQueue.put(None)
+    def __run(self, workerFunc, dataList, numProc=0, numResults=1, chunkSize=0, retryLost=False):
+        #
+        if numProc < 1:
+            numProc = self.__getNumProc(dataList, workerFunc, numResults=numResults, chunkSize=chunkSize)
+        self.__runStatsD = {}
+        self.__stopReason = None
+        self.__runId = self.__logContextD["runId"] or uuid.uuid4().hex[:12]
+        self.__runStatsD["runId"] = self.__runId
+        self.__memorySummary = MultiProcMemorySummary(topItems=self.__memoryD["topItems"]) if self.__memoryD else None
+        eD = self.__earlyStopD
+        numFailures = 0
+        groupD = None
+        runList = dataList
+        if self.__dedupD:
+            keyFn = self.__dedupD["keyFn"]
+            runList, groupD = self.__groupItems(dataList, keyFn)
+            self.__runStatsD["dedup"] = {"inputItems": len(dataList), "distinctItems": len(runList)}
+            logger.debug("Input task length %d distinct items %d", len(dataList), len(runList))
+            fanOut = isinstance(workerFunc, MultiProcItemCall) and not self.__reduceD
+
+        columns = self.__columns
+        columnL = []
+        if columns:
+            columnL = columns.getIndices()
+            if self.__reduceD or self.__dedupD:
+                raise ValueError("Result columns are not supported with deduplication or reducers")
+            if columnL[-1] >= numResults or columnL[0] < 0:
+                raise ValueError("Result column indices %r outside of %d result lists" % (columnL, numResults))
 
-        # np = numProc
-        np = len(subLists)
+        workerFunc = self.__getProfileCall(workerFunc)
+        numProc, subLists, indexLists = self.__makeChunks(runList, numProc, chunkSize, withIndex=bool(columns))
+        #
         successList = []
-        diagList = []
-        tL = []
-        while np:
-            rV = successQueue.get()
-            if rV is not None and rV:
-                successList.extend(rV)
-
-            dV = diagQueue.get()
-            if dV is not None and dV:
-                for tt in dV:
-                    if str(tt).strip():
-                        tL.append(tt)
-
-            for ii, rq in enumerate(rqList):
-                rV = rq.get()
+        partialList = []
+        if self.__reduceD or not self.__spillDirPath:
+            retLists = [[] for ii in range(numResults)]
+        else:
+            retLists = [MultiProcResultStore(self.__spillDirPath, name="result-%d" % ii) if ii not in columnL else [] for ii in range(numResults)]
+        arrayD = columns.allocate(len(runList)) if columns else {}
+        dS = MultiProcDiagSummary(**self.__diagD)
+        numRetries = 0
+        while subLists:
+            lostLists = []
+            lostIndexLists = []
+            for chunkId, rTup in self.__runChunks(subLists, numProc, numResults, workerFunc, reduceD=self.__reduceD, partialList=partialList, columns=columns):
+                if rTup is None:
+                    # chunk lost to a worker process exit
+                    if retryLost and len(subLists[chunkId]) > 1:
+                        lostList = subLists[chunkId]
+                        lostLists.extend([lostList[: len(lostList) // 2], lostList[len(lostList) // 2 :]])
+                        if indexLists is not None:
+                            lostIndexList = indexLists[chunkId]
+                            lostIndexLists.extend([lostIndexList[: len(lostList) // 2], lostIndexList[len(lostList) // 2 :]])
+                    else:
+                        numFailures += len(subLists[chunkId])
+                        if retryLost:
+                            dS.extend(["WorkerExit: worker process exited processing item"])
+                    if eD["maxFailures"] and numFailures >= eD["maxFailures"]:
+                        self.__stopReason = "maxFailures"
+                    continue
+                numFailures += len(subLists[chunkId]) - len(rTup[0] or [])
+                if eD["maxFailures"] and numFailures >= eD["maxFailures"]:
+                    self.__stopReason = "maxFailures"
+                elif eD["stopFn"] and eD["stopFn"](rTup):
+                    self.__stopReason = "predicate"
+                dS.update(rTup[-1])
+                if groupD is not None:
+                    self.__fanOut(rTup, numResults, groupD, keyFn, fanOut, successList, retLists)
+                    continue
+                rV = rTup[0]
                 if rV is not None and rV:
-                    retLists[ii].extend(rV)
+                    successList.extend(rV)
+                if columns:
+                    self.__storeColumns(columns, arrayD, subLists[chunkId], indexLists[chunkId], rTup)
 
-            np -= 1
+                for ii in range(numResults):
+                    rV = rTup[ii + 1]
+                    if ii not in arrayD and rV is not None and rV:
+                        retLists[ii].extend(rV)
+            if lostLists:
+                numRetries += len(lostLists)
+                logger.debug("Retrying %d chunks split from chunks lost to worker process exits", len(lostLists))
+            subLists = lostLists if not self.__stopReason else []
+            indexLists = lostIndexLists if indexLists is not None else None
+            numProc = min(numProc, len(subLists))
+        if numRetries:
+            self.__runStatsD["retriedChunks"] = numRetries
         #
-        try:
-            diagList = list(set(tL))
-        except TypeError:
-            diagList = tL
+        for retList in retLists:
+            if isinstance(retList, MultiProcResultStore):
+                retList.flush()
+        for ii, arr in arrayD.items():
+            retLists[ii] = arr
+        if self.__reduceD:
+            self.__runStatsD["reduce"] = {"partials": len(partialList)}
+            retLists = MultiProcListUtil().treeReduce(partialList, self.__reduceD["combineFn"])
+        self.__diagSummary = dS
+        diagList = dS.getDiagList()
+        self.__mergeProfiles()
+        if self.__memorySummary:
+            self.__runStatsD["memory"] = self.__memorySummary.getSummary()
         #
         logger.debug("Input task length %d success length %d", len(dataList), len(successList))
-        try:
-            for wT in workers:
-                wT.terminate()
-                wT.join(1)
-        except Exception as e:
-            logger.error("termination/reaping failing\n")
-            logger.exception("Failing with %s", str(e))
-
         #
         if len(dataList) == len(successList):
             logger.debug("Complete run  - input task length %d success length %d", len(dataList), len(successList))
@@ -208,34 +812,457 @@ class MultiProcUtil(object):
             # logger.debug("data list %r " % dataList[:4])
             # logger.debug("successlist %r " % successList[:4])
             # failList = list(set(dataList) - set(successList))
-            failList = self.__diffList(dataList, successList)
+            failList = MultiProcListUtil().diffList(dataList, successList)
             logger.debug("Incomplete run  - input task length %d success length %d fail list %d", len(dataList), len(successList), len(failList))
 
             return False, failList, retLists, diagList
 
-    def __isHashable(self, v):
-        """ Test if the input value is hashable
+    def __storeColumns(self, columns, arrayD, chunkList, indexList, rTup):
+        """ Write the packed column rows of the input chunk result tuple at the input positions of its successful items.
         """
-        try:
-            hash(v)
-        except TypeError:
-            return False
-        return True
+        positionList = MultiProcListUtil().getSubsequenceIndices(chunkList, rTup[0] or [])
+        if positionList is None:
+            raise ValueError("Result columns require the success list of each chunk in chunk order")
+        columns.store(arrayD, [indexList[jj] for jj in positionList], rTup)
 
-    def __diffList(self, l1, l2):
-        """ List difference -  elements in l1 not in l2
+    def __groupItems(self, dataList, keyFn):
+        """ Return the distinct items of the input dataList (first occurrences in input order) and
+            the dictionary {key: [item, ...]} of all copies of each distinct item.
         """
+        groupD = {}
+        distinctList = []
+        for item in dataList:
+            key = self.__getItemKey(item, keyFn)
+            if key not in groupD:
+                groupD[key] = []
+                distinctList.append(item)
+            groupD[key].append(item)
+        return distinctList, groupD
+
+    def __getItemKey(self, item, keyFn):
+        key = keyFn(item) if keyFn else item
+        return key if MultiProcListUtil().isHashable(key) else repr(key)
+
+    def __fanOut(self, rTup, numResults, groupD, keyFn, fanOut, successList, retLists):
+        """ Accumulate the input chunk result tuple repeating success (and per-item results if 'fanOut')
+            for each copy of the successful distinct items.
+        """
+        for jj, item in enumerate(rTup[0] or []):
+            copyList = groupD.get(self.__getItemKey(item, keyFn), [item])
+            successList.extend(copyList)
+            if fanOut:
+                for ii in range(numResults):
+                    retLists[ii].extend([rTup[ii + 1][jj]] * len(copyList))
+        if not fanOut:
+            for ii in range(numResults):
+                rV = rTup[ii + 1]
+                if rV is not None and rV:
+                    retLists[ii].extend(rV)
+
+    def __runChunks(self, subLists, numProc, numResults, workerFunc, reduceD=None, partialList=None, timingD=None, columns=None):
+        """ Dispatch the input chunks to a set of 'numProc' worker processes running 'workerFunc' and
+            yield (chunkId, rTup) as each chunk is completed (rTup is None for a chunk that is lost).
+
+            Each worker returns messages on its own pipe so that a worker that dies cannot block the
+            others.  Chunks are dispatched as they are completed (at most 2 * numProc outstanding), and
+            dispatch is held back while the total worker resident size is near the memory budget.
+            Workers leaving the task loop for recycling are replaced while work remains, and the chunk
+            held by a worker that dies unexpectedly is reported as lost.  Dispatched chunks not taken by any
+            worker after a worker has died without reporting a chunk (e.g. killed between taking a chunk
+            and reporting it) are reported as lost once all workers have been idle for a while.
+
+            With a reducer ('reduceD'), the chunk results of each worker are held back until the worker partial
+            aggregate arrives (appended to 'partialList'), so workers are stopped once all chunks are
+            complete and the chunks of a worker that dies before returning its partial are lost.
+
+            With 'timingD', the time from the start of each chunk in the worker to the arrival of its
+            result is recorded as {chunkId: seconds}.
+
+            With result 'columns' (MultiProcResultColumns), workers pack the column result lists as arrays.
+
+            With speculation (setSpeculation(), not applied with a reducer), copies of the longest-running chunks
+            are dispatched to idle workers once all chunks have been taken.  The first result of a chunk is
+            yielded, later results are discarded and workers running obsolete copies are terminated.  A chunk
+            is only reported as lost when no other copy remains in progress.
+        """
+        rU = MultiProcResourceUtil()
+        maxChunks = self.__workerLimitD["maxChunksPerWorker"]
+        maxRss = self.__workerLimitD["maxRssPerWorker"]
+        memoryBudget = self.__workerLimitD["memoryBudget"]
+        serializer = self.__serializer
+        resultSerializer = serializer
+        if self.__compressionD:
+            resultSerializer = MultiProcCompressingSerializer(serializer=serializer, **self.__compressionD)
+        reduceD = reduceD if reduceD else {}
+        threadD = None
+        if self.__threadLimitD is not None:
+            threadsPerProc = self.__threadLimitD["threadsPerProc"]
+            threadD = {"numThreads": threadsPerProc or rU.getThreadBudget(numProc), "override": bool(threadsPerProc)}
+            self.__runStatsD["threadLimit"] = {"threadsPerProc": threadD["numThreads"]}
+        specD = self.__speculationD if not reduceD else None
+        specStatsD = {"copies": 0, "won": 0, "discarded": 0, "terminated": 0}
+        eD = self.__earlyStopD
+        signalL = []
+        handlerD = {}
+        if eD["handleSignals"] and threading.current_thread() is threading.main_thread():
+
+            def onSignal(signum, frame):
+                logger.warning("Received signal %d -- stopping workers", signum)
+                signalL.append(signum)
+
+            for signum in [signal.SIGINT, signal.SIGTERM]:
+                handlerD[signum] = signal.signal(signum, onSignal)
+        #
+        taskQueue = multiprocessing.Queue()
+        connD = {}
+
+        def startWorker():
+            reader, writer = multiprocessing.Pipe(duplex=False)
+            wT = MultiProcWorker(
+                taskQueue,
+                writer,
+                workerFunc,
+                verbose=self.__verbose,
+                optionsD=self.__optionsD,
+                workingDir=self.__workingDir,
+                maxChunks=maxChunks,
+                maxRss=maxRss,
+                serializer=serializer,
+                resultSerializer=resultSerializer,
+                reduceFn=reduceD.get("reduceFn"),
+                combineFn=reduceD.get("combineFn"),
+                diagD=self.__diagD,
+                ignoreSigInt=bool(handlerD),
+                runId=self.__runId,
+                memoryD=self.__memoryD,
+                columns=columns,
+                threadD=threadD,
+            )
+            wT.start()
+            # close the parent copy so that the death of the worker is seen as end-of-file
+            writer.close()
+            connD[reader] = wT
+
+        def stopWorker(processName):
+            # terminate the worker running an obsolete chunk copy
+            for reader, wT in list(connD.items()):
+                if wT.name == processName:
+                    logger.debug("%s terminating obsolete chunk copy", processName)
+                    wT.terminate()
+                    wT.join(1)
+                    reader.close()
+                    del connD[reader]
+                    activeD.pop(processName, None)
+                    copyProcS.discard(processName)
+                    specStatsD["terminated"] += 1
+                    if numDone + numSkipped < numChunks:
+                        startWorker()
+
+        pendingL = [(chunkId, subList) for chunkId, subList in enumerate(subLists)]
+        pendingL.reverse()
+        numChunks = len(pendingL)
+        numDispatched = 0
+        numDone = 0
+        activeD = {}
+        heldD = {}
+        collecting = False
+        numSkipped = 0
+        stopTime = None
+        unstartedD = {}
+        lostS = set()
+        numSilentExits = 0
+        chunkStartD = {}
+        firstStartD = {}
+        copiesD = {}
+        copyProcS = set()
+        doneS = set()
+        numQueuedCopies = 0
+        lastEventTime = time.time()
         try:
-            return list(set(l1) - set(l2))
-        except TypeError:
+            #
+            #  Create worker processes
+            #
+            for _ in range(numProc):
+                startWorker()
+            #
+            while numDone + numSkipped < numChunks or heldD:
+                if stopTime is None and not collecting:
+                    if signalL:
+                        self.__stopReason = "signal"
+                    elif eD["cancelToken"] is not None and eD["cancelToken"].is_set():
+                        self.__stopReason = "cancelled"
+                    if self.__stopReason:
+                        logger.info("Stopping run (%s) with %d of %d chunks complete", self.__stopReason, numDone, numChunks)
+                        stopTime = time.time()
+                        numSkipped += len(pendingL)
+                        pendingL = []
+                        if not eD["drain"]:
+                            numSkipped += self.__discardTasks(taskQueue)
+                        continue
+                elif stopTime is not None and time.time() - stopTime > self.__exitTimeout:
+                    break
+                if numDone + numSkipped >= numChunks and not collecting:
+                    # all chunks are complete -- stop the workers to collect their partial aggregates
+                    for _ in range(len(connD)):
+                        taskQueue.put(None)
+                    collecting = True
+                #
+                # Keep the task queue primed unless the memory budget is exhausted
+                while pendingL and numDispatched - numDone < 2 * numProc:
+                    if memoryBudget and numDispatched > numDone:
+                        totalRss = sum([rU.getProcessRss(wT.pid) or 0 for wT in connD.values()])
+                        if totalRss > self.__memoryThrottleFraction * memoryBudget:
+                            logger.debug("Throttling dispatch with total worker resident size %d bytes (budget %d)", totalRss, memoryBudget)
+                            break
+                    chunkId, subList = pendingL.pop()
+                    if serializer is not None:
+                        data, bufferList = serializer.dumps(subList)
+                        subList = (data, [bytes(buf) for buf in bufferList])
+                    taskQueue.put((chunkId, subList))
+                    unstartedD[chunkId] = True
+                    numDispatched += 1
+                    lastEventTime = time.time()
+                #
+                if numSilentExits and unstartedD and not activeD and stopTime is None and time.time() - lastEventTime > self.__unstartedTimeout:
+                    # the dispatched chunks still outstanding were taken by workers that died before reporting them
+                    logger.error("Chunks %r were not started by any worker -- reporting them as lost", sorted(unstartedD))
+                    for chunkId in sorted(unstartedD):
+                        lostS.add(chunkId)
+                        numDone += 1
+                        yield chunkId, None
+                    unstartedD = {}
+                    numSilentExits = 0
+                #
+                if specD and not pendingL and not unstartedD and stopTime is None and not collecting:
+                    # copy the longest-running chunks in progress onto the idle workers
+                    numIdle = len(connD) - len(activeD) - numQueuedCopies
+                    if numIdle > 0:
+                        curTime = time.time()
+                        candidateL = sorted(
+                            [
+                                (firstStartD[chunkId], chunkId)
+                                for chunkId in set(activeD.values())
+                                if copiesD.get(chunkId, 0) < specD["maxCopies"] and curTime - firstStartD[chunkId] >= specD["minElapsed"]
+                            ]
+                        )
+                        for startTime, chunkId in candidateL[:numIdle]:
+                            subList = subLists[chunkId]
+                            if serializer is not None:
+                                data, bufferList = serializer.dumps(subList)
+                                subList = (data, [bytes(buf) for buf in bufferList])
+                            taskQueue.put((chunkId, subList))
+                            copiesD[chunkId] = copiesD.get(chunkId, 0) + 1
+                            numQueuedCopies += 1
+                            specStatsD["copies"] += 1
+                            logger.debug("Speculative copy of chunk %d running for %.2f seconds", chunkId, curTime - startTime)
+                #
+                for reader in multiprocessing.connection.wait(list(connD.keys()), timeout=self.__pollInterval):
+                    if reader not in connD:
+                        # terminated after an obsolete chunk copy
+                        continue
+                    lastEventTime = time.time()
+                    wT = connD[reader]
+                    try:
+                        msgType, chunkId, processName, payload = self.__recvMessage(reader, resultSerializer)
+                    except EOFError:
+                        wT.join(1)
+                        logger.error("%s exited unexpectedly with code %r", wT.name, wT.exitcode)
+                        reader.close()
+                        del connD[reader]
+                        if wT.name in activeD:
+                            chunkId = activeD.pop(wT.name)
+                            copyProcS.discard(wT.name)
+                            if chunkId not in doneS and chunkId not in activeD.values():
+                                # no other copy of the chunk is in progress
+                                lostS.add(chunkId)
+                                numDone += 1
+                                yield chunkId, None
+                        else:
+                            numSilentExits += 1
+                        for chunkId, _ in heldD.pop(wT.name, []):
+                            yield chunkId, None
+                        if numDone + numSkipped < numChunks:
+                            startWorker()
+                        continue
+                    #
+                    if chunkId in lostS:
+                        # a chunk already reported as lost was taken after all -- its result is ignored
+                        if msgType == "start":
+                            continue
+                        if msgType == "result":
+                            activeD.pop(processName, None)
+                            continue
+                    if chunkId in doneS and msgType in ["start", "result", "memory"]:
+                        # a copy of a completed chunk
+                        if msgType == "start":
+                            numQueuedCopies -= 1
+                            activeD[processName] = chunkId
+                            stopWorker(processName)
+                        elif msgType == "result":
+                            activeD.pop(processName, None)
+                            copyProcS.discard(processName)
+                            specStatsD["discarded"] += 1
+                        continue
+                    if msgType == "start":
+                        unstartedD.pop(chunkId, None)
+                        activeD[processName] = chunkId
+                        if timingD is not None:
+                            chunkStartD[chunkId] = payload
+                        if specD:
+                            if chunkId in firstStartD:
+                                numQueuedCopies -= 1
+                                copyProcS.add(processName)
+                            else:
+                                firstStartD[chunkId] = payload
+                    elif msgType == "result":
+                        activeD.pop(processName, None)
+                        numDone += 1
+                        if chunkId in chunkStartD:
+                            timingD[chunkId] = time.time() - chunkStartD.pop(chunkId)
+                        if specD:
+                            doneS.add(chunkId)
+                            firstStartD.pop(chunkId, None)
+                            if processName in copyProcS:
+                                copyProcS.discard(processName)
+                                specStatsD["won"] += 1
+                            for pN in [pN for pN, cId in activeD.items() if cId == chunkId]:
+                                stopWorker(pN)
+                        if reduceD:
+                            heldD.setdefault(processName, []).append((chunkId, payload))
+                        else:
+                            yield chunkId, payload
+                    elif msgType == "memory":
+                        if self.__memorySummary:
+                            self.__memorySummary.update(payload)
+                    elif msgType == "partial":
+                        partialList.append(payload)
+                        for chunkId, rTup in heldD.pop(processName, []):
+                            yield chunkId, rTup
+                    elif msgType == "exit":
+                        reader.close()
+                        del connD[reader]
+                        wT.join(1)
+                        if payload == "recycled" and numDone + numSkipped < numChunks:
+                            startWorker()
+        finally:
+            # workers still busy after a stop are terminated without a further wait
+            stopTimeout = 0.0 if stopTime is not None and time.time() - stopTime > self.__exitTimeout else self.__exitTimeout
+            if numQueuedCopies > 0:
+                # chunk copies not yet taken by any worker
+                self.__discardTasks(taskQueue)
+            if specD:
+                self.__runStatsD["speculation"] = specStatsD
+            self.__stopWorkers(taskQueue, connD, resultSerializer, timeout=stopTimeout)
+            if self.__compressionD:
+                self.__runStatsD["compression"] = resultSerializer.getStats()
+                logger.debug("Result compression statistics %r", self.__runStatsD["compression"])
+            if self.__stopReason:
+                self.__runStatsD["earlyStop"] = {"reason": self.__stopReason, "skippedChunks": numSkipped}
+            for signum, handler in handlerD.items():
+                signal.signal(signum, handler)
+            if signalL:
+                # deliver the signal to the restored handler once the workers are reaped
+                signal.raise_signal(signalL[0])
+
+    def __discardTasks(self, taskQueue):
+        """ Remove the queued chunks from the input task queue and return the number removed
+            (end-of-queue sentinels are returned to the queue).
+        """
+        numDiscarded = 0
+        numSentinels = 0
+        while True:
             try:
-                idD1 = {id(t): ii for ii, t in enumerate(l1)}
-                idD2 = {id(t): ii for ii, t in enumerate(l2)}
-                idDifL = list(set(idD1.keys()) - set(idD2.keys()))
-                return [l1[idD1[ind]] for ind in idDifL]
-            except Exception as e:
-                logger.exception("Failing with %s", str(e))
+                task = taskQueue.get(timeout=0.05)
+            except queue.Empty:
+                break
+            if task is None:
+                numSentinels += 1
+            else:
+                numDiscarded += 1
+        for _ in range(numSentinels):
+            taskQueue.put(None)
+        return numDiscarded
+
+    def __recvMessage(self, reader, serializer):
+        """ Read the next worker message (and any serialized result payload) from the input connection.
+        """
+        msgType, chunkId, processName, payload = reader.recv()
+        if msgType in ["result", "partial"] and serializer is not None:
+            data = reader.recv_bytes()
+            bufferList = [reader.recv_bytes() for _ in range(payload)]
+            payload = serializer.loads(data, bufferList)
+        return msgType, chunkId, processName, payload
+
+    def __stopWorkers(self, taskQueue, connD, serializer, timeout=None):
+        """ Send end-of-queue sentinels and reap the input workers -- workers that fail to
+            exit within 'timeout' seconds (default the worker exit timeout) are terminated.
+        """
+        try:
+            for _ in range(len(connD)):
+                taskQueue.put(None)
+            endTime = time.time() + (self.__exitTimeout if timeout is None else timeout)
+            while connD and time.time() < endTime:
+                for reader in multiprocessing.connection.wait(list(connD.keys()), timeout=self.__pollInterval):
+                    try:
+                        msgType = self.__recvMessage(reader, serializer)[0]
+                    except EOFError:
+                        msgType = "exit"
+                    if msgType == "exit":
+                        reader.close()
+                        connD.pop(reader).join(1)
+            for reader, wT in connD.items():
+                logger.debug("%s terminating", wT.name)
+                wT.terminate()
+                wT.join(1)
+                reader.close()
+            connD.clear()
+            # discard any undelivered tasks
+            taskQueue.close()
+            taskQueue.cancel_join_thread()
         except Exception as e:
+            logger.error("termination/reaping failing\n")
             logger.exception("Failing with %s", str(e))
 
-        return []
+    def calibrateNumProc(self, dataList, numResults=1, chunkSize=0, candidateList=None, sampleSize=100):
+        """ Select the number of worker processes by timing runs over a random sample of the input dataList.
+
+            Returns,   numProc, {numProc: items/second, ...}
+        """
+        return self.__calibrateNumProc(dataList, self.__workerFunc, numResults=numResults, chunkSize=chunkSize, candidateList=candidateList, sampleSize=sampleSize)
+
+    def __calibrateNumProc(self, dataList, workerFunc, numResults=1, chunkSize=0, candidateList=None, sampleSize=100):
+        rU = MultiProcResourceUtil()
+        numCpu = rU.getEffectiveCpuCount()
+        if not candidateList:
+            candidateList = [max(1, int(numCpu / 2)), numCpu, 2 * numCpu, 4 * numCpu]
+        sampleList = random.sample(dataList, min(len(dataList), sampleSize))
+
+        def runFunc(numProc):
+            _, _, _, _ = self.__run(workerFunc, sampleList, numProc=numProc, numResults=numResults, chunkSize=chunkSize)
+            return len(sampleList)
+
+        # time the plain execution of the sample -- without result spill, deduplication, early stop or profiling
+        savedL = [self.__spillDirPath, self.__dedupD, self.__earlyStopD, self.__profileD, self.__memoryD]
+        self.__spillDirPath = None
+        self.__dedupD = None
+        self.__profileD = None
+        self.__memoryD = None
+        self.__earlyStopD = {"maxFailures": 0, "stopFn": None, "cancelToken": None, "drain": False, "handleSignals": savedL[2]["handleSignals"]}
+        try:
+            return rU.calibrateNumProc(runFunc, candidateList)
+        finally:
+            self.__spillDirPath, self.__dedupD, self.__earlyStopD, self.__profileD, self.__memoryD = savedL
+
+    def __getNumProc(self, dataList, workerFunc, numResults=1, chunkSize=0):
+        """ Apply the current worker count policy.
+        """
+        pD = self.__numProcPolicyD
+        rU = MultiProcResourceUtil()
+        numProc = rU.getNumProc(workload=pD["workload"], memoryPerProc=pD["memoryPerProc"])
+        if pD["calibrate"] and dataList:
+            # do not probe beyond the memory bounded count
+            candidateList = [1, int(numProc / 2), numProc] if pD["memoryPerProc"] else [1, int(numProc / 2), numProc, 2 * numProc]
+            numProcC, rateD = self.__calibrateNumProc(dataList, workerFunc, numResults=numResults, chunkSize=chunkSize, candidateList=candidateList, sampleSize=pD["sampleSize"])
+            logger.info("Calibrated numProc %d (policy %d) rates %r", numProcC, numProc, rateD)
+            numProc = numProcC
+        return numProc
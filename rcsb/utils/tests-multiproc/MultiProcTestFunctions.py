@@ -0,0 +1,80 @@
+##
+# File:    MultiProcTestFunctions.py
+# Author:  jdw
+# Date:    19-Oct-2026
+#
+# Updates:
+#
+##
+"""
+Module level item, reduction and combination functions shared by the multiprocessing test cases --
+
+"""
+
+__docformat__ = "restructuredtext en"
+__author__ = "John Westbrook"
+__email__ = "john.westbrook@rcsb.org"
+__license__ = "Apache 2.0"
+
+import collections
+import os
+import time
+
+
+def countLengths(resultLists):
+    """Reduce the first result list of a chunk to the counts of string lengths."""
+    return collections.Counter([len(tS) for tS in resultLists[0]])
+
+
+def mergeCounts(countA, countB):
+    return countA + countB
+
+
+def scaleItem(item):
+    """Return (id, 2 * size) for the input item -- items with sizes divisible by 7 fail and the item 'crash' exits the worker process."""
+    if item["id"] == "crash":
+        os._exit(1)
+    if item["size"] % 7 == 0:
+        raise ValueError("size divisible by 7")
+    return item["id"], 2 * item["size"]
+
+
+def makeScaler(item):
+    """Return a closure (requires dill to serialize)."""
+    return lambda v: v * len(item)
+
+
+def allocateItem(item):
+    """Allocate (and release) a buffer of 10000 bytes per unit of the item size -- returns the buffer length."""
+    buf = bytearray(10000 * item["size"])
+    return len(buf)
+
+
+def sleepItem(item):
+    """Return the input item after 5 ms."""
+    time.sleep(0.005)
+    return item
+
+
+def measureItem(item):
+    """Return (size / 2, [size, 2 * size, 3 * size]) for the input item -- items with sizes divisible by 7 fail and the item 'crash' exits the worker process."""
+    if item["id"] == "crash":
+        os._exit(1)
+    if item["size"] % 7 == 0:
+        raise ValueError("size divisible by 7")
+    return item["size"] / 2.0, [item["size"], 2 * item["size"], 3 * item["size"]]
+
+
+def getThreadLimit(item):
+    """Return the OpenMP thread count environment limit of the worker process."""
+    _ = item
+    return os.environ.get("OMP_NUM_THREADS")
+
+
+def stallOnceItem(item):
+    """Return the item id -- the first run of an item with a 'markerPath' creates the marker and stalls for 'delay' seconds."""
+    if item.get("markerPath") and not os.path.exists(item["markerPath"]):
+        with open(item["markerPath"], "w") as ofh:
+            ofh.write(item["id"])
+        time.sleep(item["delay"])
+    return item["id"]
@@ -0,0 +1,74 @@
+##
+# File:    testMultiProcDiagnostics.py
+# Author:  jdw
+# Date:    19-Oct-2026
+#
+# Updates:
+#
+##
+"""
+Test cases for diagnostic count aggregation --
+
+"""
+
+__docformat__ = "restructuredtext en"
+__author__ = "John Westbrook"
+__email__ = "john.westbrook@rcsb.org"
+__license__ = "Apache 2.0"
+
+import json
+import logging
+import unittest
+
+from rcsb.utils.multiproc.MultiProcDiagnostics import MultiProcDiagSummary
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s]-%(module)s.%(funcName)s: %(message)s")
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+
+class MultiProcDiagnosticsTests(unittest.TestCase):
+    def setUp(self):
+        self.__diagList = ["missing chem comp %s" % ccId for ccId in ["ATP", "HEM", "ATP", "NAG"] * 250] + ["bad resolution", " ", None, ["unhashable"]]
+
+    def tearDown(self):
+        pass
+
+    def testSummaryCounts(self):
+        """Test case - counts, samples, key bounds and merging of plain forms"""
+        dS = MultiProcDiagSummary()
+        dS.extend(self.__diagList)
+        self.assertEqual(dS.getCounts()["missing chem comp ATP"], 500)
+        self.assertEqual(len(dS), 6)
+        self.assertIn(["unhashable"], dS.getDiagList())
+        #
+        dS = MultiProcDiagSummary(keyFn=lambda diag: str(diag).split(" ")[0], maxSamples=2)
+        dS.extend(self.__diagList)
+        sD = dS.getSummary()
+        self.assertEqual(sD["counts"][0]["key"], "missing")
+        self.assertEqual(sD["counts"][0]["count"], 1000)
+        self.assertEqual(sD["counts"][0]["samples"], ["missing chem comp ATP", "missing chem comp HEM"])
+        #
+        # merge serialized worker summaries into a bounded parent summary
+        pS = MultiProcDiagSummary(maxKeys=2)
+        for _ in range(3):
+            wS = MultiProcDiagSummary()
+            wS.extend(self.__diagList)
+            pS.update(json.loads(json.dumps(wS.getState())))
+        sD = pS.getSummary(maxReport=1)
+        logger.info("Summary %r", sD)
+        self.assertEqual(sD["distinct"], 2)
+        self.assertEqual(sD["total"], 3 * 1003)
+        self.assertEqual(len(sD["counts"]), 1)
+        self.assertEqual(sD["counts"][0]["count"], 1500)
+
+
+def suiteDiagnostics():
+    suiteSelect = unittest.TestSuite()
+    suiteSelect.addTest(MultiProcDiagnosticsTests("testSummaryCounts"))
+    return suiteSelect
+
+
+if __name__ == "__main__":
+    mySuite = suiteDiagnostics()
+    unittest.TextTestRunner(verbosity=2).run(mySuite)
@@ -6,6 +6,9 @@
 #
 # Updates:
 # 28-Jun-2018  jdw changed logging level to error to avoid confusion with testing frameworks
+# 19-Oct-2026  jdw add tests for batched log record shipping
+# 19-Oct-2026  jdw add test for queue handler level filtering
+# 19-Oct-2026  jdw add test for bounded logging queue overflow policies
 #
 ##
 """
@@ -25,6 +28,8 @@ __author__ = "John Westbrook"
 __email__ = "jwest@rcsb.rutgers.edu"
 __license__ = "Apache 2.0"
 
+import glob
+import json
 import logging
 import os
 import sys
@@ -32,7 +37,8 @@ import time
 import unittest
 from io import StringIO
 
-from rcsb.utils.multiproc.MultiProcLogging import MultiProcLogging
+from rcsb.utils.multiproc.MultiProcLogging import MultiProcJsonFormatter, MultiProcLogging, MultiProcLoggingService
+from rcsb.utils.multiproc.MultiProcPoolUtil import MultiProcPoolUtil
 from rcsb.utils.multiproc.MultiProcUtil import MultiProcUtil
 
 logging.basicConfig(level=logging.INFO, format="MAIN-%(asctime)s [%(levelname)s]-%(module)s.%(funcName)s: %(message)s")
@@ -40,6 +46,24 @@ logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
 
+def logItem(item):
+    logger.info("processing item")
+    return item
+
+
+class SlowHandler(logging.Handler):
+    """Handler recording the levels of the records it handles slowly."""
+
+    def __init__(self, delay=0.002):
+        logging.Handler.__init__(self)
+        self.delay = delay
+        self.levelList = []
+
+    def emit(self, record):
+        time.sleep(self.delay)
+        self.levelList.append(record.levelno)
+
+
 class MultiProcLoggingTests(unittest.TestCase):
     def setUp(self):
 
@@ -48,9 +72,17 @@ class MultiProcLoggingTests(unittest.TestCase):
         self.__startTime = time.time()
         self.__testLogPath = os.path.join(os.path.abspath(os.path.dirname(__file__)), "temp-output", "TESTLOGFILE.LOG")
         self.__mpFormat = "[%(levelname)s] %(asctime)s %(processName)s-%(module)s.%(funcName)s: %(message)s"
+        self.__rootHandlers = list(logging.getLogger().handlers)
+        self.__rootPropagate = logging.getLogger().propagate
         logger.debug("Starting %s at %s", self.id(), time.strftime("%Y %m %d %H:%M:%S", time.localtime()))
 
     def tearDown(self):
+        rootLogger = logging.getLogger()
+        for handler in list(rootLogger.handlers):
+            rootLogger.removeHandler(handler)
+        for handler in self.__rootHandlers:
+            rootLogger.addHandler(handler)
+        rootLogger.propagate = self.__rootPropagate
         endTime = time.time()
         logger.debug("Completed %s at %s (%.4f seconds)", self.id(), time.strftime("%Y %m %d %H:%M:%S", time.localtime()), endTime - self.__startTime)
 
@@ -70,6 +102,28 @@ class MultiProcLoggingTests(unittest.TestCase):
 
         return successList, [], []
 
+    def workerTwo(self, dataList, procName, optionsD, workingDir):
+        """Log each input item at INFO level (buffered by the batching queue handler)."""
+        _ = workingDir
+        successList = []
+        for dD in dataList:
+            for ii in range(optionsD.get("recordsPerItem", 1)):
+                logger.info("%s value %s record %d", procName, dD, ii)
+            successList.append(dD)
+        return successList, [], []
+
+    def __getStringLogger(self):
+        slogger = logging.getLogger()
+        slogger.propagate = False
+        for handler in list(slogger.handlers):
+            slogger.removeHandler(handler)
+        stream = StringIO()
+        sh = logging.StreamHandler(stream=stream)
+        sh.setLevel(logging.DEBUG)
+        sh.setFormatter(logging.Formatter("STRING-%(processName)s: %(message)s"))
+        slogger.addHandler(sh)
+        return slogger, sh, stream
+
     def testLogStream(self):
         """Test case -  context manager - with default root logger"""
         try:
@@ -313,6 +367,223 @@ class MultiProcLoggingTests(unittest.TestCase):
             logger.exception("context logging record %s", str(e))
             self.fail()
 
+    @unittest.skipIf(sys.version_info[0] < 3, "not supported in this python version")
+    def testLogBatchMultiProc(self):
+        """Test case -  batched records from worker processes are flushed on size and at worker exit"""
+        try:
+            dataList = list(range(1, 21))
+            slogger, sh, stream = self.__getStringLogger()
+            with MultiProcLogging(logger=slogger, fmt=self.__mpFormat, level=logging.DEBUG, batchSize=7, flushInterval=60.0):
+                mpu = MultiProcUtil(verbose=True)
+                mpu.setOptions(optionsD={"recordsPerItem": 3})
+                mpu.set(workerObj=self, workerMethod="workerTwo")
+                ok, failList, _, _ = mpu.runMulti(dataList=dataList, numProc=2, numResults=1, chunkSize=5)
+                self.assertEqual(len(failList), 0)
+                self.assertTrue(ok)
+            slogger.removeHandler(sh)
+            stream.seek(0)
+            logLines = [line for line in stream.readlines() if " record " in line]
+            self.assertEqual(len(logLines), 3 * len(dataList))
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
+    @unittest.skipIf(sys.version_info[0] < 3, "not supported in this python version")
+    def testLogBatchInterval(self):
+        """Test case -  buffered records are shipped after the flush interval without further logging"""
+        try:
+            slogger, sh, stream = self.__getStringLogger()
+            with MultiProcLogging(logger=slogger, fmt=self.__mpFormat, level=logging.DEBUG, batchSize=100, flushInterval=0.2) as wlogger:
+                for ii in range(3):
+                    wlogger.info("interval record %d", ii)
+                time.sleep(1.0)
+                numShipped = len(stream.getvalue().splitlines())
+            slogger.removeHandler(sh)
+            self.assertEqual(numShipped, 3)
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
+    def testLogLevelFilter(self):
+        """Test case -  the queue handler level is the lowest level of the wrapped handlers"""
+        try:
+            slogger, sh, stream = self.__getStringLogger()
+            sh.setLevel(logging.WARNING)
+            with MultiProcLogging(logger=slogger, fmt=self.__mpFormat) as wlogger:
+                self.assertEqual([hw.level for hw in wlogger.handlers], [logging.WARNING])
+                wlogger.info("filtered record")
+                wlogger.warning("shipped record")
+            self.assertEqual(sh.level, logging.WARNING)
+            self.assertEqual(stream.getvalue().count("record"), 1)
+            #
+            with MultiProcLogging(logger=slogger, fmt=self.__mpFormat, level=logging.DEBUG) as wlogger:
+                self.assertEqual([hw.level for hw in wlogger.handlers], [logging.DEBUG])
+            slogger.removeHandler(sh)
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
+    def testLogBoundedQueue(self):
+        """Test case -  bounded logging queue overflow policies and counters"""
+        try:
+            numRecords = 200
+            for policy in ["block", "drop_oldest", "drop_below", "sample"]:
+                blogger = logging.getLogger("bounded-%s" % policy)
+                blogger.propagate = False
+                blogger.setLevel(logging.INFO)
+                bh = SlowHandler()
+                blogger.addHandler(bh)
+                mpl = MultiProcLogging(logger=blogger, batchSize=1, maxQueueSize=5, overflowPolicy=policy, sampleRate=4)
+                with mpl as wlogger:
+                    for ii in range(numRecords):
+                        if ii % 10 == 0:
+                            wlogger.warning("bounded record %d", ii)
+                        else:
+                            wlogger.info("bounded record %d", ii)
+                    self.assertLessEqual(mpl.getBacklog(), 5)
+                sD = mpl.getStats()
+                logger.info("Policy %s handled %d stats %r", policy, len(bh.levelList), sD)
+                blogger.removeHandler(bh)
+                self.assertEqual(len(bh.levelList) + sD["dropped"], numRecords)
+                if policy == "block":
+                    self.assertEqual(sD["dropped"], 0)
+                    self.assertGreater(sD["delayed"], 0)
+                else:
+                    self.assertGreater(sD["dropped"], 0)
+                if policy == "drop_below":
+                    self.assertEqual(bh.levelList.count(logging.WARNING), numRecords // 10)
+            self.assertRaises(ValueError, MultiProcLogging, logger=logger, maxQueueSize=5, overflowPolicy="unknown")
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
+    def testLogService(self):
+        """Test case -  consecutive runs attached to a shared logging service with flush barriers"""
+        try:
+            dataList = list(range(1, 11))
+            svc = MultiProcLoggingService()
+            slogger, sh, stream = self.__getStringLogger()
+            olog = logging.getLogger("service-other")
+            olog.propagate = False
+            oh = SlowHandler(delay=0.0)
+            olog.addHandler(oh)
+            for run in range(3):
+                mpl = MultiProcLogging(logger=slogger, fmt=self.__mpFormat, level=logging.DEBUG, batchSize=20, flushInterval=60.0, service=svc)
+                with mpl:
+                    with MultiProcLogging(logger=olog, service=svc) as wlogger:
+                        wlogger.warning("other record %d", run)
+                    mpu = MultiProcUtil(verbose=True)
+                    mpu.setOptions(optionsD={"recordsPerItem": 2})
+                    mpu.set(workerObj=self, workerMethod="workerTwo")
+                    ok, failList, _, _ = mpu.runMulti(dataList=dataList, numProc=2, numResults=1, chunkSize=5)
+                    self.assertTrue(ok)
+                    # no delay -- the barrier returns once every enqueued record is handled
+                    self.assertTrue(mpl.flush(timeout=10.0))
+                    self.assertEqual(len([line for line in stream.getvalue().splitlines() if " record " in line]), 2 * len(dataList) * (run + 1))
+                self.assertFalse(svc.isStopped())
+                sD = svc.getStats()
+                self.assertEqual(sD["enqueued"], sD["handled"])
+                self.assertEqual(sD["attached"], 0)
+            slogger.removeHandler(sh)
+            olog.removeHandler(oh)
+            self.assertEqual(len(oh.levelList), 3)
+            self.assertNotIn("other record", stream.getvalue())
+            svc.shutdown()
+            self.assertTrue(svc.isStopped())
+            self.assertRaises(ValueError, svc.attach, [])
+            self.assertIs(MultiProcLoggingService.getDefault(), MultiProcLoggingService.getDefault())
+            MultiProcLoggingService.getDefault().shutdown()
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
+    def testLogFileMode(self):
+        """Test case -  per-process log files merged in timestamp order on demand and on exit"""
+        try:
+            dataList = list(range(1, 21))
+            logDir = os.path.join(os.path.dirname(self.__testLogPath), "mplog-files")
+            slogger, sh, stream = self.__getStringLogger()
+            sh.setFormatter(logging.Formatter("%(created).6f %(processName)s: %(message)s"))
+            mpl = MultiProcLogging(logger=slogger, level=logging.DEBUG, batchSize=7, mode="file", logDir=logDir)
+            with mpl as wlogger:
+                wlogger.info("parent record before")
+                self.assertEqual(mpl.mergeLogs(), 1)
+                mpu = MultiProcUtil(verbose=True)
+                mpu.setOptions(optionsD={"recordsPerItem": 3})
+                mpu.set(workerObj=self, workerMethod="workerTwo")
+                ok, failList, _, _ = mpu.runMulti(dataList=dataList, numProc=3, numResults=1, chunkSize=4)
+                self.assertTrue(ok)
+                wlogger.info("parent record after")
+            slogger.removeHandler(sh)
+            self.assertEqual(glob.glob(os.path.join(logDir, "mplog-*.jsonl")), [])
+            lineList = stream.getvalue().splitlines()
+            self.assertEqual(len([line for line in lineList if " record " in line]), 3 * len(dataList) + 2)
+            self.assertEqual(mpl.getStats()["merged"], len(lineList))
+            self.assertTrue(lineList[0].endswith("parent record before"))
+            # each merge pass is in timestamp order
+            createdList = [float(line.split()[0]) for line in lineList[1:]]
+            self.assertEqual(createdList, sorted(createdList))
+            self.assertRaises(ValueError, MultiProcLogging, logger=logger, mode="unknown")
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
+    def testLogContext(self):
+        """Test case -  run, chunk and item context attached to worker records in JSON lines"""
+        try:
+            dataList = list(range(1, 13))
+            slogger, sh, stream = self.__getStringLogger()
+            sh.setFormatter(MultiProcJsonFormatter())
+            with MultiProcLogging(logger=slogger, level=logging.INFO):
+                mpu = MultiProcUtil(verbose=True)
+                mpu.setLogContext(runId="context-run", logItems=True)
+                ok, _, _, _ = mpu.runMap(logItem, dataList=dataList, numProc=2, chunkSize=3)
+                self.assertTrue(ok)
+                mpu = MultiProcPoolUtil(verbose=True)
+                mpu.setOptions(optionsD={"recordsPerItem": 1})
+                mpu.set(workerObj=self, workerMethod="workerTwo")
+                ok, _, _, _ = mpu.runMulti(dataList=dataList, numProc=2, numResults=1, chunkSize=3)
+                self.assertTrue(ok)
+                poolRunId = mpu.getRunStats()["runId"]
+            slogger.removeHandler(sh)
+            recordList = [json.loads(line) for line in stream.getvalue().splitlines()]
+            itemRecordList = [rD for rD in recordList if rD["message"] == "processing item"]
+            self.assertEqual(sorted([rD["item"] for rD in itemRecordList]), dataList)
+            self.assertTrue(all([rD["runId"] == "context-run" and rD["chunkId"] in range(4) for rD in itemRecordList]))
+            poolRecordList = [rD for rD in recordList if " record " in rD["message"]]
+            self.assertEqual(len(poolRecordList), len(dataList))
+            for rD in poolRecordList:
+                self.assertEqual(rD["runId"], poolRunId)
+                self.assertIn(rD["chunkId"], range(4))
+                self.assertIsNone(rD["item"])
+                # the worker method receives the pool process name
+                self.assertTrue(rD["message"].startswith(rD["processName"] + " "))
+            self.assertTrue(all(["time" in rD and "levelname" in rD for rD in recordList]))
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
+    @unittest.skipIf(sys.version_info[0] < 3, "not supported in this python version")
+    def testLogBatchThroughput(self):
+        """Test case -  records per second shipped through the logging queue unbatched and batched"""
+        try:
+            numRecords = 2000
+            rateD = {}
+            for batchSize in [1, 100]:
+                slogger, sh, stream = self.__getStringLogger()
+                startTime = time.time()
+                with MultiProcLogging(logger=slogger, fmt=self.__mpFormat, level=logging.DEBUG, batchSize=batchSize) as wlogger:
+                    for ii in range(numRecords):
+                        wlogger.info("throughput record %d", ii)
+                rateD[batchSize] = numRecords / (time.time() - startTime)
+                slogger.removeHandler(sh)
+                stream.seek(0)
+                self.assertEqual(len(stream.readlines()), numRecords)
+            logger.info("Log records per second unbatched %.0f batched (100) %.0f", rateD[1], rateD[100])
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
 
 def suiteContextManagerLogging():
     suiteSelect = unittest.TestSuite()
@@ -320,6 +591,8 @@ def suiteContextManagerLogging():
     suiteSelect.addTest(MultiProcLoggingTests("testLogStringStream"))
     suiteSelect.addTest(MultiProcLoggingTests("testLogFileHandler"))
     suiteSelect.addTest(MultiProcLoggingTests("testLogStringPlusFileHandlers"))
+    suiteSelect.addTest(MultiProcLoggingTests("testLogLevelFilter"))
+    suiteSelect.addTest(MultiProcLoggingTests("testLogBoundedQueue"))
     #
     return suiteSelect
 
@@ -328,6 +601,12 @@ def suiteMultiProcLogging():
     suiteSelect = unittest.TestSuite()
     suiteSelect.addTest(MultiProcLoggingTests("testLogStringStreamMultiProc"))
     suiteSelect.addTest(MultiProcLoggingTests("testLogFileHandlerMultiProc"))
+    suiteSelect.addTest(MultiProcLoggingTests("testLogBatchMultiProc"))
+    suiteSelect.addTest(MultiProcLoggingTests("testLogBatchInterval"))
+    suiteSelect.addTest(MultiProcLoggingTests("testLogBatchThroughput"))
+    suiteSelect.addTest(MultiProcLoggingTests("testLogService"))
+    suiteSelect.addTest(MultiProcLoggingTests("testLogFileMode"))
+    suiteSelect.addTest(MultiProcLoggingTests("testLogContext"))
     return suiteSelect
 
 
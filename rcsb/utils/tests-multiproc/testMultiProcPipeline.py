@@ -0,0 +1,100 @@
+##
+# File:    testMultiProcPipeline.py
+# Author:  jdw
+# Date:    19-Oct-2026
+#
+# Updates:
+#
+##
+"""
+Test cases for multi-stage streaming pipelines --
+
+"""
+
+__docformat__ = "restructuredtext en"
+__author__ = "John Westbrook"
+__email__ = "john.westbrook@rcsb.org"
+__license__ = "Apache 2.0"
+
+import logging
+import time
+import unittest
+
+from rcsb.utils.multiproc.MultiProcPipeline import MultiProcPipeline
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s]-%(module)s.%(funcName)s: %(message)s")
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+
+class StringStages(object):
+    """Pipeline stage methods implementing the worker method prototype --"""
+
+    def upper(self, dataList, procName, optionsD, workingDir):
+        """Convert the input strings to upper case -- strings containing 'x' fail."""
+        _ = procName
+        _ = optionsD
+        _ = workingDir
+        successList = [tS for tS in dataList if "x" not in tS]
+        return successList, [tS.upper() for tS in successList], ["contains x"] * (len(dataList) - len(successList))
+
+    def reverse(self, dataList, procName, optionsD, workingDir):
+        """Reverse the input strings."""
+        _ = procName
+        _ = optionsD
+        _ = workingDir
+        return dataList, [tS[::-1] for tS in dataList], []
+
+    def decorate(self, dataList, procName, optionsD, workingDir):
+        """Slowly decorate the input strings returning two result lists."""
+        _ = procName
+        _ = workingDir
+        time.sleep(optionsD["delay"] * len(dataList))
+        return dataList, ["<%s>" % tS for tS in dataList], [len(tS) for tS in dataList], []
+
+
+class MultiProcPipelineTests(unittest.TestCase):
+    def setUp(self):
+        self.__dataList = ["id%04d" % ii for ii in range(400)] + ["x%03d" % ii for ii in range(10)]
+
+    def tearDown(self):
+        pass
+
+    def testPipeline(self):
+        """Test case - three stage pipeline with per-stage statistics"""
+        try:
+            sS = StringStages()
+            pl = MultiProcPipeline(queueSize=4)
+            self.assertTrue(pl.addStage(sS, "upper", numProc=2, chunkSize=20))
+            self.assertTrue(pl.addStage(sS, "reverse", numProc=1))
+            self.assertTrue(pl.addStage(sS, "decorate", numProc=2, chunkSize=10, optionsD={"delay": 0.002}, numResults=2))
+            self.assertFalse(pl.addStage(sS, "missing"))
+            ok, failLists, resultLists, diagList = pl.run(self.__dataList)
+            self.assertFalse(ok)
+            self.assertEqual(len(failLists), 3)
+            self.assertEqual(sorted(failLists[0]), ["x%03d" % ii for ii in range(10)])
+            self.assertEqual(failLists[1:], [[], []])
+            self.assertEqual(sorted(resultLists[0]), sorted(["<%s>" % ("ID%04d" % ii)[::-1] for ii in range(400)]))
+            self.assertEqual(resultLists[1], [6] * 400)
+            self.assertEqual(diagList, ["contains x"])
+            #
+            statsList = pl.getStageStats()
+            for sD in statsList:
+                logger.info("Stage %r", sD)
+            self.assertEqual([sD["itemsIn"] for sD in statsList], [410, 400, 400])
+            self.assertEqual(statsList[2]["chunks"], 40)
+            self.assertTrue(statsList[2]["bottleneck"])
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
+
+def suitePipeline():
+    suiteSelect = unittest.TestSuite()
+    suiteSelect.addTest(MultiProcPipelineTests("testPipeline"))
+    return suiteSelect
+
+
+if __name__ == "__main__":
+    mySuite = suitePipeline()
+    unittest.TextTestRunner(verbosity=2).run(mySuite)
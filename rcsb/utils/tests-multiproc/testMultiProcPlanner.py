@@ -0,0 +1,78 @@
+##
+# File:    testMultiProcPlanner.py
+# Author:  jdw
+# Date:    19-Oct-2026
+#
+# Updates:
+#
+##
+"""
+Test cases for sample fitting and run parameter recommendations --
+
+"""
+
+__docformat__ = "restructuredtext en"
+__author__ = "John Westbrook"
+__email__ = "john.westbrook@rcsb.org"
+__license__ = "Apache 2.0"
+
+import logging
+import unittest
+
+from rcsb.utils.multiproc.MultiProcPlanner import MultiProcPlanner
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s]-%(module)s.%(funcName)s: %(message)s")
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+
+class MultiProcPlannerTests(unittest.TestCase):
+    def testPlannerFit(self):
+        """Test the fit of chunk time and memory measurements"""
+        planner = MultiProcPlanner()
+        chunkList = planner.getSampleChunks(list(range(100)))
+        self.assertEqual(sum([len(chunk) for chunk in chunkList]), 100)
+        self.assertEqual([len(chunk) for chunk in chunkList[:26]], [1] * 25 + [2])
+        #
+        timeObsList = [(n, 0.02 + 0.001 * n) for n in [1, 1, 2, 4, 8, 16, 32]]
+        memoryObsList = [(n, 1000 * n) for n in [1, 2, 4, 8]]
+        fitD = planner.fitSample(timeObsList, memoryObsList=memoryObsList, startupTime=0.05, baseRss=10000000)
+        self.assertAlmostEqual(fitD["chunkOverhead"], 0.02)
+        self.assertAlmostEqual(fitD["perItemTime"], 0.001)
+        self.assertAlmostEqual(fitD["perItemMemory"], 1000.0)
+        self.assertAlmostEqual(fitD["itemTimeCv"], 0.0)
+        self.assertEqual(planner.fitLine([(4, 2.0)]), (0.0, 0.5))
+        self.assertEqual(planner.fitLine([(1, 2.0), (2, 1.0)]), (1.5, 0.0))
+
+    def testPlannerRecommend(self):
+        """Test recommended parameters for large, small and memory bound runs"""
+        planner = MultiProcPlanner()
+        fitD = {"chunkOverhead": 0.02, "perItemTime": 0.001, "itemTimeCv": 0.1, "perItemMemory": 1000.0, "startupTime": 0.05, "baseRss": 10000000}
+        planD = planner.recommend(1000000, fitD, 8)
+        logger.info("Plan %r", planD)
+        self.assertEqual(planD["numProc"], 8)
+        self.assertEqual(planD["chunkSize"], 400)
+        self.assertEqual(planD["backend"], "pool")
+        self.assertLess(planD["estimatedWallTime"], planD["estimatedSerialTime"] / 7.0)
+        self.assertEqual(planD["peakMemory"], 8 * (10000000 + 400 * 1000))
+        # variable item cost
+        planD = planner.recommend(1000000, dict(fitD, itemTimeCv=2.0), 8)
+        self.assertEqual(planD["backend"], "process")
+        # memory bound
+        planD = planner.recommend(1000000, fitD, 8, availMemory=4 * 10400000)
+        self.assertEqual(planD["numProc"], 3)
+        # too little work to start workers
+        planD = planner.recommend(10, dict(fitD, startupTime=0.5), 8)
+        self.assertEqual((planD["backend"], planD["numProc"], planD["chunkSize"]), ("serial", 1, 10))
+
+
+def suitePlanner():
+    suiteSelect = unittest.TestSuite()
+    suiteSelect.addTest(MultiProcPlannerTests("testPlannerFit"))
+    suiteSelect.addTest(MultiProcPlannerTests("testPlannerRecommend"))
+    return suiteSelect
+
+
+if __name__ == "__main__":
+    mySuite = suitePlanner()
+    unittest.TextTestRunner(verbosity=2).run(mySuite)
@@ -15,12 +15,17 @@ __author__ = "John Westbrook"
 __email__ = "jwest@rcsb.rutgers.edu"
 __license__ = "Apache 2.0"
 
+import collections
+import glob
 import logging
+import os
 import random
 import re
+import shutil
 import sys
 import unittest
 
+from MultiProcTestFunctions import allocateItem, countLengths, getThreadLimit, mergeCounts, scaleItem
 from rcsb.utils.multiproc.MultiProcPoolUtil import MultiProcPoolUtil
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s]-%(module)s.%(funcName)s: %(message)s")
@@ -153,11 +158,197 @@ class MultiProcPoolUtilTests(unittest.TestCase):
             logger.exception("Failing with %s", str(e))
             self.fail()
 
+    def testMultiProcWorkerLimits(self):
+        """Test case - pool worker recycling"""
+        try:
+            dataList = ["".join(["b"] * random.randint(10, 100)) for _ in range(100)]
+            sTest = StringTests()
+            mpu = MultiProcPoolUtil(verbose=True)
+            mpu.set(workerObj=sTest, workerMethod="reverser")
+            mpu.setWorkerLimits(maxChunksPerWorker=1)
+            ok, failList, resultList, _ = mpu.runMulti(dataList=dataList, numProc=2, numResults=2, chunkSize=10)
+            self.assertTrue(ok)
+            self.assertEqual(len(failList), 0)
+            self.assertEqual(len(resultList[0]), len(dataList))
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
+    def testMultiProcSerializer(self):
+        """Test case - stdlib pickle serialization and compression of pool task and result payloads"""
+        try:
+            dataList = ["".join(["b"] * random.randint(10, 100)) for _ in range(100)]
+            sTest = StringTests()
+            mpu = MultiProcPoolUtil(verbose=True)
+            mpu.set(workerObj=sTest, workerMethod="reverser")
+            mpu.setSerializer("pickle")
+            ok, failList, resultList, _ = mpu.runMulti(dataList=dataList, numProc=2, numResults=2, chunkSize=10)
+            self.assertTrue(ok)
+            self.assertEqual(len(failList), 0)
+            self.assertEqual(len(resultList[1]), len(dataList))
+            mpu.setCompression(codec="zlib", threshold=256)
+            ok, failList, resultList, _ = mpu.runMultiAsync(dataList=dataList, numProc=2, numResults=2, chunkSize=10)
+            self.assertTrue(ok)
+            self.assertEqual(len(resultList[0]), len(dataList))
+            self.assertGreater(mpu.getRunStats()["compression"]["ratio"], 1.0)
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
+    def testMultiProcResultSpill(self):
+        """Test case - spill-to-disk result accumulation"""
+        try:
+            dataList = ["".join(["b"] * random.randint(10, 100)) for _ in range(100)]
+            sTest = StringTests()
+            mpu = MultiProcPoolUtil(verbose=True)
+            mpu.set(workerObj=sTest, workerMethod="reverser")
+            mpu.setResultSpill(os.path.join(os.path.abspath(os.path.dirname(__file__)), "temp-output", "result-spill"))
+            ok, failList, resultList, _ = mpu.runMulti(dataList=dataList, numProc=2, numResults=2, chunkSize=10)
+            self.assertTrue(ok)
+            self.assertEqual(len(failList), 0)
+            self.assertEqual(sorted(resultList[0]), sorted([tS[::-1] for tS in dataList]))
+            for rL in resultList:
+                rL.remove()
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
+    def testMultiProcReducer(self):
+        """Test case - pool-side reduction of chunk results"""
+        try:
+            dataList = ["".join(["b"] * random.randint(10, 100)) for _ in range(100)]
+            sTest = StringTests()
+            mpu = MultiProcPoolUtil(verbose=True)
+            mpu.set(workerObj=sTest, workerMethod="reverser")
+            mpu.setReducer(reduceFn=countLengths, combineFn=mergeCounts)
+            for runFunc in [mpu.runMulti, mpu.runMultiAsync]:
+                ok, failList, countD, _ = runFunc(dataList=dataList, numProc=2, numResults=2, chunkSize=10)
+                self.assertTrue(ok)
+                self.assertEqual(len(failList), 0)
+                self.assertEqual(countD, collections.Counter([len(tS) for tS in dataList]))
+                self.assertEqual(mpu.getRunStats()["reduce"]["partials"], 10)
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
+    def testMultiProcDiagnostics(self):
+        """Test case - diagnostics deduplicated and counted in the pool processes"""
+        try:
+            dataList = ["".join(["b"] * random.randint(10, 20)) for _ in range(100)]
+            sTest = StringTests()
+            mpu = MultiProcPoolUtil(verbose=True)
+            mpu.set(workerObj=sTest, workerMethod="reverser")
+            mpu.setDiagnostics(maxKeys=5)
+            ok, _, _, diagList = mpu.runMultiAsync(dataList=dataList, numProc=2, numResults=2, chunkSize=10)
+            self.assertTrue(ok)
+            self.assertEqual(len(diagList), len(set(diagList)))
+            self.assertLessEqual(len(diagList), 5)
+            sD = mpu.getDiagnosticSummary()
+            self.assertEqual(sD["total"], len(dataList))
+            self.assertEqual(sum([cD["count"] for cD in sD["counts"]]) + sD["overflow"], len(dataList))
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
+    def testMultiProcRunMap(self):
+        """Test case - per-item function with exception capture"""
+        try:
+            dataList = [{"id": "%03d" % ii, "size": ii} for ii in range(100)]
+            mpu = MultiProcPoolUtil(verbose=True)
+            ok, failList, resultList, diagList = mpu.runMap(scaleItem, dataList=dataList, numProc=2, numResults=2, chunkSize=10)
+            self.assertFalse(ok)
+            self.assertEqual(sorted([dD["id"] for dD in failList]), ["%03d" % ii for ii in range(0, 100, 7)])
+            self.assertEqual(sorted(resultList[1]), sorted([2 * ii for ii in range(100) if ii % 7]))
+            self.assertEqual(diagList, ["ValueError: size divisible by 7"])
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
+    def testMultiProcProfiling(self):
+        """Test case - per-worker profiles merged into a report of the top functions"""
+        try:
+            dirPath = os.path.join(os.path.abspath(os.path.dirname(__file__)), "temp-output", "profile-MultiProcPoolUtil")
+            shutil.rmtree(dirPath, ignore_errors=True)
+            os.makedirs(dirPath)
+            dataList = [{"id": "%03d" % ii, "size": ii} for ii in range(100)]
+            mpu = MultiProcPoolUtil(verbose=True)
+            mpu.setProfiling(dirPath=dirPath, topN=50)
+            ok, _, resultList, _ = mpu.runMap(scaleItem, dataList=dataList, numProc=2, numResults=2, chunkSize=10)
+            self.assertFalse(ok)
+            self.assertEqual(len(resultList[1]), 100 - 15)
+            pD = mpu.getRunStats()["profile"]
+            logger.info("Profile workers %d top %r", pD["workers"], pD["top"][:3])
+            self.assertTrue(1 <= pD["workers"] <= 2)
+            self.assertEqual(len(glob.glob(os.path.join(dirPath, "mp-profile-%s-*.prof" % mpu.getRunStats()["runId"]))), pD["workers"])
+            self.assertTrue(os.path.exists(pD["statsPath"]))
+            scaleD = [fD for fD in pD["top"] if fD["function"].endswith("(scaleItem)")][0]
+            self.assertEqual(scaleD["ncalls"], 100)
+            with open(pD["reportPath"]) as ifh:
+                self.assertIn("scaleItem", ifh.read())
+            shutil.rmtree(dirPath)
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
+    def testMultiProcMemoryProfiling(self):
+        """Test case - per-chunk peak traced allocation and the heaviest items"""
+        try:
+            dataList = [{"id": "%03d" % ii, "size": ii} for ii in range(1, 41)]
+            mpu = MultiProcPoolUtil(verbose=True)
+            mpu.setMemoryProfiling(topItems=3)
+            ok, _, resultList, _ = mpu.runMap(allocateItem, dataList=dataList, numProc=2, numResults=1, chunkSize=10)
+            self.assertTrue(ok)
+            self.assertEqual(sorted(resultList[0]), [10000 * ii for ii in range(1, 41)])
+            mD = mpu.getRunStats()["memory"]
+            logger.info("Memory chunks %d max peak %r max RSS delta %r heaviest %r", mD["chunks"], mD["maxPeakTraced"], mD["maxRssDelta"], mD["heaviestItems"])
+            self.assertEqual(mD["chunks"], 4)
+            self.assertEqual(sorted([cD["chunkId"] for cD in mD["chunkList"]]), [0, 1, 2, 3])
+            self.assertEqual(sum([cD["items"] for cD in mD["chunkList"]]), 40)
+            self.assertGreaterEqual(mD["maxPeakTraced"], 400000)
+            self.assertEqual(len(mD["heaviestItems"]), 3)
+            self.assertIn("'040'", mD["heaviestItems"][0]["item"])
+            self.assertGreaterEqual(mD["heaviestItems"][0]["peakTraced"], 400000)
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
+    def testMultiProcThreadLimits(self):
+        """Test case - native library thread limits set in the worker processes"""
+        try:
+            dataList = list(range(20))
+            mpu = MultiProcPoolUtil(verbose=True)
+            ok, _, resultList, _ = mpu.runMap(getThreadLimit, dataList=dataList, numProc=2, numResults=1, chunkSize=5)
+            self.assertTrue(ok)
+            numThreads = mpu.getRunStats()["threadLimit"]["threadsPerProc"]
+            self.assertGreaterEqual(numThreads, 1)
+            self.assertEqual(set(resultList[0]), set([os.environ.get("OMP_NUM_THREADS", str(numThreads))]))
+            #
+            mpu.setThreadLimits(threadsPerProc=3)
+            ok, _, resultList, _ = mpu.runMap(getThreadLimit, dataList=dataList, numProc=2, numResults=1, chunkSize=5)
+            self.assertEqual(set(resultList[0]), set(["3"]))
+            #
+            mpu.setThreadLimits(limit=False)
+            ok, _, resultList, _ = mpu.runMap(getThreadLimit, dataList=dataList, numProc=2, numResults=1, chunkSize=5)
+            self.assertEqual(set(resultList[0]), set([os.environ.get("OMP_NUM_THREADS")]))
+            self.assertNotIn("threadLimit", mpu.getRunStats())
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
 
 def suiteMultiProcPoolSync():
     suiteSelect = unittest.TestSuite()
     suiteSelect.addTest(MultiProcPoolUtilTests("testMultiProcString"))
     suiteSelect.addTest(MultiProcPoolUtilTests("testMultiProcStringAsync"))
+    suiteSelect.addTest(MultiProcPoolUtilTests("testMultiProcWorkerLimits"))
+    suiteSelect.addTest(MultiProcPoolUtilTests("testMultiProcSerializer"))
+    suiteSelect.addTest(MultiProcPoolUtilTests("testMultiProcResultSpill"))
+    suiteSelect.addTest(MultiProcPoolUtilTests("testMultiProcReducer"))
+    suiteSelect.addTest(MultiProcPoolUtilTests("testMultiProcDiagnostics"))
+    suiteSelect.addTest(MultiProcPoolUtilTests("testMultiProcRunMap"))
+    suiteSelect.addTest(MultiProcPoolUtilTests("testMultiProcProfiling"))
+    suiteSelect.addTest(MultiProcPoolUtilTests("testMultiProcMemoryProfiling"))
+    suiteSelect.addTest(MultiProcPoolUtilTests("testMultiProcThreadLimits"))
     return suiteSelect
 
 
@@ -0,0 +1,135 @@
+##
+# File:    testMultiProcResourceUtil.py
+# Author:  jdw
+# Date:    19-Oct-2026
+#
+# Updates:
+#
+##
+"""
+Test cases for CPU and memory budget detection and worker count selection.
+
+"""
+
+__docformat__ = "restructuredtext en"
+__author__ = "John Westbrook"
+__email__ = "john.westbrook@rcsb.org"
+__license__ = "Apache 2.0"
+
+import logging
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from rcsb.utils.multiproc.MultiProcResourceUtil import MultiProcResourceUtil
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s]-%(module)s.%(funcName)s: %(message)s")
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+
+class MultiProcResourceUtilTests(unittest.TestCase):
+    def setUp(self):
+        self.__workPath = tempfile.mkdtemp()
+        self.__cgroupRoot = os.path.join(self.__workPath, "cgroup")
+        self.__procRoot = os.path.join(self.__workPath, "proc")
+        os.makedirs(os.path.join(self.__procRoot, "self"))
+
+    def tearDown(self):
+        shutil.rmtree(self.__workPath, ignore_errors=True)
+
+    def __write(self, filePath, text):
+        if not os.path.isdir(os.path.dirname(filePath)):
+            os.makedirs(os.path.dirname(filePath))
+        with open(filePath, "w", encoding="utf-8") as ofh:
+            ofh.write(text)
+
+    def testCgroupV2Limits(self):
+        """Test case - cgroup v2 CPU quota and memory limit"""
+        self.__write(os.path.join(self.__procRoot, "self", "cgroup"), "0::/kubepods/pod1\n")
+        self.__write(os.path.join(self.__cgroupRoot, "kubepods", "pod1", "cpu.max"), "250000 100000\n")
+        self.__write(os.path.join(self.__cgroupRoot, "kubepods", "pod1", "memory.max"), "%d\n" % (4 * 2**30))
+        self.__write(os.path.join(self.__cgroupRoot, "kubepods", "pod1", "memory.current"), "%d\n" % (2**30))
+        self.__write(os.path.join(self.__procRoot, "meminfo"), "MemTotal:       65000000 kB\nMemAvailable:   64000000 kB\n")
+        rU = MultiProcResourceUtil(cgroupRoot=self.__cgroupRoot, procRoot=self.__procRoot)
+        self.assertAlmostEqual(rU.getCgroupCpuLimit(), 2.5)
+        self.assertEqual(rU.getEffectiveCpuCount(), min(3, rU.getAffinityCpuCount()))
+        self.assertEqual(rU.getAvailableMemory(), 3 * 2**30)
+        #
+        numCpu = rU.getEffectiveCpuCount()
+        self.assertEqual(rU.getNumProc(workload="cpu"), numCpu)
+        self.assertEqual(rU.getNumProc(workload="io"), 2 * numCpu)
+        self.assertEqual(rU.getNumProc(workload="io", memoryPerProc=2 * 2**30), 1)
+
+    def testCgroupV1Limits(self):
+        """Test case - cgroup v1 CPU quota and unlimited memory"""
+        self.__write(os.path.join(self.__procRoot, "self", "cgroup"), "4:memory:/\n2:cpu,cpuacct:/\n")
+        self.__write(os.path.join(self.__cgroupRoot, "cpu,cpuacct", "cpu.cfs_quota_us"), "100000\n")
+        self.__write(os.path.join(self.__cgroupRoot, "cpu,cpuacct", "cpu.cfs_period_us"), "100000\n")
+        self.__write(os.path.join(self.__cgroupRoot, "memory", "memory.limit_in_bytes"), "9223372036854771712\n")
+        self.__write(os.path.join(self.__procRoot, "meminfo"), "MemAvailable:   1024 kB\n")
+        rU = MultiProcResourceUtil(cgroupRoot=self.__cgroupRoot, procRoot=self.__procRoot)
+        self.assertAlmostEqual(rU.getCgroupCpuLimit(), 1.0)
+        self.assertEqual(rU.getEffectiveCpuCount(), 1)
+        self.assertEqual(rU.getAvailableMemory(), 1024 * 1024)
+        self.assertEqual(rU.getNumProc(workload="io", ioFactor=3), 3)
+
+    def testUnlimited(self):
+        """Test case - no cgroup quota"""
+        self.__write(os.path.join(self.__procRoot, "self", "cgroup"), "0::/\n")
+        self.__write(os.path.join(self.__cgroupRoot, "cpu.max"), "max 100000\n")
+        rU = MultiProcResourceUtil(cgroupRoot=self.__cgroupRoot, procRoot=self.__procRoot)
+        self.assertIsNone(rU.getCgroupCpuLimit())
+        self.assertEqual(rU.getEffectiveCpuCount(), rU.getAffinityCpuCount())
+        self.assertGreaterEqual(rU.getNumProc(workload="cpu", maxProc=1), 1)
+
+    def testCalibrate(self):
+        """Test case - throughput calibration prefers the fastest worker count"""
+
+        def runFunc(numProc):
+            time.sleep(0.04 / min(numProc, 4))
+            return 100
+
+        rU = MultiProcResourceUtil()
+        numProc, rateD = rU.calibrateNumProc(runFunc, [1, 2, 4, 8])
+        logger.info("Calibration rates %r", rateD)
+        self.assertEqual(len(rateD), 4)
+        self.assertEqual(numProc, 4)
+
+    def testThreadLimits(self):
+        """Test case - per-worker thread budget and native library thread limits"""
+        rU = MultiProcResourceUtil()
+        numCpu = rU.getEffectiveCpuCount()
+        self.assertEqual(rU.getThreadBudget(1), numCpu)
+        self.assertEqual(rU.getThreadBudget(2 * numCpu), 1)
+        savedD = {var: os.environ.get(var) for var in rU.threadLimitVars}
+        try:
+            os.environ["MKL_NUM_THREADS"] = "5"
+            envD = rU.limitThreads(2)
+            self.assertEqual(envD["OMP_NUM_THREADS"], "2")
+            self.assertEqual(envD["MKL_NUM_THREADS"], "5")
+            envD = rU.limitThreads(2, override=True)
+            self.assertEqual(set(envD.values()), set(["2"]))
+        finally:
+            for var, value in savedD.items():
+                if value is None:
+                    os.environ.pop(var, None)
+                else:
+                    os.environ[var] = value
+
+
+def suiteResourceUtil():
+    suiteSelect = unittest.TestSuite()
+    suiteSelect.addTest(MultiProcResourceUtilTests("testCgroupV2Limits"))
+    suiteSelect.addTest(MultiProcResourceUtilTests("testCgroupV1Limits"))
+    suiteSelect.addTest(MultiProcResourceUtilTests("testUnlimited"))
+    suiteSelect.addTest(MultiProcResourceUtilTests("testCalibrate"))
+    suiteSelect.addTest(MultiProcResourceUtilTests("testThreadLimits"))
+    return suiteSelect
+
+
+if __name__ == "__main__":
+    mySuite = suiteResourceUtil()
+    unittest.TextTestRunner(verbosity=2).run(mySuite)
@@ -0,0 +1,75 @@
+##
+# File:    testMultiProcResultStore.py
+# Author:  jdw
+# Date:    19-Oct-2026
+#
+# Updates:
+#
+##
+"""
+Test cases for the on-disk memory-mapped result store --
+
+"""
+
+__docformat__ = "restructuredtext en"
+__author__ = "John Westbrook"
+__email__ = "john.westbrook@rcsb.org"
+__license__ = "Apache 2.0"
+
+import logging
+import os
+import unittest
+
+from rcsb.utils.multiproc.MultiProcResultStore import MultiProcResultStore
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s]-%(module)s.%(funcName)s: %(message)s")
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+
+class MultiProcResultStoreTests(unittest.TestCase):
+    def setUp(self):
+        self.__dirPath = os.path.join(os.path.abspath(os.path.dirname(__file__)), "temp-output", "result-store")
+
+    def tearDown(self):
+        pass
+
+    def testStoreReadWrite(self):
+        """Test case - append, length, indexing, slicing and iteration"""
+        rS = MultiProcResultStore(self.__dirPath, name="test")
+        try:
+            self.assertEqual(len(rS), 0)
+            self.assertEqual(list(rS), [])
+            itemList = ["item-%d" % ii for ii in range(1000)] + [{"a": [1, 2]}, None, ("x", 1.5)]
+            rS.extend(itemList[:500])
+            rS.extend(itemList[500:])
+            rS.flush()
+            self.assertEqual(len(rS), len(itemList))
+            self.assertEqual(rS[0], "item-0")
+            self.assertEqual(rS[-1], ("x", 1.5))
+            self.assertEqual(rS[1000], {"a": [1, 2]})
+            self.assertIsNone(rS[1001])
+            self.assertEqual(rS[10:20:2], itemList[10:20:2])
+            self.assertEqual(list(rS), itemList)
+            self.assertRaises(IndexError, rS.__getitem__, len(itemList))
+            #
+            # append after reading
+            rS.append("last")
+            self.assertEqual(len(rS), len(itemList) + 1)
+            self.assertEqual(rS[-1], "last")
+            self.assertIn("item-999", rS)
+        finally:
+            rS.remove()
+        for filePath in rS.getFilePaths():
+            self.assertFalse(os.path.exists(filePath))
+
+
+def suiteResultStore():
+    suiteSelect = unittest.TestSuite()
+    suiteSelect.addTest(MultiProcResultStoreTests("testStoreReadWrite"))
+    return suiteSelect
+
+
+if __name__ == "__main__":
+    mySuite = suiteResultStore()
+    unittest.TextTestRunner(verbosity=2).run(mySuite)
@@ -0,0 +1,127 @@
+##
+# File:    testMultiProcSerializer.py
+# Author:  jdw
+# Date:    19-Oct-2026
+#
+# Updates:
+#
+##
+"""
+Test cases for task and result payload serializers --
+
+"""
+
+__docformat__ = "restructuredtext en"
+__author__ = "John Westbrook"
+__email__ = "john.westbrook@rcsb.org"
+__license__ = "Apache 2.0"
+
+import json
+import logging
+import pickle
+import random
+import time
+import unittest
+
+import dill
+
+from rcsb.utils.multiproc.MultiProcSerializer import MultiProcAutoSerializer
+from rcsb.utils.multiproc.MultiProcSerializer import MultiProcCompressingSerializer
+from rcsb.utils.multiproc.MultiProcSerializer import MultiProcPickleSerializer
+from rcsb.utils.multiproc.MultiProcSerializer import MultiProcSerializer
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s]-%(module)s.%(funcName)s: %(message)s")
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+
+class JsonCodec(object):
+    def dumps(self, obj):
+        return json.dumps(obj).encode("utf-8")
+
+    def loads(self, data):
+        return json.loads(data)
+
+
+class MultiProcSerializerTests(unittest.TestCase):
+    def setUp(self):
+        self.__stringList = ["".join([random.choice("ACGT") for _ in range(50)]) for _ in range(20000)]
+        self.__dictList = [{"entry_id": "%04d" % ii, "chains": ["A", "B"], "resolution": random.random() * 3.0, "title": "x" * 40} for ii in range(20000)]
+
+    def tearDown(self):
+        pass
+
+    def testPickleRoundTrip(self):
+        """Test case - pickle protocol 5 with out-of-band buffers"""
+        sz = MultiProcPickleSerializer()
+        payload = ([1, 2, 3], pickle.PickleBuffer(bytearray(b"x" * 100000)), ["a", "b"])
+        data, bufferList = sz.dumps(payload)
+        self.assertEqual(len(bufferList), 1)
+        self.assertLess(len(data), 1000)
+        rV = sz.loads(data, [bytes(buf) for buf in bufferList])
+        self.assertEqual(rV[0], [1, 2, 3])
+        self.assertEqual(bytes(rV[1]), b"x" * 100000)
+        #
+        data, bufferList = sz.dumps(self.__dictList)
+        self.assertEqual(bufferList, [])
+        self.assertEqual(sz.loads(data, bufferList), self.__dictList)
+
+    def testAutoAndCodec(self):
+        """Test case - dill fallback and user-supplied codec"""
+        sz = MultiProcAutoSerializer()
+        data, bufferList = sz.dumps([lambda x: x + 1])
+        self.assertEqual(sz.loads(data, bufferList)[0](1), 2)
+        #
+        sz = MultiProcSerializer.create(JsonCodec())
+        data, bufferList = sz.dumps(self.__stringList[:10])
+        self.assertEqual(sz.loads(data, bufferList), self.__stringList[:10])
+        #
+        self.assertIsNone(MultiProcSerializer.create(None))
+        self.assertIsNone(MultiProcSerializer.create("dill"))
+        self.assertRaises(ValueError, MultiProcSerializer.create, "unknown")
+
+    def testCompression(self):
+        """Test case - threshold compression of serialized frames"""
+        textList = ["ATOM   %5d  CA  ALA A %3d      11.104  13.207   2.100  1.00 20.00           C" % (ii, ii % 999) for ii in range(5000)]
+        for codec in ["zlib", "lzma", "bz2"]:
+            sz = MultiProcCompressingSerializer(codec=codec, threshold=1024)
+            data, bufferList = sz.dumps(textList)
+            self.assertEqual(sz.loads(data, bufferList), textList)
+            sD = sz.getStats()
+            logger.info("%s ratio %.2f compress %.4f s decompress %.4f s", codec, sD["ratio"], sD["compressTime"], sD["decompressTime"])
+            self.assertEqual(sD["compressedFrames"], 1)
+            self.assertGreater(sD["ratio"], 4.0)
+        #
+        sz = MultiProcCompressingSerializer(serializer=MultiProcPickleSerializer(), codec="zlib", threshold=10**9)
+        self.assertEqual(sz.loads(*sz.dumps(textList[:10])), textList[:10])
+        self.assertEqual(sz.getStats()["compressedFrames"], 0)
+        self.assertRaises(ValueError, MultiProcCompressingSerializer, codec="unknown")
+
+    def testBenchmark(self):
+        """Test case - timing comparison of dill and stdlib pickle on typical payloads"""
+        sz = MultiProcPickleSerializer()
+        for name, payload in [("strings", self.__stringList), ("dicts", self.__dictList)]:
+            startTime = time.time()
+            data = dill.dumps(payload)
+            dill.loads(data)
+            dillTime = time.time() - startTime
+            #
+            startTime = time.time()
+            data, bufferList = sz.dumps(payload)
+            sz.loads(data, bufferList)
+            pickleTime = time.time() - startTime
+            logger.info("%s (%d items) dill %.4f s pickle protocol 5 %.4f s", name, len(payload), dillTime, pickleTime)
+
+
+def suiteSerializer():
+    suiteSelect = unittest.TestSuite()
+    suiteSelect.addTest(MultiProcSerializerTests("testPickleRoundTrip"))
+    suiteSelect.addTest(MultiProcSerializerTests("testAutoAndCodec"))
+    suiteSelect.addTest(MultiProcSerializerTests("testCompression"))
+    suiteSelect.addTest(MultiProcSerializerTests("testBenchmark"))
+    return suiteSelect
+
+
+if __name__ == "__main__":
+    mySuite = suiteSerializer()
+    unittest.TextTestRunner(verbosity=2).run(mySuite)
@@ -0,0 +1,105 @@
+##
+# File:    testMultiProcTaskGraph.py
+# Author:  jdw
+# Date:    19-Oct-2026
+#
+# Updates:
+#
+##
+"""
+Test cases for dependency-aware task graph scheduling --
+
+"""
+
+__docformat__ = "restructuredtext en"
+__author__ = "John Westbrook"
+__email__ = "john.westbrook@rcsb.org"
+__license__ = "Apache 2.0"
+
+import logging
+import os
+import time
+import unittest
+
+from rcsb.utils.multiproc.MultiProcTaskGraph import MultiProcTaskGraph
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s]-%(module)s.%(funcName)s: %(message)s")
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+
+def makeRange(num, delay=0.0):
+    time.sleep(delay)
+    return list(range(num))
+
+
+def sumInputs(scale=1, inputD=None):
+    return scale * sum([sum(vL) if isinstance(vL, list) else vL for vL in inputD.values()])
+
+
+def failTask():
+    raise ValueError("bad input")
+
+
+def crashTask():
+    os._exit(1)
+
+
+class MultiProcTaskGraphTests(unittest.TestCase):
+    def setUp(self):
+        self.__startTime = time.time()
+        logger.debug("Starting %s at %s", self.id(), time.strftime("%Y %m %d %H:%M:%S", time.localtime()))
+
+    def tearDown(self):
+        endTime = time.time()
+        logger.debug("Completed %s at %s (%.4f seconds)", self.id(), time.strftime("%Y %m %d %H:%M:%S", time.localtime()), endTime - self.__startTime)
+
+    def testTaskGraph(self):
+        """Test dependent task results, failure propagation and graph checks"""
+        try:
+            tg = MultiProcTaskGraph(numProc=3, verbose=True)
+            for ii in range(6):
+                tg.addTask("range%d" % ii, makeRange, args=(10,), kwargs={"delay": 0.05 * ii})
+            tg.addTask("sumA", sumInputs, dependsOn=["range0", "range1", "range2"], passInputs=True)
+            tg.addTask("sumB", sumInputs, kwargs={"scale": 2}, dependsOn=["range3", "range4", "range5"], passInputs=True)
+            tg.addTask("total", sumInputs, dependsOn=["sumA", "sumB"], priority=1, passInputs=True)
+            tg.addTask("fail", failTask)
+            tg.addTask("crash", crashTask)
+            tg.addTask("afterFail", sumInputs, dependsOn=["fail", "range0"], passInputs=True)
+            tg.addTask("afterAfter", sumInputs, dependsOn=["afterFail"], passInputs=True)
+            tg.addTask("afterCrash", sumInputs, dependsOn=["crash"], passInputs=True)
+            ok, resultD, failD = tg.run()
+            self.assertFalse(ok)
+            self.assertEqual(resultD["sumA"], 135)
+            self.assertEqual(resultD["sumB"], 270)
+            self.assertEqual(resultD["total"], 405)
+            self.assertEqual(sorted(failD), ["afterAfter", "afterCrash", "afterFail", "crash", "fail"])
+            self.assertEqual(failD["fail"], "ValueError: bad input")
+            self.assertTrue(failD["crash"].startswith("WorkerExit"))
+            self.assertTrue(failD["afterAfter"].startswith("skipped:"))
+            statsD = tg.getStats()
+            logger.info("Task graph stats %r", statsD)
+            self.assertEqual((statsD["completed"], statsD["failed"], statsD["skipped"]), (9, 2, 3))
+            #
+            tg = MultiProcTaskGraph(numProc=2)
+            tg.addTask("a", makeRange, args=(3,), dependsOn=["b"])
+            tg.addTask("b", makeRange, args=(3,), dependsOn=["a"])
+            self.assertRaises(ValueError, tg.run)
+            tg = MultiProcTaskGraph(numProc=2)
+            tg.addTask("a", makeRange, args=(3,), dependsOn=["missing"])
+            self.assertRaises(ValueError, tg.run)
+            self.assertRaises(ValueError, tg.addTask, "a", makeRange)
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
+
+def suiteTaskGraph():
+    suiteSelect = unittest.TestSuite()
+    suiteSelect.addTest(MultiProcTaskGraphTests("testTaskGraph"))
+    return suiteSelect
+
+
+if __name__ == "__main__":
+    mySuite = suiteTaskGraph()
+    unittest.TextTestRunner(verbosity=2).run(mySuite)
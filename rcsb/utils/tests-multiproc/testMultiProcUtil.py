@@ -15,11 +15,27 @@ __email__ = "jwest@rcsb.rutgers.edu"
 __license__ = "Apache 2.0"
 
 
+import collections
+import glob
+import json
 import logging
+import os
 import random
 import re
+import shutil
+import signal
+import threading
+import time
 import unittest
 
+import multiprocess
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from MultiProcTestFunctions import allocateItem, countLengths, getThreadLimit, makeScaler, measureItem, mergeCounts, scaleItem, sleepItem, stallOnceItem
 from rcsb.utils.multiproc.MultiProcUtil import MultiProcUtil
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s]-%(module)s.%(funcName)s: %(message)s")
@@ -69,6 +85,39 @@ class StringTests(object):
         #
         return successList, retList1, retList2, diagList
 
+    def crasher(self, dataList, procName, optionsD, workingDir):
+        """Reverse the input strings -- exit the worker process abruptly on input 'crash'."""
+        _ = procName
+        _ = optionsD
+        _ = workingDir
+        if "crash" in dataList:
+            os._exit(1)
+        return dataList, [tS[::-1] for tS in dataList], []
+
+    def sleeper(self, dataList, procName, optionsD, workingDir):
+        """Reverse the input strings slowly."""
+        _ = procName
+        _ = optionsD
+        _ = workingDir
+        time.sleep(0.02 * len(dataList))
+        return dataList, [tS[::-1] for tS in dataList], []
+
+
+class JsonCodec(object):
+    def dumps(self, obj):
+        return json.dumps(obj).encode("utf-8")
+
+    def loads(self, data):
+        return json.loads(data)
+
+
+class PoisonCodec(JsonCodec):
+    def loads(self, data):
+        obj = json.loads(data)
+        if "poison" in obj:
+            raise ValueError("undecodable chunk")
+        return obj
+
 
 class MultiProcUtilTests(unittest.TestCase):
     def setUp(self):
@@ -110,10 +159,510 @@ class MultiProcUtilTests(unittest.TestCase):
             logger.exception("Failing with %s", str(e))
             self.fail()
 
+    def testMultiProcNumProcPolicy(self):
+        """Test case - automatic worker count with calibration"""
+        try:
+            dataList = ["".join(["b"] * random.randint(10, 100)) for _ in range(200)]
+            sTest = StringTests()
+            mpu = MultiProcUtil(verbose=True)
+            mpu.set(workerObj=sTest, workerMethod="reverser")
+            mpu.setNumProcPolicy(workload="cpu", calibrate=True, sampleSize=20)
+            ok, failList, resultList, _ = mpu.runMulti(dataList=dataList, numProc=0, numResults=2)
+            self.assertTrue(ok)
+            self.assertEqual(len(failList), 0)
+            self.assertEqual(len(resultList[0]), len(dataList))
+            #
+            numProc, rateD = mpu.calibrateNumProc(dataList, numResults=2, candidateList=[1, 2], sampleSize=10)
+            self.assertIn(numProc, [1, 2])
+            self.assertEqual(len(rateD), 2)
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
+    def testMultiProcWorkerLimits(self):
+        """Test case - worker recycling by chunk count and resident size and memory budgeted dispatch"""
+        try:
+            dataList = ["".join(["b"] * random.randint(10, 100)) + str(ii) for ii in range(100)]
+            dataList = [tS.replace("8", "a").replace("9", "a") for tS in dataList]
+            sTest = StringTests()
+            for maxChunks, maxRss, budget in [(1, 0, 0), (0, 1, 0), (2, 0, 1)]:
+                mpu = MultiProcUtil(verbose=True)
+                mpu.set(workerObj=sTest, workerMethod="reverser")
+                mpu.setWorkerLimits(maxChunksPerWorker=maxChunks, maxRssPerWorker=maxRss, memoryBudget=budget)
+                ok, failList, resultList, _ = mpu.runMulti(dataList=dataList, numProc=2, numResults=2, chunkSize=10)
+                self.assertTrue(ok)
+                self.assertEqual(len(failList), 0)
+                self.assertEqual(sorted(resultList[0]), sorted([tS[::-1] for tS in dataList]))
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
+    def testMultiProcWorkerFailure(self):
+        """Test case - chunk held by a worker process that dies is reported as failed"""
+        try:
+            dataList = ["a%d" % ii for ii in range(20)] + ["crash"]
+            sTest = StringTests()
+            mpu = MultiProcUtil(verbose=True)
+            mpu.set(workerObj=sTest, workerMethod="crasher")
+            ok, failList, resultList, _ = mpu.runMulti(dataList=dataList, numProc=2, numResults=1, chunkSize=3)
+            self.assertFalse(ok)
+            self.assertIn("crash", failList)
+            self.assertEqual(len(failList) + len(resultList[0]), len(dataList))
+            # a chunk that cannot be decoded in the worker is lost rather than stalling the run
+            dataList = ["a%d" % ii for ii in range(20)] + ["poison"]
+            mpu = MultiProcUtil(verbose=True)
+            mpu.set(workerObj=sTest, workerMethod="reverser")
+            mpu.setSerializer(PoisonCodec())
+            ok, failList, resultList, _ = mpu.runMulti(dataList=dataList, numProc=2, numResults=2, chunkSize=3)
+            self.assertFalse(ok)
+            self.assertIn("poison", failList)
+            self.assertEqual(len(failList) + len(resultList[0]), len(dataList))
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
+    def testMultiProcSerializer(self):
+        """Test case - stdlib pickle and user codec serialization of task and result payloads"""
+        try:
+            dataList = ["".join(["b"] * random.randint(10, 100)) for _ in range(200)]
+            sTest = StringTests()
+            for serializer in ["pickle", "auto", JsonCodec()]:
+                mpu = MultiProcUtil(verbose=True)
+                mpu.set(workerObj=sTest, workerMethod="reverser")
+                mpu.setSerializer(serializer)
+                ok, failList, resultList, diagList = mpu.runMulti(dataList=dataList, numProc=2, numResults=2, chunkSize=10)
+                self.assertTrue(ok)
+                self.assertEqual(len(failList), 0)
+                self.assertEqual(sorted(resultList[0]), sorted([tS[::-1] for tS in dataList]))
+                self.assertGreaterEqual(len(diagList), 1)
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
+    def testMultiProcCompression(self):
+        """Test case - compression of large chunk results"""
+        try:
+            dataList = ["".join(["b"] * random.randint(1000, 3000)) for _ in range(200)]
+            sTest = StringTests()
+            mpu = MultiProcUtil(verbose=True)
+            mpu.set(workerObj=sTest, workerMethod="reverser")
+            mpu.setSerializer("pickle")
+            mpu.setCompression(codec="zlib", threshold=4096)
+            ok, failList, resultList, _ = mpu.runMulti(dataList=dataList, numProc=2, numResults=2, chunkSize=10)
+            self.assertTrue(ok)
+            self.assertEqual(len(failList), 0)
+            self.assertEqual(sorted(resultList[1]), sorted([tS[::-1] + tS for tS in dataList]))
+            sD = mpu.getRunStats()["compression"]
+            logger.info("Compression statistics %r", sD)
+            self.assertEqual(sD["compressedFrames"], 20)
+            self.assertGreater(sD["ratio"], 10.0)
+            # without a serializer, results that require dill (closures) remain supported
+            mpu = MultiProcUtil(verbose=True)
+            mpu.setCompression(codec="zlib", threshold=0)
+            ok, failList, resultList, _ = mpu.runMap(makeScaler, dataList[:20], numProc=2, numResults=1, chunkSize=5)
+            self.assertTrue(ok)
+            self.assertEqual(sorted([fn(2) for fn in resultList[0]]), sorted([2 * len(tS) for tS in dataList[:20]]))
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
+    def testMultiProcResultSpill(self):
+        """Test case - spill-to-disk result accumulation"""
+        try:
+            dataList = ["".join(["b"] * random.randint(10, 100)) for _ in range(500)]
+            sTest = StringTests()
+            mpu = MultiProcUtil(verbose=True)
+            mpu.set(workerObj=sTest, workerMethod="reverser")
+            mpu.setResultSpill(os.path.join(os.path.abspath(os.path.dirname(__file__)), "temp-output", "result-spill"))
+            ok, failList, resultList, _ = mpu.runMulti(dataList=dataList, numProc=2, numResults=2, chunkSize=10)
+            self.assertTrue(ok)
+            self.assertEqual(len(failList), 0)
+            self.assertEqual(len(resultList[0]), len(dataList))
+            self.assertEqual(sorted(resultList[0]), sorted([tS[::-1] for tS in dataList]))
+            self.assertEqual(resultList[1][-1], resultList[0][-1] + resultList[0][-1][::-1])
+            for rL in resultList:
+                rL.remove()
+            # calibration runs do not spill results
+            spillDirPath = os.path.join(os.path.abspath(os.path.dirname(__file__)), "temp-output", "result-spill-calibrate")
+            mpu.setResultSpill(spillDirPath)
+            mpu.setNumProcPolicy(workload="cpu", calibrate=True, sampleSize=20)
+            ok, failList, resultList, _ = mpu.runMulti(dataList=dataList, numProc=0, numResults=2, chunkSize=10)
+            self.assertTrue(ok)
+            for rL in resultList:
+                rL.remove()
+            self.assertEqual(os.listdir(spillDirPath), [])
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
+    def testMultiProcReducer(self):
+        """Test case - worker-side reduction of chunk results"""
+        try:
+            dataList = ["".join(["b"] * random.randint(10, 100)) for _ in range(500)]
+            sTest = StringTests()
+            mpu = MultiProcUtil(verbose=True)
+            mpu.set(workerObj=sTest, workerMethod="reverser")
+            mpu.setReducer(reduceFn=countLengths, combineFn=mergeCounts)
+            mpu.setWorkerLimits(maxChunksPerWorker=20)
+            ok, failList, countD, _ = mpu.runMulti(dataList=dataList, numProc=3, numResults=2, chunkSize=10)
+            self.assertTrue(ok)
+            self.assertEqual(len(failList), 0)
+            self.assertEqual(countD, collections.Counter([len(tS) for tS in dataList]))
+            # 50 chunks -- each worker (3 + replacements after 20 chunks) returns a single partial
+            self.assertLessEqual(mpu.getRunStats()["reduce"]["partials"], 6)
+            #
+            dataList = ["a%d" % ii for ii in range(20)] + ["crash"]
+            mpu.set(workerObj=sTest, workerMethod="crasher")
+            mpu.setReducer(reduceFn=countLengths, combineFn=mergeCounts)
+            mpu.setWorkerLimits()
+            ok, failList, countD, _ = mpu.runMulti(dataList=dataList, numProc=2, numResults=1, chunkSize=3)
+            self.assertFalse(ok)
+            self.assertIn("crash", failList)
+            self.assertEqual(len(failList) + sum((countD or collections.Counter()).values()), len(dataList))
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
+    def testMultiProcDiagnostics(self):
+        """Test case - diagnostic counts aggregated in the workers"""
+        try:
+            dataList = ["".join(["b"] * random.randint(10, 100)) for _ in range(500)]
+            sTest = StringTests()
+            mpu = MultiProcUtil(verbose=True)
+            mpu.set(workerObj=sTest, workerMethod="reverser")
+            ok, _, _, diagList = mpu.runMulti(dataList=dataList, numProc=2, numResults=2, chunkSize=10)
+            self.assertTrue(ok)
+            self.assertEqual(sorted(diagList), sorted(set([2 * len(tS) for tS in dataList])))
+            sD = mpu.getDiagnosticSummary()
+            self.assertEqual(sD["total"], len(dataList))
+            self.assertEqual(sD["distinct"], len(diagList))
+            #
+            mpu.setDiagnostics(keyFn=lambda diag: "even" if diag % 4 == 0 else "odd", maxSamples=2)
+            ok, _, _, diagList = mpu.runMulti(dataList=dataList, numProc=2, numResults=2, chunkSize=10)
+            self.assertTrue(ok)
+            self.assertLessEqual(len(diagList), 2)
+            sD = mpu.getDiagnosticSummary(maxReport=1)
+            logger.info("Diagnostic summary %r", sD)
+            self.assertEqual(len(sD["counts"]), 1)
+            self.assertLessEqual(len(sD["counts"][0]["samples"]), 2)
+            self.assertEqual(sD["total"], len(dataList))
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
+    def testMultiProcRunMap(self):
+        """Test case - per-item function with exception capture and retries of chunks lost to worker exits"""
+        try:
+            dataList = [{"id": "%03d" % ii, "size": ii} for ii in range(100)] + [{"id": "crash", "size": 0}]
+            mpu = MultiProcUtil(verbose=True)
+            ok, failList, resultList, diagList = mpu.runMap(scaleItem, dataList=dataList, numProc=3, numResults=2, chunkSize=10)
+            self.assertFalse(ok)
+            self.assertEqual(sorted([dD["id"] for dD in failList]), ["%03d" % ii for ii in range(0, 100, 7)] + ["crash"])
+            self.assertEqual(len(resultList[0]), len(dataList) - len(failList))
+            self.assertEqual(sorted(resultList[1]), sorted([2 * ii for ii in range(100) if ii % 7]))
+            self.assertIn("ValueError: size divisible by 7", diagList)
+            self.assertIn("WorkerExit: worker process exited processing item", diagList)
+            self.assertGreaterEqual(mpu.getRunStats()["retriedChunks"], 2)
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
+    def testMultiProcEarlyStop(self):
+        """Test case - failure threshold, stop predicate, cancel token and signal shutdown"""
+        try:
+            sTest = StringTests()
+            dataList = ["".join(["b"] * 10) + "%04d" % ii for ii in range(400)]
+            mpu = MultiProcUtil(verbose=True)
+            mpu.set(workerObj=sTest, workerMethod="reverser")
+            mpu.setEarlyStop(maxFailures=20)
+            ok, failList, resultList, _ = mpu.runMulti(dataList=dataList, numProc=2, numResults=2, chunkSize=5)
+            self.assertFalse(ok)
+            self.assertEqual(len(failList) + len(resultList[0]), len(dataList))
+            sD = mpu.getRunStats()["earlyStop"]
+            self.assertEqual(sD["reason"], "maxFailures")
+            self.assertGreater(sD["skippedChunks"], 0)
+            #
+            mpu.set(workerObj=sTest, workerMethod="sleeper")
+            mpu.setEarlyStop(stopFn=lambda rTup: "bbbbbbbbbb0010" in rTup[0])
+            ok, failList, resultList, _ = mpu.runMulti(dataList=dataList, numProc=2, numResults=1, chunkSize=5)
+            self.assertFalse(ok)
+            self.assertIn("bbbbbbbbbb0010"[::-1], resultList[0])
+            self.assertEqual(mpu.getRunStats()["earlyStop"]["reason"], "predicate")
+            #
+            cancelToken = threading.Event()
+            threading.Timer(0.3, cancelToken.set).start()
+            mpu.setEarlyStop(cancelToken=cancelToken, drain=True)
+            startTime = time.time()
+            ok, failList, resultList, _ = mpu.runMulti(dataList=dataList, numProc=2, numResults=1, chunkSize=5)
+            self.assertFalse(ok)
+            self.assertLess(time.time() - startTime, 3.0)
+            self.assertEqual(mpu.getRunStats()["earlyStop"]["reason"], "cancelled")
+            #
+            mpu.setEarlyStop()
+            threading.Timer(0.3, os.kill, (os.getpid(), signal.SIGINT)).start()
+            with self.assertRaises(KeyboardInterrupt):
+                mpu.runMulti(dataList=dataList, numProc=2, numResults=1, chunkSize=5)
+            self.assertEqual(mpu.getRunStats()["earlyStop"]["reason"], "signal")
+            self.assertEqual(multiprocess.active_children(), [])
+            #
+            # with a reducer, chunk results arrive once all chunks are complete -- the workers still return their partials
+            dataList = dataList[:200]
+            mpu.set(workerObj=sTest, workerMethod="reverser")
+            mpu.setReducer(reduceFn=countLengths, combineFn=mergeCounts)
+            mpu.setEarlyStop(stopFn=lambda rTup: True)
+            startTime = time.time()
+            ok, failList, countD, _ = mpu.runMulti(dataList=dataList, numProc=4, numResults=2, chunkSize=10)
+            self.assertLess(time.time() - startTime, 5.0)
+            self.assertEqual(sum(countD.values()), len([tS for tS in dataList if not re.search("[8-9]", tS)]))
+            self.assertEqual(len(failList) + sum(countD.values()), len(dataList))
+            self.assertEqual(mpu.getRunStats()["earlyStop"]["skippedChunks"], 0)
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
+    def testMultiProcPriorityStream(self):
+        """Test case - priority ordered dispatch with streamed chunk results"""
+        try:
+            sTest = StringTests()
+            dataList = ["item%04d" % ii for ii in range(200)]
+            random.shuffle(dataList)
+            mpu = MultiProcUtil(verbose=True)
+            mpu.set(workerObj=sTest, workerMethod="crasher")
+            mpu.setPriority(priorityFn=lambda tS: int(tS[-4:]))
+            priorityList = []
+            for chunkList, successList, resultLists, diagList in mpu.runMultiIter(dataList=dataList, numProc=1, numResults=1, chunkSize=20):
+                self.assertEqual(sorted(successList), sorted(chunkList))
+                self.assertEqual(len(resultLists[0]), len(chunkList))
+                self.assertEqual(diagList, [])
+                priorityList.extend([int(tS[-4:]) for tS in chunkList])
+            self.assertEqual(priorityList, list(range(199, -1, -1)))
+            #
+            # items without a priority are processed last
+            mpu.setPriority(priorityFn=lambda tS: None if tS.endswith("5") else int(tS[-4:]))
+            chunkList = []
+            for cL, _, _, _ in mpu.runMultiIter(dataList=dataList, numProc=1, numResults=1, chunkSize=20):
+                chunkList.extend(cL)
+            self.assertEqual(sorted(chunkList[-20:]), sorted([tS for tS in dataList if tS.endswith("5")]))
+            itemList = [{"id": "a", "p": 1}, {"id": "b", "p": None}, {"id": "c"}, {"id": "d", "p": 3}]
+            mpu.setPriority(priorityField="p")
+            ok, _, resultList, _ = mpu.runMap(lambda item: item["id"], itemList, numProc=1, numResults=1, chunkSize=1)
+            self.assertTrue(ok)
+            self.assertEqual(resultList[0][:2], ["d", "a"])
+            self.assertEqual(sorted(resultList[0]), ["a", "b", "c", "d"])
+            #
+            mpu.setPriority()
+            numChunks = 0
+            for chunkList, successList, _, _ in mpu.runMultiIter(dataList=dataList, numProc=2, numResults=1, chunkSize=20):
+                numChunks += 1
+                if numChunks == 3:
+                    break
+            self.assertEqual(multiprocess.active_children(), [])
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
+    def testMultiProcDedup(self):
+        """Test case - deduplication of input items with success and result fan-out"""
+        try:
+            sTest = StringTests()
+            distinctList = ["".join(["b"] * 10) + "%03d" % ii for ii in range(100) if not re.search("[8-9]", "%03d" % ii)]
+            dataList = distinctList * 3
+            random.shuffle(dataList)
+            mpu = MultiProcUtil(verbose=True)
+            mpu.set(workerObj=sTest, workerMethod="reverser")
+            mpu.setDedup()
+            ok, failList, resultList, _ = mpu.runMulti(dataList=dataList, numProc=2, numResults=2, chunkSize=10)
+            self.assertTrue(ok)
+            self.assertEqual(failList, [])
+            self.assertEqual(sorted(resultList[0]), sorted([tS[::-1] for tS in distinctList]))
+            self.assertEqual(mpu.getRunStats()["dedup"], {"inputItems": len(dataList), "distinctItems": len(distinctList)})
+            #
+            dataList = [{"id": "%03d" % (ii % 50), "size": ii % 50} for ii in range(200)]
+            mpu.setDedup(keyFn=lambda dD: dD["id"])
+            ok, failList, resultList, _ = mpu.runMap(scaleItem, dataList=dataList, numProc=2, numResults=2, chunkSize=10)
+            self.assertFalse(ok)
+            self.assertEqual(len(failList), 4 * len(range(0, 50, 7)))
+            self.assertEqual(len(resultList[0]), len(dataList) - len(failList))
+            self.assertEqual(sorted(resultList[1]), sorted([2 * (ii % 50) for ii in range(200) if (ii % 50) % 7]))
+            self.assertEqual(mpu.getRunStats()["dedup"]["distinctItems"], 50)
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
+    def testMultiProcProfiling(self):
+        """Test case - per-worker profiles merged into a report of the top functions"""
+        try:
+            dirPath = os.path.join(os.path.abspath(os.path.dirname(__file__)), "temp-output", "profile-MultiProcUtil")
+            shutil.rmtree(dirPath, ignore_errors=True)
+            os.makedirs(dirPath)
+            dataList = [{"id": "%03d" % ii, "size": ii} for ii in range(100)]
+            mpu = MultiProcUtil(verbose=True)
+            mpu.setProfiling(dirPath=dirPath, topN=50)
+            ok, _, resultList, _ = mpu.runMap(scaleItem, dataList=dataList, numProc=2, numResults=2, chunkSize=10)
+            self.assertFalse(ok)
+            self.assertEqual(len(resultList[1]), 100 - 15)
+            pD = mpu.getRunStats()["profile"]
+            logger.info("Profile workers %d top %r", pD["workers"], pD["top"][:3])
+            self.assertTrue(1 <= pD["workers"] <= 2)
+            self.assertEqual(len(glob.glob(os.path.join(dirPath, "mp-profile-%s-*.prof" % mpu.getRunStats()["runId"]))), pD["workers"])
+            self.assertTrue(os.path.exists(pD["statsPath"]))
+            scaleD = [fD for fD in pD["top"] if fD["function"].endswith("(scaleItem)")][0]
+            self.assertEqual(scaleD["ncalls"], 100)
+            with open(pD["reportPath"]) as ifh:
+                self.assertIn("scaleItem", ifh.read())
+            shutil.rmtree(dirPath)
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
+    def testMultiProcMemoryProfiling(self):
+        """Test case - per-chunk peak traced allocation and the heaviest items"""
+        try:
+            dataList = [{"id": "%03d" % ii, "size": ii} for ii in range(1, 41)]
+            mpu = MultiProcUtil(verbose=True)
+            mpu.setMemoryProfiling(topItems=3)
+            ok, _, resultList, _ = mpu.runMap(allocateItem, dataList=dataList, numProc=2, numResults=1, chunkSize=10)
+            self.assertTrue(ok)
+            self.assertEqual(sorted(resultList[0]), [10000 * ii for ii in range(1, 41)])
+            mD = mpu.getRunStats()["memory"]
+            logger.info("Memory chunks %d max peak %r max RSS delta %r heaviest %r", mD["chunks"], mD["maxPeakTraced"], mD["maxRssDelta"], mD["heaviestItems"])
+            self.assertEqual(mD["chunks"], 4)
+            self.assertEqual(sorted([cD["chunkId"] for cD in mD["chunkList"]]), [0, 1, 2, 3])
+            self.assertEqual(sum([cD["items"] for cD in mD["chunkList"]]), 40)
+            self.assertGreaterEqual(mD["maxPeakTraced"], 400000)
+            self.assertEqual(len(mD["heaviestItems"]), 3)
+            self.assertIn("'040'", mD["heaviestItems"][0]["item"])
+            self.assertGreaterEqual(mD["heaviestItems"][0]["peakTraced"], 400000)
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
+    def testMultiProcPlanRun(self):
+        """Test case - dry-run plan from sample timing and memory measurements"""
+        try:
+            mpu = MultiProcUtil(verbose=True)
+            planD = mpu.planRun(list(range(100000)), sampleSize=40, itemFn=sleepItem)
+            logger.info("Plan %r", planD)
+            sD = planD["sample"]
+            self.assertEqual((sD["items"], sD["chunks"]), (40, 14))
+            self.assertTrue(0.004 < sD["perItemTime"] < 0.05)
+            self.assertIn(planD["backend"], ["process", "pool"])
+            self.assertGreaterEqual(planD["chunkSize"], 1)
+            self.assertLess(planD["estimatedWallTime"], planD["estimatedSerialTime"])
+            self.assertGreater(planD["memoryPerProc"], 0)
+            #
+            planD = mpu.planRun(["a%d" % ii for ii in range(50)], sampleSize=20, itemFn=str, measureMemory=False)
+            self.assertEqual((planD["backend"], planD["numProc"], planD["chunkSize"]), ("serial", 1, 50))
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
+    @unittest.skipIf(numpy is None, "requires numpy")
+    def testMultiProcResultColumns(self):
+        """Test case - typed numeric result columns written by item index into preallocated arrays"""
+        try:
+            dataList = [{"id": "%03d" % ii, "size": ii} for ii in range(100)] + [{"id": "crash", "size": 1}]
+            mpu = MultiProcUtil(verbose=True)
+            mpu.setResultColumns({0: "float64", 1: ("int32", (3,))})
+            for priorityField in [None, "size"]:
+                mpu.setPriority(priorityField=priorityField)
+                ok, failList, resultList, _ = mpu.runMap(measureItem, dataList=dataList, numProc=3, numResults=2, chunkSize=10)
+                self.assertFalse(ok)
+                self.assertEqual(len(failList), 16)
+                self.assertEqual(resultList[0].shape, (101,))
+                self.assertEqual(resultList[1].shape, (101, 3))
+                self.assertTrue(numpy.isnan(resultList[0][100]))
+                self.assertEqual(str(resultList[1].dtype), "int32")
+                for ii in range(100):
+                    if ii % 7:
+                        self.assertEqual(resultList[0][ii], ii / 2.0)
+                        self.assertEqual(list(resultList[1][ii]), [ii, 2 * ii, 3 * ii])
+                    else:
+                        self.assertTrue(numpy.isnan(resultList[0][ii]))
+                        self.assertEqual(list(resultList[1][ii]), [0, 0, 0])
+            #
+            mpu.setPriority()
+            mpu.setResultColumns({1: "int64"})
+            sTest = StringTests()
+            mpu.set(workerObj=sTest, workerMethod="reverser")
+            with self.assertRaises(ValueError):
+                mpu.runMulti(dataList=["a", "b"], numProc=2, numResults=1)
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
+    def testMultiProcThreadLimits(self):
+        """Test case - native library thread limits set in the worker processes"""
+        try:
+            dataList = list(range(20))
+            mpu = MultiProcUtil(verbose=True)
+            ok, _, resultList, _ = mpu.runMap(getThreadLimit, dataList=dataList, numProc=2, numResults=1, chunkSize=5)
+            self.assertTrue(ok)
+            numThreads = mpu.getRunStats()["threadLimit"]["threadsPerProc"]
+            self.assertGreaterEqual(numThreads, 1)
+            self.assertEqual(set(resultList[0]), set([os.environ.get("OMP_NUM_THREADS", str(numThreads))]))
+            #
+            mpu.setThreadLimits(threadsPerProc=3)
+            ok, _, resultList, _ = mpu.runMap(getThreadLimit, dataList=dataList, numProc=2, numResults=1, chunkSize=5)
+            self.assertEqual(set(resultList[0]), set(["3"]))
+            #
+            mpu.setThreadLimits(limit=False)
+            ok, _, resultList, _ = mpu.runMap(getThreadLimit, dataList=dataList, numProc=2, numResults=1, chunkSize=5)
+            self.assertEqual(set(resultList[0]), set([os.environ.get("OMP_NUM_THREADS")]))
+            self.assertNotIn("threadLimit", mpu.getRunStats())
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
+    def testMultiProcSpeculation(self):
+        """Test case - speculative copies of a straggler chunk on idle workers"""
+        try:
+            markerPath = os.path.join(os.path.abspath(os.path.dirname(__file__)), "temp-output", "speculation-marker.txt")
+            if os.path.exists(markerPath):
+                os.remove(markerPath)
+            dataList = [{"id": "%03d" % ii} for ii in range(20)]
+            dataList[7].update({"markerPath": markerPath, "delay": 20.0})
+            mpu = MultiProcUtil(verbose=True)
+            mpu.setSpeculation(minElapsed=0.2)
+            startTime = time.time()
+            ok, failList, resultList, _ = mpu.runMap(stallOnceItem, dataList=dataList, numProc=2, numResults=1, chunkSize=5)
+            elapsed = time.time() - startTime
+            sD = mpu.getRunStats()["speculation"]
+            logger.info("Speculation %r elapsed %.2f", sD, elapsed)
+            self.assertTrue(ok)
+            self.assertEqual(failList, [])
+            self.assertEqual(sorted(resultList[0]), ["%03d" % ii for ii in range(20)])
+            self.assertGreaterEqual(sD["copies"], 1)
+            self.assertGreaterEqual(sD["won"], 1)
+            self.assertGreaterEqual(sD["terminated"], 1)
+            self.assertLess(elapsed, 15.0)
+            os.remove(markerPath)
+        except Exception as e:
+            logger.exception("Failing with %s", str(e))
+            self.fail()
+
 
 def suiteMultiProc():
     suiteSelect = unittest.TestSuite()
     suiteSelect.addTest(MultiProcUtilTests("testMultiProcString"))
+    suiteSelect.addTest(MultiProcUtilTests("testMultiProcNumProcPolicy"))
+    suiteSelect.addTest(MultiProcUtilTests("testMultiProcWorkerLimits"))
+    suiteSelect.addTest(MultiProcUtilTests("testMultiProcWorkerFailure"))
+    suiteSelect.addTest(MultiProcUtilTests("testMultiProcSerializer"))
+    suiteSelect.addTest(MultiProcUtilTests("testMultiProcCompression"))
+    suiteSelect.addTest(MultiProcUtilTests("testMultiProcResultSpill"))
+    suiteSelect.addTest(MultiProcUtilTests("testMultiProcReducer"))
+    suiteSelect.addTest(MultiProcUtilTests("testMultiProcDiagnostics"))
+    suiteSelect.addTest(MultiProcUtilTests("testMultiProcRunMap"))
+    suiteSelect.addTest(MultiProcUtilTests("testMultiProcEarlyStop"))
+    suiteSelect.addTest(MultiProcUtilTests("testMultiProcPriorityStream"))
+    suiteSelect.addTest(MultiProcUtilTests("testMultiProcDedup"))
+    suiteSelect.addTest(MultiProcUtilTests("testMultiProcProfiling"))
+    suiteSelect.addTest(MultiProcUtilTests("testMultiProcMemoryProfiling"))
+    suiteSelect.addTest(MultiProcUtilTests("testMultiProcPlanRun"))
+    suiteSelect.addTest(MultiProcUtilTests("testMultiProcResultColumns"))
+    suiteSelect.addTest(MultiProcUtilTests("testMultiProcThreadLimits"))
+    suiteSelect.addTest(MultiProcUtilTests("testMultiProcSpeculation"))
     return suiteSelect
 
 